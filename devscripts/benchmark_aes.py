@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp.aes import (
+    _fast_cbc_decrypt,
+    _fast_ctr_encrypt,
+    _fast_gcm_decrypt_and_verify,
+    aes_cbc_decrypt,
+    aes_ctr_decrypt,
+    aes_gcm_decrypt_and_verify,
+)
+from yt_dlp.dependencies import Cryptodome
+
+
+def measure(func, size):
+    start = time.perf_counter()
+    func()
+    return size / (time.perf_counter() - start) / 1024 / 1024
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare the throughput of the native AES implementations')
+    parser.add_argument(
+        '--size', type=int, default=1024 * 1024, help='Amount of data to decrypt with the fast implementation in bytes')
+    parser.add_argument(
+        '--reference-size', type=int, default=64 * 1024, help='Amount of data to decrypt with the reference implementation')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    key, iv = os.urandom(16), os.urandom(16)
+    data, reference_data = os.urandom(args.size), os.urandom(args.reference_size)
+
+    if Cryptodome.AES:
+        gcm_data, tag = Cryptodome.AES.new(key, Cryptodome.AES.MODE_GCM, iv[:12]).encrypt_and_digest(data)
+        gcm_reference_data, reference_tag = Cryptodome.AES.new(
+            key, Cryptodome.AES.MODE_GCM, iv[:12]).encrypt_and_digest(reference_data)
+    else:
+        tag = None
+
+    benchmarks = {
+        'CBC': (
+            lambda: aes_cbc_decrypt(list(reference_data), list(key), list(iv)),
+            lambda: _fast_cbc_decrypt(data, key, iv)),
+        'CTR': (
+            lambda: aes_ctr_decrypt(list(reference_data), list(key), list(iv)),
+            lambda: _fast_ctr_encrypt(data, key, iv)),
+    }
+    if tag:
+        benchmarks['GCM'] = (
+            lambda: aes_gcm_decrypt_and_verify(list(gcm_reference_data), list(key), list(reference_tag), list(iv[:12])),
+            lambda: _fast_gcm_decrypt_and_verify(gcm_data, key, tag, iv[:12]))
+    else:
+        print('pycryptodomex is not available; skipping GCM (it is needed to generate an authentication tag)')
+
+    print(f'{"mode":<6}{"reference MB/s":>16}{"fast MB/s":>12}{"speedup":>10}')
+    for mode, (reference, fast) in benchmarks.items():
+        reference_speed = measure(reference, args.reference_size)
+        fast_speed = measure(fast, args.size)
+        print(f'{mode:<6}{reference_speed:>16.3f}{fast_speed:>12.3f}{fast_speed / reference_speed:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import copy
+import itertools
+import timeit
+
+from yt_dlp import YoutubeDL
+
+FORMAT_SPECS = (
+    'bestvideo*+bestaudio/best',
+    'bv*[height<=1080][vcodec^=avc1]+ba[ext=m4a]/b[height<=1080]/b',
+    '(bv[fps>30]/bv)+(ba[acodec=opus]/ba),b[protocol=https]',
+)
+
+
+def make_formats(count):
+    """Create a format list resembling the one of a YouTube video"""
+    heights = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+    vcodecs = ('avc1.4d401e', 'vp9', 'av01.0.08M.08')
+    protocols = ('https', 'm3u8_native', 'http_dash_segments')
+    formats = []
+    for i, (height, vcodec, protocol, fps) in enumerate(itertools.product(heights, vcodecs, protocols, (30, 60))):
+        formats.append({
+            'format_id': f'v{i}',
+            'url': f'https://example.com/v{i}.mp4',
+            'ext': 'webm' if vcodec == 'vp9' else 'mp4',
+            'vcodec': vcodec,
+            'acodec': 'none',
+            'height': height,
+            'width': height * 16 // 9,
+            'fps': fps,
+            'tbr': height * fps / 10,
+            'protocol': protocol,
+        })
+    for i, (acodec, abr, language) in enumerate(itertools.product(('opus', 'mp4a.40.2'), (48, 128, 160), ('en', 'de', 'fr'))):
+        formats.append({
+            'format_id': f'a{i}',
+            'url': f'https://example.com/a{i}.m4a',
+            'ext': 'webm' if acodec == 'opus' else 'm4a',
+            'vcodec': 'none',
+            'acodec': acodec,
+            'abr': abr,
+            'language': language,
+            'language_preference': 10 if language == 'en' else -1,
+            'protocol': 'https',
+        })
+    return formats[-count:]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark format selection on a large format list')
+    parser.add_argument('--videos', type=int, default=1000, help='Number of videos to select formats for')
+    parser.add_argument('--formats', type=int, default=150, help='Number of formats per video')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    ydl = YoutubeDL({'quiet': True})
+    formats = make_formats(args.formats)
+    print(f'Selecting formats for {args.videos} videos with {len(formats)} formats each\n')
+
+    for spec in FORMAT_SPECS:
+        uncached = timeit.timeit(lambda: ydl._compile_format_selector(spec), number=args.videos)
+        cached = timeit.timeit(lambda: ydl.build_format_selector(spec), number=args.videos)
+        selector = ydl.build_format_selector(spec)
+        video_formats = [copy.deepcopy(formats) for _ in range(args.videos)]
+
+        def sort_and_select():
+            fmts = video_formats.pop()
+            ydl.sort_formats({'formats': fmts})
+            ydl._select_formats(fmts, selector)
+
+        selection = timeit.timeit(sort_and_select, number=args.videos)
+        print(spec)
+        print(f'    compile selector:        {uncached * 1000:9.1f} ms')
+        print(f'    cached selector lookup:  {cached * 1000:9.1f} ms')
+        print(f'    sort and select formats: {selection * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
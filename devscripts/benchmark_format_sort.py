@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import timeit
+
+from devscripts.benchmark_format_selection import make_formats
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import FormatSorter
+
+FORMAT_SORTS = (
+    [],
+    ['res:1080', 'fps', 'vcodec:avc1', 'acodec:m4a'],
+    ['+size', 'br~2000', 'lang', 'proto'],
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark format sorting on a large format list')
+    parser.add_argument('--videos', type=int, default=200, help='Number of videos to sort formats for')
+    parser.add_argument('--formats', type=int, default=150, help='Number of formats per video')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    formats = make_formats(args.formats)
+    for fmt in formats:
+        FormatSorter._fill_sorting_fields(fmt)
+    print(f'Sorting formats for {args.videos} videos with {len(formats)} formats each\n')
+
+    for format_sort in FORMAT_SORTS:
+        ydl = YoutubeDL({'quiet': True, 'format_sort': format_sort})
+        sorter = FormatSorter(ydl, [])
+
+        def interpreted_key(fmt):
+            return tuple(sorter._calculate_field_preference(fmt, field) for field in sorter._order)
+
+        interpreted = timeit.timeit(lambda: sorted(formats, key=interpreted_key), number=args.videos)
+        compiled = timeit.timeit(lambda: sorted(formats, key=sorter.calculate_preference), number=args.videos)
+        uncached = timeit.timeit(lambda: FormatSorter(ydl, []), number=args.videos)
+        cached = timeit.timeit(lambda: ydl._get_format_sorter([]), number=args.videos)
+        print(' '.join(format_sort) or '(default)')
+        print(f'    interpreted preference: {interpreted * 1000:9.1f} ms')
+        print(f'    compiled preference:    {compiled * 1000:9.1f} ms')
+        print(f'    create sorter:          {uncached * 1000:9.1f} ms')
+        print(f'    cached sorter lookup:   {cached * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
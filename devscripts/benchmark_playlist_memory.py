@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+import tracemalloc
+
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import OnDemandPagedList, PlaylistEntries
+
+PAGE_SIZE = 100
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=(
+        'Benchmark the memory used for iterating over the entries of a large playlist, '
+        'with and without discarding the entries that were processed'))
+    parser.add_argument('--entries', type=int, default=200_000, help='Number of entries of the playlist')
+    parser.add_argument('--entry-size', type=int, default=500, help='Approximate size of the title of each entry')
+    return parser.parse_args()
+
+
+def make_entry(i, entry_size):
+    return {
+        '_type': 'url',
+        'id': f'video{i}',
+        'url': f'https://example.com/watch?v=video{i}',
+        'title': f'{i:08d}'.ljust(entry_size, '#'),
+    }
+
+
+def source_entries(kind, count, entry_size):
+    if kind == 'generator':
+        return (make_entry(i, entry_size) for i in range(count))
+    return OnDemandPagedList(lambda n: [
+        make_entry(i, entry_size) for i in range(n * PAGE_SIZE, min((n + 1) * PAGE_SIZE, count))], PAGE_SIZE)
+
+
+def measure(params, kind, args):
+    ydl = YoutubeDL({'quiet': True, **params})
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries = PlaylistEntries(ydl, {'entries': source_entries(kind, args.entries, args.entry_size)})
+    count = sum(1 for _ in entries.get_requested_items())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == args.entries, count
+    return peak, elapsed
+
+
+def main():
+    args = parse_args()
+    print(f'Iterating over a playlist of {args.entries} entries\n')
+    for kind in ('generator', 'PagedList'):
+        for name, params in (
+            ('all entries kept', {}),
+            ('lazy playlist', {'lazy_playlist': True}),
+        ):
+            peak, elapsed = measure(params, kind, args)
+            print(f'{kind:10} {name:17} peak {peak / 1024 / 1024:9.1f} MiB  {elapsed:7.2f} s')
+
+
+if __name__ == '__main__':
+    main()
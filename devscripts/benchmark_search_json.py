@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import timeit
+import unittest.mock
+
+from devscripts.benchmark_traversal import make_response
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import js_to_json
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=(
+        'Benchmark InfoExtractor._search_json with and without parsing the object in place, '
+        'on saved webpages or on a synthetic YouTube-like page'))
+    parser.add_argument(
+        'files', nargs='*', metavar='FILE',
+        help='Saved webpages containing ytInitialData. By default, a synthetic page is generated')
+    parser.add_argument('--videos', type=int, default=2000, help='Number of videos of the synthetic page')
+    parser.add_argument('--number', type=int, default=5, help='Number of searches per page')
+    return parser.parse_args()
+
+
+def make_page(videos):
+    script = 'function f(a) { return {a: a, b: [a, "}"]}; }\n' * 20000
+    return ''.join((
+        '<html><head><script>var ytcfg = {"INNERTUBE_CONTEXT": {}};</script></head><body>',
+        f'<script>var ytInitialData = {json.dumps(make_response(videos))};</script>',
+        f'<script>var config = {{title: \'Synthetic page\', videos: {videos}, tabs: ["Home", "Videos"]}};</script>',
+        f'<script>{script}</script></body></html>'))
+
+
+def main():
+    args = parse_args()
+    ie = InfoExtractor(YoutubeDL({'quiet': True}))
+    pages = {}
+    for path in args.files:
+        with open(path, encoding='utf-8') as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        pages['synthetic'] = make_page(args.videos)
+
+    searches = {
+        'JSON': (r'ytInitialData\s*=', {}),
+        'JavaScript': (r'var config\s*=', {'transform_source': js_to_json}),  # only in the synthetic page
+    }
+    print(f'{"page":24}{"object":12}{"size":>10}{"regex":>12}{"in place":>12}')
+    for page_name, page in pages.items():
+        for search_name, (start_pattern, kwargs) in searches.items():
+            def search():
+                return ie._search_json(start_pattern, page, search_name, None, default=None, **kwargs)
+
+            result = search()
+            if result is None:
+                continue
+            with unittest.mock.patch.object(InfoExtractor, '_search_json_object', return_value=None):
+                assert search() == result, f'Results differ for {search_name}'
+                regex_time = timeit.timeit(search, number=args.number) / args.number
+            in_place_time = timeit.timeit(search, number=args.number) / args.number
+            print(f'{page_name:24}{search_name:12}{len(page) / 1024 / 1024:6.1f} MiB'
+                  f'{regex_time * 1000:9.1f} ms{in_place_time * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
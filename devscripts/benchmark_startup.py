@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import collections
+import re
+import statistics
+import subprocess
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_CODE = '''
+from yt_dlp import YoutubeDL, parse_options
+ydl = YoutubeDL(parse_options(['--ignore-config', '--no-update', '--simulate', 'test:']).ydl_opts)
+'''
+IMPORTTIME_RE = re.compile(r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<module>\S+)$')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=(
+        'Benchmark the startup of yt-dlp using "python -X importtime". '
+        'Generate the lazy extractors first to measure a release-like startup'))
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs to take the median of')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest modules to show')
+    parser.add_argument(
+        '--max-ms', type=float, metavar='MS',
+        help='Exit with an error if the median startup time is larger than this. Use to guard against regressions')
+    return parser.parse_args()
+
+
+def run_startup():
+    env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': ''}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        mobj = IMPORTTIME_RE.match(line)
+        if mobj:
+            imports[mobj.group('module')] = (int(mobj.group('self')), int(mobj.group('cumulative')))
+    return elapsed, imports
+
+
+def main():
+    args = parse_args()
+    run_startup()  # Make sure that the bytecode is cached
+    runs = [run_startup() for _ in range(args.runs)]
+
+    wall_times = [elapsed * 1000 for elapsed, _ in runs]
+    import_times = [imports.get('yt_dlp', (0, 0))[1] / 1000 for _, imports in runs]
+    self_times = collections.defaultdict(list)
+    for _, imports in runs:
+        for module, (self_time, _) in imports.items():
+            self_times[module].append(self_time / 1000)
+
+    median = statistics.median(wall_times)
+    print(f'Startup (import, parse options and create YoutubeDL), median of {args.runs} runs\n')
+    print(f'total:          {median:9.1f} ms')
+    print(f'import yt_dlp:  {statistics.median(import_times):9.1f} ms')
+    print(f'\nSlowest {args.top} modules by self time:')
+    slowest = sorted(self_times.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for module, times in slowest[:args.top]:
+        print(f'    {statistics.median(times):7.1f} ms  {module}')
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f'\nERROR: Startup took {median:.1f} ms, which is more than {args.max_ms} ms')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
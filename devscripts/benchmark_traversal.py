@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import subprocess
+import timeit
+import types
+
+from yt_dlp.utils.traversal import traverse_obj
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = {
+    'simple': ('contents', 'twoColumnBrowseResultsRenderer', 'tabs', 0, 'tabRenderer', 'title'),
+    'branched': (
+        'contents', 'twoColumnBrowseResultsRenderer', 'tabs', ..., 'tabRenderer', 'content', 'richGridRenderer',
+        'contents', ..., 'richItemRenderer', 'content', 'videoRenderer', 'videoId'),
+    'filtered': (
+        'contents', 'twoColumnBrowseResultsRenderer', 'tabs', ..., 'tabRenderer',
+        lambda _, v: v['selected'], 'title', {str}, any),
+    'texts': (
+        'contents', 'twoColumnBrowseResultsRenderer', 'tabs', 0, 'tabRenderer', 'content', 'richGridRenderer',
+        'contents', ..., 'richItemRenderer', 'content', 'videoRenderer', 'title', 'runs', ..., 'text'),
+    'alternatives': ('header', ('c4TabbedHeaderRenderer', 'pageHeaderRenderer'), 'title', {str}),
+    'single key': 'responseContext',
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=(
+        'Benchmark traverse_obj with paths that are typical of the YouTube extractor, '
+        'on a synthetic browse response'))
+    parser.add_argument('--videos', type=int, default=60, help='Number of videos of the response')
+    parser.add_argument('--number', type=int, default=2000, help='Number of traversals per path')
+    parser.add_argument(
+        '--baseline', metavar='REV',
+        help='Also benchmark yt_dlp/utils/traversal.py as of this git revision')
+    return parser.parse_args()
+
+
+def make_response(videos):
+    return {
+        'responseContext': {'serviceTrackingParams': [{'service': 'GFEEDBACK', 'params': []}]},
+        'header': {'pageHeaderRenderer': {'title': 'Channel', 'pageTitle': 'Channel'}},
+        'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [{
+            'tabRenderer': {
+                'title': title,
+                'selected': title == 'Videos',
+                'content': {'richGridRenderer': {'contents': [{
+                    'richItemRenderer': {'content': {'videoRenderer': {
+                        'videoId': f'video{i:06d}',
+                        'title': {'runs': [{'text': f'Video {i}'}], 'accessibility': {}},
+                        'lengthText': {'simpleText': '1:00'},
+                        'thumbnail': {'thumbnails': [{'url': f'https://i.ytimg.com/vi/{i}/{size}.jpg'} for size in range(4)]},
+                    }}},
+                } for i in range(videos)]}},
+            },
+        } for title in ('Home', 'Videos', 'Shorts')]}},
+    }
+
+
+def load_baseline(rev):
+    source = subprocess.check_output(['git', 'show', f'{rev}:yt_dlp/utils/traversal.py'], cwd=BASE_DIR, text=True)
+    module = types.ModuleType('yt_dlp.utils._traversal_baseline')
+    module.__package__ = 'yt_dlp.utils'
+    exec(compile(source, f'{rev}:yt_dlp/utils/traversal.py', 'exec'), module.__dict__)
+    return module.traverse_obj
+
+
+def main():
+    args = parse_args()
+    response = make_response(args.videos)
+    implementations = {'current': traverse_obj}
+    if args.baseline:
+        implementations[args.baseline] = load_baseline(args.baseline)
+
+    print(f'{"path":14}' + ''.join(f'{name:>14}' for name in implementations))
+    for name, path in PATHS.items():
+        results = [func(response, path) for func in implementations.values()]
+        assert all(result == results[0] for result in results), f'Results differ for {name}'
+        times = [
+            timeit.timeit(lambda: func(response, path), number=args.number) / args.number
+            for func in implementations.values()]
+        print(f'{name:14}' + ''.join(f'{t * 1e6:11.1f} µs' for t in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import itertools
+import timeit
+
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor._url_index import URLDispatchIndex
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark finding the suitable extractor for URLs')
+    parser.add_argument('--urls', type=int, default=2000, help='Number of URLs to match')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    ydl = YoutubeDL({'quiet': True})
+    ies = ydl._ies
+    test_urls = [tc['url'] for ie in ies.values() for tc in ie.get_testcases(include_onlymatching=True)]
+    urls = list(itertools.islice(itertools.cycle(test_urls), args.urls))
+    print(f'Matching {len(urls)} URLs against {len(ies)} extractors\n')
+
+    def linear_scan():
+        for url in urls:
+            next(key for key, ie in ies.items() if ie.suitable(url))
+
+    def dispatch_index():
+        for url in urls:
+            next(key for key in index.candidates(url) if ies[key].suitable(url))
+
+    index_build = timeit.timeit(lambda: URLDispatchIndex(ies), number=1)
+    index = URLDispatchIndex(ies)
+    # Compile all regexes first so that neither method pays for it
+    linear_scan()
+    linear = timeit.timeit(linear_scan, number=1)
+    indexed = timeit.timeit(dispatch_index, number=1)
+    print(f'build index:    {index_build * 1000:9.1f} ms')
+    print(f'linear scan:    {linear * 1000:9.1f} ms')
+    print(f'dispatch index: {indexed * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,8 +11,10 @@
 
 from devscripts.utils import get_filename_args, read_file, write_file
 from yt_dlp.extractor import import_extractors
+from yt_dlp.extractor._url_index import DISPATCH_KEYS_ATTR, get_dispatch_keys
 from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
 from yt_dlp.globals import extractors
+from yt_dlp.version import __version__
 
 NO_ATTR = object()
 STATIC_CLASS_PROPERTIES = [
@@ -50,6 +52,8 @@ def main():
         *extra_ie_code(DummyInfoExtractor),
         '\nclass LazyLoadSearchExtractor(LazyLoadExtractor):\n    pass\n',
         *build_ies(list(extractors.value.values()), (InfoExtractor, SearchInfoExtractor), DummyInfoExtractor),
+        # Lazy extractors are only used by the version they were generated with
+        f'_VERSION = {__version__!r}',
     ))
 
     write_file(lazy_extractors_filename, f'{module_src}\n')
@@ -70,8 +74,10 @@ def extra_ie_code(ie, base=None):
 
 def build_ies(ies, bases, attr_base):
     names = []
-    for ie in sort_ies(ies, bases):
-        yield build_lazy_ie(ie, ie.__name__, attr_base)
+    sorted_ies = list(sort_ies(ies, bases))
+    dispatch_keys = get_dispatch_keys(sorted_ies)
+    for ie, keys in zip(sorted_ies, dispatch_keys, strict=True):
+        yield build_lazy_ie(ie, ie.__name__, attr_base, keys)
         if ie in ies:
             names.append(ie.__name__)
 
@@ -101,13 +107,14 @@ def sort_ies(ies, ignored_bases):
     yield ies[-1]
 
 
-def build_lazy_ie(ie, name, attr_base):
+def build_lazy_ie(ie, name, attr_base, dispatch_keys):
     bases = ', '.join({
         'InfoExtractor': 'LazyLoadExtractor',
         'SearchInfoExtractor': 'LazyLoadSearchExtractor',
     }.get(base.__name__, base.__name__) for base in ie.__bases__)
 
     s = IE_TEMPLATE.format(name=name, module=ie.__module__, bases=bases)
+    s += f'    {DISPATCH_KEYS_ATTR} = {dispatch_keys!r}\n'  # Used for URL dispatch
     return s + '\n'.join(extra_ie_code(ie, attr_base))
 
 
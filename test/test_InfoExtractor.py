@@ -19,6 +19,7 @@
     ExtractorError,
     RegexNotFoundError,
     encode_data_uri,
+    js_to_json,
     strip_jsonp,
 )
 
@@ -131,6 +132,24 @@ def test_html_search_meta(self):
         self.assertRaises(RegexNotFoundError, ie._html_search_meta, 'z', html, None, fatal=True)
         self.assertRaises(RegexNotFoundError, ie._html_search_meta, ('z', 'x'), html, None, fatal=True)
 
+    def test_search_json(self):
+        ie = self.ie
+        html = '<script>var data = {"a": "};", "b": [1, {}]};\nvar x = {"c": 1};</script>'
+
+        self.assertEqual(ie._search_json(r'var data\s*=', html, 'data', None), {'a': '};', 'b': [1, {}]})
+        self.assertEqual(ie._search_json(r'var x\s*=', html, 'x', None, end_pattern=';</script>'), {'c': 1})
+        # The end pattern does not have to follow the object directly
+        self.assertEqual(ie._search_json(
+            r'var a\s*=', 'var a = {"a": 1}; var b = {"b": 2}</script>', 'a', None, end_pattern='</script>'), {'a': 1})
+        self.assertEqual(ie._search_json(
+            r'var arr\s*=', 'var arr = [1, [2]];', 'arr', None, contains_pattern=r'\[(?s:.+)\]'), [1, [2]])
+        self.assertEqual(ie._search_json(
+            r'var js\s*=', "var js = {a: '}', b: [1, 2]}; var y = {};", 'js', None, transform_source=js_to_json),
+            {'a': '}', 'b': [1, 2]})
+        self.assertEqual(ie._search_json(r'var y\s*=', html, 'y', None, default=None), None)
+        self.assertEqual(ie._search_json(r'var x\s*=', 'var x = {"c": ', 'x', None, default='default'), 'default')
+        self.assertRaises(RegexNotFoundError, ie._search_json, r'var y\s*=', html, 'y', None)
+
     def test_search_json_ld_realworld(self):
         _TESTS = [
             # https://github.com/ytdl-org/youtube-dl/issues/23306
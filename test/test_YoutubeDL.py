@@ -14,6 +14,9 @@
 import contextlib
 import copy
 import json
+import tempfile
+import threading
+import time
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
@@ -21,8 +24,11 @@
 from yt_dlp.postprocessor.common import PostProcessor
 from yt_dlp.utils import (
     ExtractorError,
+    FormatSorter,
     LazyList,
     OnDemandPagedList,
+    PlaylistEntries,
+    PostProcessingError,
     int_or_none,
     match_filter_func,
 )
@@ -392,6 +398,48 @@ def assert_syntax_error(format_spec):
         assert_syntax_error('/')
         assert_syntax_error('[720<height]')
 
+    def test_format_selector_cache(self):
+        ydl = YDL({})
+        selector = ydl.build_format_selector('bv*[height<=720]+ba/b')
+        self.assertIs(ydl.build_format_selector('bv*[height<=720]+ba/b'), selector)
+        self.assertIsNot(ydl.build_format_selector('b'), selector)
+        self.assertIs(ydl._build_format_filter('height<=720'), ydl._build_format_filter('height<=720'))
+
+        ydl.params['allow_multiple_video_streams'] = True
+        self.assertIsNot(ydl.build_format_selector('bv*[height<=720]+ba/b'), selector)
+
+        # A cached selector must give the same results for every video
+        for height in (480, 720, 1080):
+            formats = [
+                {'format_id': 'low', 'ext': 'mp4', 'height': 360, 'url': TEST_URL},
+                {'format_id': 'high', 'ext': 'mp4', 'height': height, 'url': TEST_URL},
+            ]
+            ydl = YDL({'format': 'b[height<=720]'})
+            ydl.process_ie_result(_make_result(formats))
+            ydl.process_ie_result(_make_result(formats))
+            self.assertEqual(
+                [info['format_id'] for info in ydl.downloaded_info_dicts],
+                ['high', 'high'] if height <= 720 else ['low', 'low'])
+
+    def test_format_sorter_compiled_preference(self):
+        formats = [
+            {'format_id': 'a', 'ext': 'mp4', 'vcodec': 'avc1.4d401e', 'acodec': 'mp4a.40.2', 'height': 720, 'fps': 30, 'tbr': 1500, 'protocol': 'https'},
+            {'format_id': 'b', 'ext': 'webm', 'vcodec': 'vp9', 'acodec': 'none', 'height': 1080, 'fps': 60, 'filesize': 10 ** 7, 'protocol': 'm3u8_native'},
+            {'format_id': 'c', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'opus', 'abr': 160, 'language_preference': 10, 'protocol': 'https'},
+            {'format_id': 'd', 'ext': 'mp4', 'vcodec': 'av01.0.08M.08', 'acodec': 'none', 'height': 480, 'source_preference': -1, 'protocol': 'http_dash_segments'},
+            {'format_id': 'e', 'ext': 'flv', 'height': '360', 'tbr': 'unknown', 'has_drm': True, 'protocol': 'rtmp'},
+        ]
+        for format_sort in ([], ['res:720', 'fps'], ['+size', 'br~1000'], ['vcodec:vp9', '+acodec:aac', 'ext'], ['res~600', '+hdr', 'lang']):
+            ydl = YDL({'format_sort': format_sort})
+            sorter = ydl._get_format_sorter(['id'])
+            self.assertIs(ydl._get_format_sorter(['id']), sorter)
+            for fmt in formats:
+                FormatSorter._fill_sorting_fields(fmt)
+                self.assertEqual(
+                    sorter.calculate_preference(fmt),
+                    tuple(sorter._calculate_field_preference(fmt, field) for field in sorter._order),
+                    f'{fmt["format_id"]} with {format_sort}')
+
     def test_format_filtering(self):
         formats = [
             {'format_id': 'A', 'filesize': 500, 'width': 1000, 'aspect_ratio': 1.0},
@@ -1099,6 +1147,35 @@ def test_selection(params, expected_ids, evaluate_all=False):
         test_selection({'playlist_items': '-15::2'}, INDICES[1::2], True)
         test_selection({'playlist_items': '-15::15'}, [], True)
 
+    def test_lazy_playlist_eviction(self):
+        def entries():
+            for i in range(1000):
+                yield {'id': str(i)}
+
+        def get_requested_ids(params, entries):
+            all_entries = PlaylistEntries(YDL({'lazy_playlist': True, **params}), {'entries': entries})
+            return all_entries, [(i, entry['id']) for i, entry in all_entries.get_requested_items()]
+
+        all_entries, requested = get_requested_ids({}, entries())
+        self.assertEqual(requested, [(i + 1, str(i)) for i in range(1000)])
+        self.assertLess(len(all_entries._entries._cache), 2 * PlaylistEntries._EVICTION_WINDOW)
+
+        all_entries, requested = get_requested_ids({'playlist_items': '2,5:7,10::400'}, entries())
+        self.assertEqual(requested, [(2, '1'), (5, '4'), (6, '5'), (7, '6'), (10, '9'), (410, '409'), (810, '809')])
+        self.assertLess(len(all_entries._entries._cache), 2 * PlaylistEntries._EVICTION_WINDOW)
+
+        # Items that are accessed again or from the end need all the entries
+        for params in ({'playlist_items': '5,2'}, {'playlist_items': '1:3,2'}, {'playlist_items': '-3:'}):
+            all_entries, _ = get_requested_ids(params, entries())
+            self.assertIsNone(all_entries._entries._window, params)
+        all_entries, requested = get_requested_ids({'playlist_items': '1:3,2'}, entries())
+        self.assertEqual(requested, [(1, '0'), (2, '1'), (3, '2')])
+
+        pages = OnDemandPagedList(lambda n: ({'id': str(i)} for i in range(n * 10, min(n * 10 + 10, 1000))), 10)
+        _, requested = get_requested_ids({}, pages)
+        self.assertEqual(len(requested), 1000)
+        self.assertEqual(len(pages._cache), PlaylistEntries._EVICTION_PAGES)
+
     def test_do_not_override_ie_key_in_url_transparent(self):
         ydl = YDL()
 
@@ -1212,6 +1289,141 @@ def _real_extract(self, url):
         self.assertEqual(downloaded['extractor'], 'Video')
         self.assertEqual(downloaded['extractor_key'], 'Video')
 
+    def test_concurrent_entries(self):
+        extracted, initialized = [], []
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+            _RETURN_TYPE = 'video'
+
+            def _real_initialize(self):
+                initialized.append(threading.current_thread() is threading.main_thread())
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                time.sleep(0.01 * (6 - int(video_id)))
+                extracted.append((video_id, threading.current_thread() is threading.main_thread()))
+                if video_id == '3':
+                    raise ExtractorError('foo', expected=True)
+                return {'id': video_id, 'title': f'Video {video_id}', 'url': TEST_URL}
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    self.url_result(f'video:{n}', VideoIE, str(n)) for n in range(6))
+
+        for lazy in (False, True):
+            extracted.clear()
+            initialized.clear()
+            ydl = YDL({'concurrent_entries': 3, 'ignoreerrors': True, 'lazy_playlist': lazy})
+            ydl.report_error = lambda *_, **__: None
+            ydl.add_info_extractor(VideoIE(ydl))
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            ydl.extract_info('playlist:')
+            self.assertEqual(
+                [(info['id'], info['playlist_index'], info['playlist_autonumber']) for info in ydl.downloaded_info_dicts],
+                [('0', 1, 1), ('1', 2, 2), ('2', 3, 3), ('4', 5, 5), ('5', 6, 6)])
+            self.assertCountEqual([video_id for video_id, _ in extracted], map(str, range(6)))
+            self.assertFalse(any(in_main_thread for _, in_main_thread in extracted))
+            self.assertEqual(initialized, [True])
+            self.assertFalse(ydl._prefetched_extractions)
+
+        # The rejected entries are not extracted
+        extracted.clear()
+        ydl = YDL({'concurrent_entries': 3, 'ignoreerrors': True, 'match_filter': match_filter_func('id!=2')})
+        ydl.report_error = lambda *_, **__: None
+        ydl.add_info_extractor(VideoIE(ydl))
+        ydl.add_info_extractor(PlaylistIE(ydl))
+        ydl.extract_info('playlist:')
+        self.assertCountEqual([video_id for video_id, _ in extracted], ['0', '1', '3', '4', '5'])
+
+    def test_concurrent_postprocessing(self):
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                return {
+                    'id': video_id,
+                    'title': f'Video {video_id}',
+                    'formats': [{'format_id': 'hd', 'url': TEST_URL, 'ext': 'mp4'}],
+                }
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                # The duplicate video is still being post-processed when it is reached again
+                return self.playlist_result(
+                    self.url_result(f'video:{n}', VideoIE) for n in (0, 1, 2, 3, 4, 5, 4))
+
+        lock = threading.Lock()
+        running, peak, moved, in_main_thread, finished = set(), [], [], [], []
+
+        class SlowPP(PostProcessor):
+            def run(self, info):
+                in_main_thread.append(threading.current_thread() is threading.main_thread())
+                with lock:
+                    running.add(info['id'])
+                    peak.append(len(running))
+                # The later videos finish first, and the failing one fails fast
+                if info['id'] != '2':
+                    time.sleep(0.02 * (6 - int(info['id'])))
+                with lock:
+                    running.remove(info['id'])
+                if info['id'] == '2':
+                    raise PostProcessingError('foo')
+                return [], info
+
+        class AfterVideoPP(PostProcessor):
+            def run(self, info):
+                finished.append((info['id'], info.get('format_id'), info['requested_downloads'][0].get('format_id')))
+                return [], info
+
+        class MovedPP(PostProcessor):
+            def run(self, info):
+                moved.append(info['id'])
+                return [], info
+
+        errors = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = os.path.join(tmpdir, 'archive.txt')
+            ydl = YoutubeDL({
+                'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                'download_archive': archive,
+                'concurrent_postprocessing': 3,
+                'ignoreerrors': 'only_download',
+                'quiet': True,
+            }, auto_init=False)
+            ydl.report_error = lambda msg, *_, **__: errors.append(msg)
+            ydl.add_info_extractor(VideoIE(ydl))
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            ydl.add_post_processor(SlowPP(), when='post_process')
+            ydl.add_post_processor(MovedPP(), when='after_move')
+            ydl.add_post_processor(AfterVideoPP(), when='after_video')
+
+            def dl(name, info, *args, **kwargs):
+                with open(name, 'w'):
+                    pass
+                return True, True
+            ydl.dl = dl
+            ydl.download(['playlist:'])
+            ydl.close()
+
+            with open(archive) as f:
+                archived = f.read().split()[1::2]
+        self.assertEqual(moved, ['0', '1', '3', '4', '5'])
+        self.assertEqual(archived, ['0', '1', '3', '4', '5'])
+        # The best format is not yet merged into the info, as without concurrent post-processing
+        self.assertEqual(finished, [(str(n), None, 'hd') for n in range(6)])
+        self.assertEqual(errors, ['Postprocessing: foo'])
+        self.assertGreater(max(peak), 1)
+        self.assertLessEqual(max(peak), 3)
+        self.assertFalse(any(in_main_thread))
+        self.assertFalse(ydl._pp_jobs)
+
     def test_header_cookies(self):
         from http.cookiejar import Cookie
 
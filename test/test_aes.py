@@ -11,11 +11,18 @@
 import base64
 
 from yt_dlp.aes import (
+    _fast_cbc_decrypt,
+    _fast_cbc_encrypt,
+    _fast_ctr_encrypt,
+    _fast_gcm_decrypt_and_verify,
     aes_cbc_decrypt,
     aes_cbc_decrypt_bytes,
     aes_cbc_encrypt,
+    aes_cbc_encrypt_bytes,
     aes_ctr_decrypt,
+    aes_ctr_decrypt_bytes,
     aes_ctr_encrypt,
+    aes_ctr_encrypt_bytes,
     aes_decrypt,
     aes_decrypt_text,
     aes_ecb_decrypt,
@@ -123,6 +130,49 @@ def test_ecb_decrypt(self):
         decrypted = bytes(aes_ecb_decrypt(data, self.key, self.iv))
         self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
+    def test_fast_cbc(self):
+        data = b'\x97\x92+\xe5\x0b\xc3\x18\x91ky9m&\xb3\xb5@\xe6\x27\xc2\x96.\xc8u\x88\xab9-[\x9e|\xf1\xcd'
+        decrypted = _fast_cbc_decrypt(data, bytes(self.key), bytes(self.iv))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        self.assertEqual(aes_cbc_encrypt_bytes(self.secret_msg, bytes(self.key), bytes(self.iv)), data)
+
+        for key_size in (16, 24, 32):
+            key = bytes(range(key_size))
+            for size in (0, 5, 16, 33):
+                msg = bytes(range(100, 100 + size))
+                self.assertEqual(
+                    _fast_cbc_decrypt(msg, key, bytes(self.iv)),
+                    bytes(aes_cbc_decrypt(list(msg), list(key), self.iv)))
+                for mode in ('pkcs7', 'iso7816', 'whitespace', 'zero'):
+                    self.assertEqual(
+                        _fast_cbc_encrypt(msg, key, bytes(self.iv), padding_mode=mode),
+                        bytes(aes_cbc_encrypt(list(msg), list(key), self.iv, padding_mode=mode)))
+
+    def test_fast_ctr(self):
+        data = b'\x03\xc7\xdd\xd4\x8e\xb3\xbc\x1a*O\xdc1\x12+8Aio\xd1z\xb5#\xaf\x08'
+        self.assertEqual(_fast_ctr_encrypt(self.secret_msg, bytes(self.key), bytes(self.iv)), data)
+        self.assertEqual(aes_ctr_encrypt_bytes(self.secret_msg, bytes(self.key), bytes(self.iv)), data)
+        self.assertEqual(aes_ctr_decrypt_bytes(data, bytes(self.key), bytes(self.iv)), self.secret_msg)
+
+        # counter overflow wraps around
+        msg = bytes(range(48))
+        iv = [0xFF] * 16
+        self.assertEqual(_fast_ctr_encrypt(msg, bytes(self.key), bytes(iv)), bytes(aes_ctr_encrypt(list(msg), self.key, iv)))
+
+    def test_fast_gcm(self):
+        data = b'\x159Y\xcf5eud\x90\x9c\x85&]\x14\x1d\x0f.\x08\xb4T\xe4/\x17\xbd'
+        authentication_tag = b'\xe8&I\x80rI\x07\x9d}YWuU@:e'
+        decrypted = _fast_gcm_decrypt_and_verify(data, bytes(self.key), authentication_tag, bytes(self.iv[:12]))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+
+        data = b'\x159Y\xcf5eud\x90\x9c\x85&]\x14\x1d\x0f'
+        authentication_tag = b'\x08\xb1\x9d!&\x98\xd0\xeaRq\x90\xe6;\xb5]\xd8'
+        decrypted = _fast_gcm_decrypt_and_verify(data, bytes(self.key), authentication_tag, bytes(self.iv[:12]))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg[:16])
+
+        with self.assertRaises(ValueError):
+            _fast_gcm_decrypt_and_verify(data, bytes(self.key), bytes(16), bytes(self.iv[:12]))
+
     def test_key_expansion(self):
         key = '4f6bdaa39e2f8cb07f5e722d9edef314'
 
@@ -11,7 +11,9 @@
 import collections
 
 from test.helper import gettestcases
+from yt_dlp import YoutubeDL
 from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor._url_index import URLDispatchIndex
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -108,6 +110,31 @@ def test_pbs(self):
         self.assertMatch('http://video.pbs.org/viralplayer/2365173446/', ['pbs'])
         self.assertMatch('http://video.pbs.org/widget/partnerplayer/980042464/', ['pbs'])
 
+    def test_url_dispatch_index(self):
+        ies = {ie.ie_key(): ie for ie in self.ies}
+        index = URLDispatchIndex(ies)
+        urls = [tc['url'] for tc in gettestcases(include_onlymatching=True)]
+        urls += ['PL63F0C78739B09958', 'ytsearch5:test', 'HTTPS://WWW.YOUTUBE.COM/watch?v=BaW_jenozKc']
+        for url in urls:
+            candidates = index.candidates(url)
+            self.assertLess(len(candidates), len(ies) // 4)
+            self.assertEqual(
+                [key for key in candidates if ies[key].suitable(url)],
+                [key for key, ie in ies.items() if ie.suitable(url)], url)
+
+    def test_url_dispatch_index_kept(self):
+        ydl = YoutubeDL({'quiet': True})
+        url = 'https://www.youtube.com/watch?v=BaW_jenozKc'
+        list(ydl._candidate_ies(url))
+        list(ydl._candidate_ies(url))
+        index = ydl._url_dispatch_index
+        self.assertIsNotNone(index)
+        # Instantiating an extractor that is already in the index does not rebuild it
+        ydl.get_info_extractor('Youtube')
+        self.assertIs(ydl._url_dispatch_index, index)
+        ydl.add_info_extractor(FacebookIE)
+        self.assertIs(ydl._url_dispatch_index, index)
+
     def test_no_duplicated_ie_names(self):
         name_accu = collections.defaultdict(list)
         for ie in self.ies:
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import shutil
+
+from test.helper import FakeYDL
+from yt_dlp.archive import (
+    SQLiteDownloadArchive,
+    TextDownloadArchive,
+    load_download_archive,
+)
+from yt_dlp.dependencies import sqlite3
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'archive_test')
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self.tearDown()
+        os.makedirs(TEST_DIR)
+
+    def tearDown(self):
+        if os.path.exists(TEST_DIR):
+            shutil.rmtree(TEST_DIR)
+
+    def test_load_download_archive(self):
+        self.assertEqual(load_download_archive(None), set())
+        archive = {'youtube abc'}
+        self.assertIs(load_download_archive(archive), archive)
+        self.assertIsInstance(load_download_archive(os.path.join(TEST_DIR, 'a.txt')), TextDownloadArchive)
+        if sqlite3:
+            archive = load_download_archive(os.path.join(TEST_DIR, 'a.sqlite'))
+            self.assertIsInstance(archive, SQLiteDownloadArchive)
+            archive.add('youtube abc')
+            archive.close()
+            # The backend of an existing archive is chosen by its content
+            os.rename(os.path.join(TEST_DIR, 'a.sqlite'), os.path.join(TEST_DIR, 'b.txt'))
+            archive = load_download_archive(os.path.join(TEST_DIR, 'b.txt'))
+            self.assertIsInstance(archive, SQLiteDownloadArchive)
+            self.assertIn('youtube abc', archive)
+            archive.close()
+        fn = os.path.join(TEST_DIR, 'text.db')
+        with open(fn, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\n')
+        archive = load_download_archive(fn)
+        self.assertIsInstance(archive, TextDownloadArchive)
+        self.assertIn('youtube abc', archive)
+
+    def test_text_archive(self):
+        fn = os.path.join(TEST_DIR, 'archive.txt')
+        archive = TextDownloadArchive(fn)
+        self.assertFalse(archive)
+        archive.add('youtube abc')
+        self.assertIn('youtube abc', archive)
+        self.assertNotIn('youtube def', archive)
+        with open(fn, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'youtube abc\n')
+        self.assertIn('youtube abc', TextDownloadArchive(fn))
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_archive(self):
+        fn = os.path.join(TEST_DIR, 'archive.sqlite')
+        archive = SQLiteDownloadArchive(fn, batch_size=2, flush_interval=float('inf'))
+        other = SQLiteDownloadArchive(fn)
+        archive.add('youtube abc')
+        self.assertIn('youtube abc', archive)
+        self.assertNotIn('youtube abc', other)  # still pending
+        archive.add('youtube def')
+        self.assertIn('youtube abc', other)
+        self.assertIn('youtube def', other)
+        archive.add('youtube ghi')
+        archive.add('youtube ghi')
+        archive.close()
+        self.assertIn('youtube ghi', other)
+        self.assertEqual(sorted(other), ['youtube abc', 'youtube def', 'youtube ghi'])
+        # Additions are written immediately by default
+        other.add('youtube jkl')
+        archive = SQLiteDownloadArchive(fn)
+        self.assertIn('youtube jkl', archive)
+        archive.close()
+        other.close()
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_import_text(self):
+        text_fn = os.path.join(TEST_DIR, 'archive.txt')
+        with open(text_fn, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\nyoutube def\n\nyoutube abc\n')
+        archive = SQLiteDownloadArchive(os.path.join(TEST_DIR, 'archive.db'))
+        self.assertEqual(archive.import_text(text_fn), 3)
+        self.assertEqual(len(archive), 2)
+        self.assertIn('youtube def', archive)
+        archive.close()
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_ydl_sqlite_archive(self):
+        fn = os.path.join(TEST_DIR, 'archive.sqlite3')
+        ydl = FakeYDL({'download_archive': fn})
+        info = {'id': 'abc', 'extractor_key': 'Youtube'}
+        self.assertFalse(ydl.in_download_archive(info))
+        ydl.record_download_archive(info)
+        self.assertTrue(ydl.in_download_archive(info))
+        self.assertTrue(ydl.in_download_archive({'id': 'def', 'extractor_key': 'Youtube', '_old_archive_ids': ['youtube abc']}))
+        ydl.close()
+        self.assertIsNone(ydl.archive._conn)
+        other = SQLiteDownloadArchive(fn)
+        self.assertIn('youtube abc', other)
+        other.close()
+        # The archive is reopened if the instance is used again
+        self.assertTrue(ydl.in_download_archive(info))
+        ydl.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,11 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import json
 import shutil
 
 from test.helper import FakeYDL
-from yt_dlp.cache import Cache
+from yt_dlp.cache import Cache, _MemoryCache
 
 
 def _is_empty(d):
@@ -52,6 +53,71 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_cache_write_behind(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        c = Cache(ydl, batch_size=2)
+        c.store('test_cache', 'a', 1)
+        self.assertFalse(os.path.exists(self.test_dir))
+        self.assertEqual(c.load('test_cache', 'a'), 1)
+        c.store('test_cache', 'b', 2)
+        self.assertFalse(_is_empty(os.path.join(self.test_dir, 'test_cache')))
+
+        other = Cache(ydl)
+        self.assertEqual(other.load('test_cache', 'a'), 1)
+        self.assertEqual(other.load('test_cache', 'b'), 2)
+        self.assertEqual(other.stats.hits, 2)
+        self.assertEqual(other.stats.misses, 0)
+
+        # Stores are written immediately by default
+        ydl.cache.store('test_cache', 'c', 3)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'test_cache', 'c.json')))
+
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+            'cache_batch_size': 10,
+        })
+        ydl.cache.store('test_cache', 'd', 4)
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, 'test_cache', 'd.json')))
+        ydl.close()
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'test_cache', 'd.json')))
+        self.assertGreater(ydl.cache.stats.bytes_written, 0)
+
+    def test_memory_cache(self):
+        cache = _MemoryCache(10)
+        cache.put('a', '1234', (4, 1))
+        cache.put('b', '1234', (4, 1))
+        self.assertEqual(cache.get('a', (4, 1)), '1234')
+        cache.put('c', '1234', (4, 1))
+        self.assertIsNone(cache.get('b', (4, 1)))
+        self.assertEqual(cache.get('a', (4, 1)), '1234')
+        # The file was changed
+        self.assertIsNone(cache.get('a', (4, 2)))
+        self.assertEqual(cache.size, 8)
+        cache.put('d', '0123456789a', (11, 1))
+        self.assertIsNone(cache.get('d', (11, 1)))
+        cache.clear('')
+        self.assertEqual(cache.size, 0)
+
+    def test_memory_cache_revalidation(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        ydl.cache.store('test_cache', 'player', 1)
+        self.assertEqual(ydl.cache.load('test_cache', 'player'), 1)
+
+        # Another process rewrites the file
+        fn = os.path.join(self.test_dir, 'test_cache', 'player.json')
+        stat = os.stat(fn)
+        with open(fn, 'w', encoding='utf-8') as f:
+            json.dump({'yt-dlp_version': '2022.08.19', 'data': 2}, f)
+        os.utime(fn, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(ydl.cache.load('test_cache', 'player'), 2)
+        self.assertEqual(ydl.cache.stats.misses, 1)
+        self.assertEqual(ydl.cache.load('test_cache', 'player'), 2)
+        self.assertEqual(ydl.cache.stats.hits, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import concurrent.futures
+import glob
+import http.server
+import random
+import threading
+import time
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.downloader.fragment import FragmentFD
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+FRAGMENT_COUNT = 20
+
+
+def fragment_content(index):
+    return b'%d:' % index + bytes([index]) * 1000
+
+
+class FragmentTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        index = int(self.path.rpartition('/')[2])
+        with self.server.lock:
+            self.server.active += 1
+            self.server.peak = max(self.server.peak, self.server.active)
+        # Finish fragments out of order
+        time.sleep(random.random() / 100)
+        with self.server.lock:
+            self.server.active -= 1
+        content = fragment_content(index)
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestFragmentFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), FragmentTestRequestHandler)
+        self.httpd.lock, self.httpd.active, self.httpd.peak = threading.Lock(), 0, 0
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def download(self, params, filename='testfile.mp4', progress_hook=None, ydl=None):
+        params['logger'] = FakeLogger()
+        ydl = ydl or YoutubeDL(params)
+        downloader = DashSegmentsFD(ydl, params)
+        if progress_hook:
+            downloader.add_progress_hook(progress_hook)
+        try_rm(filename)
+        info_dict = {
+            'url': f'http://127.0.0.1:{self.port}/',
+            'protocol': 'http_dash_segments',
+            'fragment_base_url': f'http://127.0.0.1:{self.port}/',
+            'fragments': [{'path': str(i)} for i in range(FRAGMENT_COUNT)],
+        }
+        self.assertTrue(downloader.real_download(filename, info_dict))
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(fragment_content, range(FRAGMENT_COUNT))))
+        self.assertFalse(glob.glob(f'{glob.escape(filename)}*Frag*'))
+        try_rm(filename)
+
+    def test_sequential(self):
+        self.download({})
+
+    def test_concurrent(self):
+        self.download({'concurrent_fragment_downloads': 4})
+
+    def test_in_memory(self):
+        self.download({'fragment_window': 3})
+
+    def test_in_memory_concurrent(self):
+        self.download({'concurrent_fragment_downloads': 4, 'fragment_window': 6})
+
+    def test_in_memory_small_window(self):
+        # The window also bounds the fragments that are being downloaded
+        self.download({'concurrent_fragment_downloads': 8, 'fragment_window': 2})
+        self.assertLessEqual(self.httpd.peak, 2)
+
+    def test_concurrent_downloads(self):
+        params = {'concurrent_fragment_downloads': 4, 'max_concurrent_transfers': 2}
+        ydl = YoutubeDL({**params, 'logger': FakeLogger()})
+        with concurrent.futures.ThreadPoolExecutor(3) as pool:
+            for future in [pool.submit(self.download, dict(params), f'testfile{i}.mp4', ydl=ydl) for i in range(3)]:
+                future.result()
+        self.assertLessEqual(ydl._transfer_scheduler._workers, 2)
+
+    def test_rate_limit(self):
+        statuses = []
+        start = time.monotonic()
+        # The limit applies to all the fragments together, not to each of them
+        self.download({'concurrent_fragment_downloads': 4, 'ratelimit': 40000}, progress_hook=statuses.append)
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+        self.assertEqual(statuses[-1]['priority'], 'vod')
+        self.assertGreater(statuses[-1]['scheduler_wait'], 0)
+
+    def test_bounded_map(self):
+        lock = threading.Lock()
+        submitted = consumed = max_pending = 0
+
+        def func(item):
+            nonlocal max_pending
+            time.sleep(random.random() / 100)
+            with lock:
+                max_pending = max(max_pending, submitted - consumed)
+            return item
+
+        def items():
+            nonlocal submitted
+            for i in range(50):
+                submitted += 1
+                yield i
+
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            results = []
+            for result in FragmentFD._bounded_map(pool, func, items(), 5):
+                results.append(result)
+                consumed += 1
+        self.assertEqual(results, list(range(50)))
+        self.assertLessEqual(max_pending, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import threading
+import time
+import unittest.mock
+import urllib.parse
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.external import FFmpegFD
+from yt_dlp.downloader.hls_live import HlsLiveFD
+from yt_dlp.utils import DownloadError
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+SEGMENT_COUNT = 3
+PARTS_PER_SEGMENT = 4
+PART_DURATION = 0.05
+INIT_CONTENT = b'init;'
+
+
+def part_content(msn, part):
+    return b'%d.%d;' % (msn, part)
+
+
+def segment_content(msn):
+    return b''.join(part_content(msn, part) for part in range(PARTS_PER_SEGMENT))
+
+
+class LiveStream:
+    """A synthetic Low-Latency HLS stream whose parts are published over time"""
+
+    def __init__(self):
+        self.published = 0
+        self.cond = threading.Condition()
+        self.requests = []
+        # Whether the parts of the complete segments are removed from the playlist. The next part is
+        # then not hinted, so that the last part of each segment is only listed after it is removed
+        self.prune_parts = False
+        self.encrypted = False
+
+    def publish(self):
+        for _ in range(SEGMENT_COUNT * PARTS_PER_SEGMENT):
+            with self.cond:
+                self.published += 1
+                self.cond.notify_all()
+            time.sleep(PART_DURATION)
+
+    @property
+    def ended(self):
+        return self.published == SEGMENT_COUNT * PARTS_PER_SEGMENT
+
+    def wait(self, msn, part=None):
+        # Without a part, wait for the whole segment
+        index = msn * PARTS_PER_SEGMENT + (PARTS_PER_SEGMENT - 1 if part is None else part)
+        with self.cond:
+            return self.cond.wait_for(lambda: self.published > index or self.ended, timeout=5)
+
+    def playlist(self):
+        with self.cond:
+            published = self.published
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:9',
+            '#EXT-X-TARGETDURATION:1',
+            f'#EXT-X-PART-INF:PART-TARGET={PART_DURATION}',
+            f'#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,PART-HOLD-BACK={PART_DURATION * 3}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-MAP:URI="init.mp4"',
+        ]
+        if self.encrypted:
+            lines.append('#EXT-X-KEY:METHOD=AES-128,URI="key.bin"')
+        for index in range(published):
+            msn, part = divmod(index, PARTS_PER_SEGMENT)
+            if not self.prune_parts or msn == published // PARTS_PER_SEGMENT:
+                lines.append(f'#EXT-X-PART:DURATION={PART_DURATION},URI="part/{msn}.{part}.mp4"')
+            if part == PARTS_PER_SEGMENT - 1:
+                lines.extend((f'#EXTINF:{PART_DURATION * PARTS_PER_SEGMENT},', f'segment/{msn}.mp4'))
+        if published == SEGMENT_COUNT * PARTS_PER_SEGMENT:
+            lines.append('#EXT-X-ENDLIST')
+        elif not self.prune_parts:
+            msn, part = divmod(published, PARTS_PER_SEGMENT)
+            lines.append(f'#EXT-X-PRELOAD-HINT:TYPE=PART,URI="part/{msn}.{part}.mp4"')
+        return '\n'.join(lines).encode()
+
+
+class LiveStreamRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stream = self.server.stream
+        stream.requests.append(self.path)
+        path, _, query = self.path.partition('?')
+        query = urllib.parse.parse_qs(query)
+        name = path.rpartition('/')[2].removesuffix('.mp4')
+        if path == '/index.m3u8':
+            if '_HLS_msn' in query:
+                stream.wait(int(query['_HLS_msn'][0]), int(query['_HLS_part'][0]) if '_HLS_part' in query else None)
+            content = stream.playlist()
+        elif path == '/init.mp4':
+            content = INIT_CONTENT
+        elif path.startswith('/part/'):
+            msn, part = map(int, name.split('.'))
+            # Hinted parts are returned as soon as they are published
+            if not stream.wait(msn, part) or msn >= SEGMENT_COUNT:
+                self.send_error(404)
+                return
+            content = part_content(msn, part)
+        elif path.startswith('/segment/'):
+            content = segment_content(int(name))
+            byte_range = self.headers.get('Range')
+            if byte_range:
+                start, _, end = byte_range.removeprefix('bytes=').partition('-')
+                content = content[int(start):int(end) + 1 if end else None]
+                self.send_response(206)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                return
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestHlsLiveFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), LiveStreamRequestHandler)
+        self.httpd.stream = LiveStream()
+        self.url = f'http://127.0.0.1:{http_server_port(self.httpd)}/index.m3u8'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_low_latency(self):
+        stream = self.httpd.stream
+        with stream.cond:
+            stream.published = 1
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        self.addCleanup(try_rm, filename)
+        params = {'logger': FakeLogger()}
+        downloader = HlsLiveFD(YoutubeDL(params), params)
+        threading.Thread(target=stream.publish, daemon=True).start()
+        self.assertTrue(downloader.real_download(filename, {
+            'id': 'live', 'url': self.url, 'protocol': 'm3u8_native', 'is_live': True,
+        }))
+
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), INIT_CONTENT + b''.join(map(segment_content, range(SEGMENT_COUNT))))
+        self.assertTrue(any('_HLS_msn=' in path and '_HLS_part=' in path for path in stream.requests))
+        # The parts of the segment that was being published were downloaded rather than the whole segment
+        self.assertNotIn('/segment/0.mp4', stream.requests)
+
+    def test_pruned_parts(self):
+        stream = self.httpd.stream
+        with stream.cond:
+            stream.published = 2
+        stream.prune_parts = True
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        self.addCleanup(try_rm, filename)
+        params = {'logger': FakeLogger()}
+        downloader = HlsLiveFD(YoutubeDL(params), params)
+        threading.Thread(target=stream.publish, daemon=True).start()
+        self.assertTrue(downloader.real_download(filename, {
+            'id': 'live', 'url': self.url, 'protocol': 'm3u8_native', 'is_live': True,
+        }))
+
+        # The rest of each segment is requested once its parts are no longer listed
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), INIT_CONTENT + b''.join(map(segment_content, range(SEGMENT_COUNT))))
+
+    def test_encrypted_without_ffmpeg(self):
+        self.httpd.stream.encrypted = True
+        params = {'logger': FakeLogger()}
+        downloader = HlsLiveFD(YoutubeDL(params), params)
+        with unittest.mock.patch.object(FFmpegFD, 'available', return_value=False), \
+                self.assertRaisesRegex(DownloadError, 'install ffmpeg'):
+            downloader.real_download('testfile.mp4', {
+                'id': 'live', 'url': self.url, 'protocol': 'm3u8_native', 'is_live': True,
+            })
+
+    def test_parse_playlist(self):
+        playlist = HlsLiveFD._parse_playlist('\n'.join((
+            '#EXTM3U',
+            '#EXT-X-TARGETDURATION:4',
+            '#EXT-X-PART-INF:PART-TARGET=1.0',
+            '#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES',
+            '#EXT-X-MEDIA-SEQUENCE:10',
+            '#EXTINF:4,',
+            '#EXT-X-BYTERANGE:100@0',
+            'seg.ts',
+            '#EXTINF:4,',
+            '#EXT-X-BYTERANGE:50',
+            'seg.ts',
+            '#EXT-X-PART:DURATION=1.0,URI="part.ts",BYTERANGE=20@150',
+            '#EXT-X-PART:DURATION=1.0,URI="part.ts",BYTERANGE=20',
+            '#EXT-X-PART:DURATION=1.0,URI="gap.ts",GAP=YES',
+            '#EXT-X-PRELOAD-HINT:TYPE=PART,URI="next.ts"',
+        )), 'https://example.com/live/index.m3u8')
+
+        self.assertEqual(playlist['target_duration'], 4)
+        self.assertEqual(playlist['part_target'], 1)
+        self.assertTrue(playlist['can_block_reload'])
+        self.assertFalse(playlist['ended'])
+        self.assertFalse(playlist['encrypted'])
+        self.assertEqual(playlist['preload_hint'], {'url': 'https://example.com/live/next.ts'})
+        self.assertEqual([
+            (segment['msn'], segment['url'], segment['byte_range'], len(segment['parts']))
+            for segment in playlist['segments']
+        ], [
+            (10, 'https://example.com/live/seg.ts', {'start': 0, 'end': 100}, 0),
+            (11, 'https://example.com/live/seg.ts', {'start': 100, 'end': 150}, 0),
+            (12, None, None, 3),
+        ])
+        self.assertEqual(playlist['segments'][2]['parts'], [
+            {'url': 'https://example.com/live/part.ts', 'byte_range': {'start': 150, 'end': 170}, 'gap': False},
+            {'url': 'https://example.com/live/part.ts', 'byte_range': {'start': 170, 'end': 190}, 'gap': False},
+            {'url': 'https://example.com/live/gap.ts', 'byte_range': None, 'gap': True},
+        ])
+
+    def test_suitable_downloader(self):
+        info_dict = {'url': self.url, 'protocol': 'm3u8_native', 'is_live': True}
+        self.assertIs(get_suitable_downloader(info_dict, {'external_downloader': {'m3u8': 'native'}}), HlsLiveFD)
+        self.assertIs(get_suitable_downloader(info_dict, {'hls_prefer_native': True}), HlsLiveFD)
+
+
+if __name__ == '__main__':
+    unittest.main()
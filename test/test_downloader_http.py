@@ -9,18 +9,23 @@
 
 
 import http.server
+import json
 import re
 import threading
+import time
 
 from test.helper import http_server_port, try_rm
 from yt_dlp import YoutubeDL
 from yt_dlp.downloader.http import HttpFD
+from yt_dlp.utils import ThrottledDownload
 from yt_dlp.utils._utils import _YDLLogger as FakeLogger
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 TEST_SIZE = 10 * 1024
+SEGMENTED_TEST_DATA = bytes(i % 251 for i in range(TEST_SIZE))
+LAST_MODIFIED = 'Wed, 21 Oct 2015 07:28:00 GMT'
 
 
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
@@ -54,8 +59,27 @@ def serve(self, range=True, content_length=True):
         self.end_headers()
         self.wfile.write(b'#' * size)
 
+    def serve_segmented(self):
+        mobj = re.search(r'^bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if not mobj:
+            self.send_response(200)
+            self.send_header('Content-Length', TEST_SIZE)
+            self.end_headers()
+            self.wfile.write(SEGMENTED_TEST_DATA)
+            return
+        start, end = int(mobj.group(1)), min(int(mobj.group(2) or TEST_SIZE - 1), TEST_SIZE - 1)
+        self.send_response(206)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.send_header('Content-Range', f'bytes {start}-{end}/{TEST_SIZE}')
+        self.send_header('Content-Length', end - start + 1)
+        self.end_headers()
+        self.wfile.write(SEGMENTED_TEST_DATA[start:end + 1])
+
     def do_GET(self):
-        if self.path == '/regular':
+        if self.path == '/segmented':
+            self.serve_segmented()
+        elif self.path == '/regular':
             self.serve()
         elif self.path == '/no-content-length':
             self.serve(content_length=False)
@@ -100,6 +124,67 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    def segmented_download(self, params, state=None, expected=SEGMENTED_TEST_DATA):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HttpFD(ydl, params)
+        downloader._MIN_SEGMENT_SIZE = 1024
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        self.addCleanup(try_rm, filename)
+        self.addCleanup(try_rm, f'{filename}.part')
+        self.addCleanup(try_rm, f'{filename}.ytdl')
+        if state:
+            with open(f'{filename}.part', 'wb') as f:
+                f.write(bytes(TEST_SIZE))
+                for segment in state['downloader']['http_segments']:
+                    f.seek(segment['start'])
+                    f.write(SEGMENTED_TEST_DATA[segment['start']:segment['start'] + segment['downloaded']])
+            with open(f'{filename}.ytdl', 'w') as f:
+                json.dump(state, f)
+        info_dict = {'url': f'http://127.0.0.1:{self.port}/segmented'}
+        self.assertTrue(downloader.real_download(filename, info_dict))
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+        self.assertFalse(os.path.exists(f'{filename}.ytdl'))
+        return info_dict
+
+    def test_segmented(self):
+        self.segmented_download({'http_connections': 4})
+        # Servers without range support fall back to a single connection
+        self.download_all({'http_connections': 4})
+
+    def test_segmented_resume(self):
+        self.segmented_download({'http_connections': 2}, {'downloader': {
+            'total_bytes': TEST_SIZE,
+            'http_segments': [
+                {'start': 0, 'end': 5119, 'downloaded': 5119},
+                {'start': 5120, 'end': TEST_SIZE - 1, 'downloaded': 1000},
+            ],
+        }})
+
+    def test_segmented_resume_single_connection(self):
+        # The .part file of a download without byte ranges is resumed rather than overwritten
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(b'#' * 3000)
+        self.segmented_download({'http_connections': 2}, expected=b'#' * 3000 + SEGMENTED_TEST_DATA[3000:])
+
+    def test_segmented_updatetime(self):
+        info_dict = self.segmented_download({'http_connections': 4, 'updatetime': True})
+        self.assertEqual(info_dict['filetime'], 1445412480)
+
+    def test_segmented_throttled(self):
+        params = {
+            'http_connections': 2, 'ratelimit': 2048, 'throttledratelimit': 1024 * 1024, 'logger': FakeLogger()}
+        downloader = HttpFD(YoutubeDL(params), params)
+        downloader._MIN_SEGMENT_SIZE = 1024
+        self.addCleanup(try_rm, 'testfile.mp4.part')
+        self.addCleanup(try_rm, 'testfile.mp4.ytdl')
+        start = time.monotonic()
+        with self.assertRaises(ThrottledDownload):
+            downloader.real_download('testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/segmented'})
+        self.assertLess(time.monotonic() - start, 4.5)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import threading
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.common import FileDownloader
+from yt_dlp.downloader._scheduler import (
+    BandwidthScheduler,
+    DownloadThrottle,
+    TokenBucket,
+    TransferScheduler,
+)
+
+
+class TestTransferScheduler(unittest.TestCase):
+    def test_limits(self):
+        scheduler = TransferScheduler(max_workers=3)
+        lock = threading.Lock()
+        running = {'total': 0, 'a': 0, 'b': 0}
+        max_running = dict.fromkeys(running, 0)
+
+        def transfer(name):
+            with lock:
+                for key in ('total', name):
+                    running[key] += 1
+                    max_running[key] = max(max_running[key], running[key])
+            time.sleep(0.01)
+            with lock:
+                for key in ('total', name):
+                    running[key] -= 1
+            return name
+
+        with scheduler.executor(2) as a, scheduler.executor(4) as b:
+            futures = [a.submit(transfer, 'a') for _ in range(10)] + [b.submit(transfer, 'b') for _ in range(10)]
+            self.assertEqual([future.result() for future in futures], ['a'] * 10 + ['b'] * 10)
+        self.assertEqual(max_running['a'], 2)
+        self.assertLessEqual(max_running['b'], 3)
+        self.assertEqual(max_running['total'], 3)
+        self.assertLessEqual(scheduler._workers, 3)
+
+    def test_per_instance(self):
+        params = {'max_concurrent_transfers': 1}
+        with FileDownloader(YoutubeDL(params), params)._transfer_executor(4) as executor:
+            self.assertEqual(executor._scheduler.max_workers, 1)
+
+        # The limit of an earlier instance does not apply to the later ones
+        with FileDownloader(YoutubeDL({}), {})._transfer_executor(4) as executor:
+            self.assertIsNone(executor._scheduler.max_workers)
+
+    def test_fairness(self):
+        scheduler = TransferScheduler(max_workers=1)
+        gate = threading.Event()
+        order = []
+        with scheduler.executor(1) as blocker, scheduler.executor(4) as a, scheduler.executor(4) as b:
+            blocked = blocker.submit(gate.wait)
+            # a queues all its transfers before b, but they take turns
+            futures = [a.submit(order.append, f'a{i}') for i in range(3)]
+            futures += [b.submit(order.append, f'b{i}') for i in range(3)]
+            gate.set()
+            blocked.result()
+            for future in futures:
+                future.result()
+        self.assertEqual(order, ['a0', 'b0', 'a1', 'b1', 'a2', 'b2'])
+
+    def test_nested(self):
+        scheduler = TransferScheduler(max_workers=1)
+
+        def outer():
+            with scheduler.executor(2) as inner:
+                return [future.result() for future in [inner.submit(lambda: 1), inner.submit(lambda: 2)]]
+
+        with scheduler.executor(1) as executor:
+            self.assertEqual(executor.submit(outer).result(timeout=10), [1, 2])
+
+    def test_errors(self):
+        scheduler = TransferScheduler()
+        with scheduler.executor(1) as executor:
+            with self.assertRaises(ZeroDivisionError):
+                executor.submit(lambda: 1 / 0).result()
+            self.assertEqual(list(executor.map(str, range(3))), ['0', '1', '2'])
+        with self.assertRaises(RuntimeError):
+            executor.submit(str)
+
+    def test_cancel(self):
+        scheduler = TransferScheduler(max_workers=1)
+        started, gate = threading.Event(), threading.Event()
+        executor = scheduler.executor(1)
+        blocked = executor.submit(lambda: started.set() or gate.wait())
+        started.wait()
+        queued = executor.submit(str)
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.assertTrue(queued.cancelled())
+        gate.set()
+        self.assertTrue(blocked.result())
+        self.assertEqual(list(scheduler._executors), [])
+
+    def test_wake_timed_out_worker(self):
+        scheduler = TransferScheduler()
+        scheduler._IDLE_TIMEOUT = 0.05
+        with scheduler.executor(1) as executor:
+            executor.submit(str).result()
+            while True:
+                with scheduler._lock:
+                    if scheduler._idle:
+                        # The wait of the idle worker times out before it is woken
+                        time.sleep(0.2)
+                        scheduler._wake_worker()
+                        break
+                time.sleep(0.01)
+            self.assertEqual(executor.submit(lambda: 1).result(timeout=5), 1)
+            with scheduler._lock:
+                self.assertGreaterEqual(scheduler._idle, 0)
+
+
+class TestBandwidthScheduler(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(100000)
+        start = time.monotonic()
+        waited = sum(bucket.consume(10000) for _ in range(6))
+        elapsed = time.monotonic() - start
+        # The first transfer does not wait; the others wait for the bucket to be refilled
+        self.assertGreaterEqual(elapsed, 0.45)
+        self.assertLess(elapsed, 2)
+        self.assertGreaterEqual(waited, 0.45)
+        self.assertEqual(TokenBucket().consume(10 ** 9), 0)
+
+    def test_token_bucket_priority(self):
+        bucket = TokenBucket(100000)
+        bucket.charge(20000)
+        order = []
+
+        def consume(name, priority):
+            bucket.consume(10000, priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=consume, args=('vod', 1))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=consume, args=('live', 0)))
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+        # The live transfer started waiting later, but goes first
+        self.assertEqual(order, ['live', 'vod'])
+
+    def test_host_connections(self):
+        scheduler = BandwidthScheduler(max_host_connections=2)
+        lock = threading.Lock()
+        connections = {}
+        max_connections = {}
+
+        def connect(host):
+            with scheduler.connection(host):
+                with lock:
+                    connections[host] = connections.get(host, 0) + 1
+                    max_connections[host] = max(max_connections.get(host, 0), connections[host])
+                time.sleep(0.01)
+                with lock:
+                    connections[host] -= 1
+
+        threads = [threading.Thread(target=connect, args=(host,)) for host in ('a', 'b') * 5]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max_connections, {'a': 2, 'b': 2})
+        self.assertEqual(scheduler._connections, {})
+
+    def test_host_connections_priority(self):
+        scheduler = BandwidthScheduler(max_host_connections=1)
+        order = []
+
+        def connect(name, priority):
+            with scheduler.connection('host', priority):
+                order.append(name)
+
+        with scheduler.connection('host'):
+            threads = [threading.Thread(target=connect, args=(name, priority))
+                       for name, priority in (('vod1', 1), ('live', 0), ('vod2', 1))]
+            for thread in threads:
+                thread.start()
+                time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ['live', 'vod1', 'vod2'])
+
+    def test_download_throttle(self):
+        scheduler = BandwidthScheduler()
+        throttle = DownloadThrottle(scheduler, 100000, 'live')
+        self.assertTrue(throttle.limited)
+        for _ in range(3):
+            throttle.consume(10000)
+        self.assertGreaterEqual(throttle.wait_time, 0.15)
+        self.assertFalse(DownloadThrottle(scheduler).limited)
+
+        scheduler.max_host_connections = 1
+        with throttle.connection('https://Example.com/video'):
+            self.assertEqual(scheduler._connections, {'example.com': 1})
+
+    def test_per_instance(self):
+        params = {'global_ratelimit': 1000, 'max_host_connections': 1}
+        throttle = FileDownloader(YoutubeDL(params), params)._get_throttle()
+        self.assertTrue(throttle.limited)
+        self.assertEqual(throttle._scheduler.rate, 1000)
+
+        # The limits of an earlier instance do not apply to the later ones
+        throttle = FileDownloader(YoutubeDL({}), {})._get_throttle()
+        self.assertFalse(throttle.limited)
+        self.assertIsNone(throttle._scheduler.rate)
+        self.assertIsNone(throttle._scheduler.max_host_connections)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import functools
+
+import pytest
+
+from yt_dlp.extractor.youtube.jsc._builtin.ejs import (
+    Script,
+    ScriptSource,
+    ScriptType,
+    ScriptVariant,
+)
+from yt_dlp.extractor.youtube.jsc._builtin.node import NodeJCP
+from yt_dlp.extractor.youtube.jsc.provider import (
+    JsChallengeProviderError,
+    JsChallengeProviderResponse,
+    JsChallengeRequest,
+    JsChallengeResponse,
+    JsChallengeType,
+    NChallengeInput,
+    NChallengeOutput,
+)
+
+# Stand-in for the solver: "preprocesses" a player by prefixing it and reverses the challenges
+FAKE_LIB = 'var lib = {};'
+FAKE_CORE = '''
+var jsc = (input) => {
+  let preprocessed = input.preprocessed_player;
+  if (input.type === 'player') {
+    if (input.player === 'broken') {
+      throw new Error('broken player');
+    }
+    preprocessed = `preprocessed:${input.player}`;
+  }
+  const output = {
+    type: 'result',
+    responses: input.requests.map((request) => ({
+      type: 'result',
+      data: Object.fromEntries(request.challenges.map((c) => [c, `${preprocessed}:${c.split('').reverse().join('')}`])),
+    })),
+  };
+  if (input.output_preprocessed) {
+    output.preprocessed_player = preprocessed;
+  }
+  return output;
+};
+'''
+
+
+class FakeNodeJCP(NodeJCP):
+    _WORKER_MAX_PLAYERS = 2
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.player_requests = []
+
+    @functools.cached_property
+    def _lib_script(self, /):
+        return Script(ScriptType.LIB, ScriptVariant.UNMINIFIED, ScriptSource.BUILTIN, '0', FAKE_LIB)
+
+    @functools.cached_property
+    def _core_script(self, /):
+        return Script(ScriptType.CORE, ScriptVariant.UNMINIFIED, ScriptSource.BUILTIN, '0', FAKE_CORE)
+
+    def _get_player(self, video_id, player_url):
+        self.player_requests.append(player_url)
+        return player_url.rpartition('/')[2]
+
+
+@pytest.fixture
+def jcp(ie, logger):
+    obj = FakeNodeJCP(ie, logger, None)
+    if not obj.is_available():
+        pytest.skip(f'{obj.PROVIDER_NAME} is not available')
+    yield obj
+    obj.close()
+
+
+def make_request(player, challenge):
+    return JsChallengeRequest(JsChallengeType.N, NChallengeInput(f'https://example.com/{player}', [challenge]), 'id')
+
+
+def expected_response(request, player):
+    challenge = request.input.challenges[0]
+    return JsChallengeProviderResponse(request, JsChallengeResponse(
+        JsChallengeType.N, NChallengeOutput({challenge: f'preprocessed:{player}:{challenge[::-1]}'})))
+
+
+def test_worker_reused(jcp):
+    requests = [make_request('a', 'abc'), make_request('b', 'def'), make_request('a', 'ghi')]
+    assert list(jcp.bulk_solve(requests)) == [
+        expected_response(requests[0], 'a'), expected_response(requests[2], 'a'), expected_response(requests[1], 'b')]
+    pid = jcp._worker.proc.pid
+
+    request = make_request('a', 'jkl')
+    assert list(jcp.bulk_solve([request])) == [expected_response(request, 'a')]
+    assert jcp._worker.proc.pid == pid
+    # Each player is only requested and preprocessed once
+    assert jcp.player_requests == ['https://example.com/a', 'https://example.com/b']
+
+
+def test_worker_evicts_players(jcp):
+    for player in ('a', 'b', 'c', 'a'):
+        request = make_request(player, 'abc')
+        assert list(jcp.bulk_solve([request])) == [expected_response(request, player)]
+    assert jcp.player_requests == [f'https://example.com/{player}' for player in ('a', 'b', 'c', 'a')]
+
+
+def test_worker_error(jcp):
+    with pytest.raises(JsChallengeProviderError, match='broken player'):
+        list(jcp.bulk_solve([make_request('broken', 'abc')]))
+    # A failed solve does not affect the worker
+    request = make_request('a', 'abc')
+    assert list(jcp.bulk_solve([request])) == [expected_response(request, 'a')]
+    assert jcp._use_worker
+
+
+def test_worker_fallback(jcp):
+    request = make_request('a', 'abc')
+    assert list(jcp.bulk_solve([request])) == [expected_response(request, 'a')]
+    jcp._worker.proc.kill()
+    jcp._worker.proc.wait()
+
+    request = make_request('b', 'def')
+    assert list(jcp.bulk_solve([request])) == [expected_response(request, 'b')]
+    assert not jcp._use_worker
+    assert jcp._worker is None
+
+
+class HangingNodeJCP(FakeNodeJCP):
+    _WORKER_TIMEOUT = 0.5
+
+    def _construct_worker_script(self, /):
+        # Reads the messages, but never replies
+        return 'process.stdin.resume();'
+
+
+def test_worker_timeout(ie, logger):
+    jcp = HangingNodeJCP(ie, logger, None)
+    if not jcp.is_available():
+        pytest.skip(f'{jcp.PROVIDER_NAME} is not available')
+    worker = jcp._get_worker()
+    request = make_request('a', 'abc')
+    # The challenges are solved without the worker instead
+    assert list(jcp.bulk_solve([request])) == [expected_response(request, 'a')]
+    assert worker.proc.poll() is not None
+    assert not jcp._use_worker
+    assert jcp._worker is None
+    jcp.close()
+
+
+def test_worker_disabled(ie, logger):
+    ie._downloader.params['extractor_args'] = {'youtube-ejs': {'worker': ['false']}}
+    jcp = FakeNodeJCP(ie, logger, None)
+    if not jcp.is_available():
+        pytest.skip(f'{jcp.PROVIDER_NAME} is not available')
+    request = make_request('a', 'abc')
+    assert list(jcp.bulk_solve([request])) == [expected_response(request, 'a')]
+    assert jcp._worker is None
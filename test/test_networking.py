@@ -237,6 +237,14 @@ def do_GET(self):
             self.send_header('Content-Length', str(len(payload)))
             self.end_headers()
             self.wfile.write(payload)
+        elif self.path == '/drop_connection':
+            # Close the connection without announcing it with a "Connection: close" header
+            payload = b'<html></html>'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            self.close_connection = True
         elif self.path.startswith('/gen_'):
             payload = b'<html></html>'
             self.send_response(int(self.path[len('/gen_'):]))
@@ -931,6 +939,47 @@ def test_http_response_auto_close(self, handler):
             assert res.fp.fp is None
             assert res.closed
 
+    def test_keep_alive(self, handler):
+        with handler(verify=False) as rh:
+            for _ in range(3):
+                res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200'))
+                assert res.read() == b'<html></html>'
+            for _ in range(2):
+                res = validate_and_send(rh, Request(f'https://127.0.0.1:{self.https_port}/gen_200'))
+                assert res.read() == b'<html></html>'
+            stats = rh.connection_stats()
+            assert (stats.opened, stats.reused) == (2, 3)
+            assert stats.reuse_ratio == 0.6
+
+            # Connections of partially read responses cannot be reused
+            res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200'))
+            assert res.read(1) == b'<'
+            res.close()
+            validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200')).read()
+            assert (stats.opened, stats.reused) == (3, 4)
+
+    def test_keep_alive_dropped_connection(self, handler):
+        with handler() as rh:
+            for _ in range(3):
+                res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/drop_connection'))
+                assert res.read() == b'<html></html>'
+                time.sleep(0.1)
+            assert rh.connection_stats().opened == 3
+
+    def test_keep_alive_disabled(self, handler):
+        with handler(connection_pool_size=0) as rh:
+            for _ in range(2):
+                res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers'))
+                assert b'Connection: close' in res.read()
+            assert rh.connection_stats().reused == 0
+
+    def test_keep_alive_idle_timeout(self, handler):
+        with handler(connection_idle_timeout=0.1) as rh:
+            validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200')).read()
+            time.sleep(0.2)
+            validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200')).read()
+            assert rh.connection_stats().opened == 2
+
     def test_data_uri_partial_read_then_full_read(self, handler):
         with handler() as rh:
             res = validate_and_send(rh, Request('data:text/plain,hello%20world'))
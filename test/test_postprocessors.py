@@ -8,12 +8,26 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import collections
+import json
 import subprocess
+import tempfile
+import unittest.mock
 
 from yt_dlp import YoutubeDL
-from yt_dlp.utils import shell_quote
+from yt_dlp.subtitles import SubtitlesConversionError, convert_subtitles
+from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessorError
+from yt_dlp.utils import Popen, shell_quote
 from yt_dlp.postprocessor import (
     ExecPP,
+    FFmpegCombinedPP,
+    FFmpegEmbedSubtitlePP,
+    FFmpegFixupDurationPP,
+    FFmpegFixupM3u8PP,
+    FFmpegMergerPP,
+    FFmpegMetadataPP,
+    FFmpegPostProcessor,
+    FFmpegSubtitlesConvertorPP,
     FFmpegThumbnailsConvertorPP,
     MetadataFromFieldPP,
     MetadataParserPP,
@@ -76,6 +90,94 @@ def test_escaping(self):
         os.remove(initial_file)
 
 
+_TEST_VTT = b'''WEBVTT
+Kind: captions
+
+00:00:01.000 --> 00:00:02.500 align:start position:0%
+Hello <c.colorE5E5E5><00:00:01.500><c> world</c></c> &amp; {friends}
+
+00:01:03.000 --> 01:00:04.005
+<b>Bold</b> and <i.loud>italic</i>
+second line
+'''
+
+
+class TestSubtitlesConvertor(unittest.TestCase):
+    def test_convert_subtitles(self):
+        self.assertEqual(convert_subtitles(_TEST_VTT, 'vtt', 'srt'), '''1
+00:00:01,000 --> 00:00:02,500
+Hello  world & {friends}
+
+2
+00:01:03,000 --> 01:00:04,005
+<b>Bold</b> and <i>italic</i>
+second line
+
+''')
+        self.assertTrue(convert_subtitles(_TEST_VTT, 'vtt', 'ass').endswith(
+            'Dialogue: 0,0:00:01.00,0:00:02.50,Default,,0,0,0,,Hello  world & \\{friends\\}\n'
+            'Dialogue: 0,0:01:03.00,1:00:04.00,Default,,0,0,0,,{\\b1}Bold{\\b0} and {\\i1}italic{\\i0}\\Nsecond line\n'))
+        self.assertEqual(
+            convert_subtitles(convert_subtitles(_TEST_VTT, 'vtt', 'srt').encode(), 'srt', 'vtt'), '''WEBVTT
+
+00:00:01.000 --> 00:00:02.500
+Hello  world &amp; {friends}
+
+00:01:03.000 --> 01:00:04.005
+<b>Bold</b> and <i>italic</i>
+second line
+
+''')
+
+        srv3 = (
+            b'<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>'
+            b'<p t="0" d="1500" w="1"><s>1 &lt; 2</s><s t="200"> words</s></p>'
+            b'<p t="1500" d="10" a="1">\n</p><p t="2000" d="1000">line 1\nline 2</p></body></timedtext>')
+        json3 = (
+            b'{"events": [{"tStartMs": 0, "dDurationMs": 1500, "segs": [{"utf8": "1 < 2"}, {"utf8": " words"}]},'
+            b'{"tStartMs": 1500, "aAppend": 1, "segs": [{"utf8": "\\n"}]},'
+            b'{"tStartMs": 2000, "dDurationMs": 1000, "segs": [{"utf8": "line 1\\nline 2"}]}]}')
+        srt = '''1
+00:00:00,000 --> 00:00:01,500
+1 < 2 words
+
+2
+00:00:02,000 --> 00:00:03,000
+line 1
+line 2
+
+'''
+        self.assertEqual(convert_subtitles(srv3, 'srv3', 'srt'), srt)
+        self.assertEqual(convert_subtitles(json3, 'json3', 'srt'), srt)
+        self.assertEqual(convert_subtitles(
+            b'<transcript><text start="1.5" dur="2">It&amp;#39;s</text></transcript>', 'srv1', 'vtt'),
+            'WEBVTT\n\n00:00:01.500 --> 00:00:03.500\nIt\'s\n\n')
+
+        self.assertRaises(SubtitlesConversionError, convert_subtitles, b'not vtt', 'vtt', 'srt')
+        self.assertRaises(SubtitlesConversionError, convert_subtitles, _TEST_VTT, 'vtt', 'lrc')
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, 'video.en.vtt')
+            with open(filepath, 'wb') as f:
+                f.write(_TEST_VTT)
+            info = {
+                'requested_subtitles': {'en': {'ext': 'vtt', 'filepath': filepath}},
+                '__files_to_move': {filepath: 'final/video.en.vtt'},
+            }
+            pp = FFmpegSubtitlesConvertorPP(YoutubeDL({'logger': None, 'quiet': True}), 'srt')
+            # Only unsupported conversions need ffmpeg
+            pp.run_ffmpeg = None
+            files_to_delete, info = pp.run(info)
+
+            new_filepath = os.path.join(tmpdir, 'video.en.srt')
+            self.assertEqual(files_to_delete, [filepath])
+            self.assertEqual(info['requested_subtitles']['en']['filepath'], new_filepath)
+            self.assertEqual(info['__files_to_move'][new_filepath], 'final/video.en.srt')
+            with open(new_filepath, encoding='utf-8') as f:
+                self.assertEqual(f.read(), info['requested_subtitles']['en']['data'])
+
+
 class TestExec(unittest.TestCase):
     def test_parse_cmd(self):
         pp = ExecPP(YoutubeDL(), '')
@@ -611,6 +713,24 @@ def test_make_concat_opts_NoZeroDurationChunkAtVideoEnd(self):
         opts = self._pp._make_concat_opts(sponsor_chapters, 20)
         self.assertEqual(expected, ''.join(self._pp._concat_spec(['test'] * len(opts), opts)))
 
+    def test_make_smart_cut_parts_CommonCase(self):
+        sponsor_chapters = [self._chapter(1, 2, 's1'), self._chapter(10, 20, 's2')]
+        opts = self._pp._make_concat_opts(sponsor_chapters, 30)
+        self.assertEqual(self._pp._make_smart_cut_parts(opts, [0, 4, 8, 12, 16, 20, 24, 28], 30), [
+            (0, 1, False), (2, 4, False), (4, 8, True), (8, 10, False), (20, None, True)])
+
+    def test_make_smart_cut_parts_NoKeyframeInSegment(self):
+        sponsor_chapters = [self._chapter(0, 2, 's1'), self._chapter(5, 6, 's2')]
+        opts = self._pp._make_concat_opts(sponsor_chapters, 30)
+        self.assertEqual(self._pp._make_smart_cut_parts(opts, [0, 10], 30), [
+            (2, 5, False), (6, 10, False), (10, None, True)])
+
+    def test_make_smart_cut_parts_CutsAtKeyframes(self):
+        sponsor_chapters = [self._chapter(4, 8, 's1')]
+        opts = self._pp._make_concat_opts(sponsor_chapters, 12)
+        self.assertEqual(self._pp._make_smart_cut_parts(opts, [0, 4.0004, 8.0004], 12), [
+            (0, 4, True), (8, None, True)])
+
     def test_quote_for_concat_RunsOfQuotes(self):
         self.assertEqual(
             r"'special '\'' '\'\''characters'\'\'\''galore'",
@@ -627,5 +747,263 @@ def test_quote_for_concat_QuotesAtEnd(self):
             self._pp._quote_for_ffmpeg("special ' characters ' galore'''"))
 
 
+class TestModifyChaptersSmartCut(unittest.TestCase):
+    METADATA = {
+        'streams': [{
+            'codec_name': 'h264', 'profile': 'High', 'level': 40, 'pix_fmt': 'yuv420p', 'time_base': '1/12800'}],
+        'packets': [{'pts_time': f'{t}.000000', 'flags': 'K__' if t % 4 == 0 else '___'} for t in range(30)],
+        'format': {'duration': '30.000000'},
+    }
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.filename = os.path.join(self._tmpdir.name, 'video.mp4')
+        with open(self.filename, 'w'):
+            pass
+        self.encoded, self.concatenated, self.warnings = [], [], []
+        self.decodes = True
+        self._pp = ModifyChaptersPP(YoutubeDL({'quiet': True}))
+        self._pp.report_warning = self.warnings.append
+        for name, func in (
+            ('get_metadata_object', lambda *_: self.METADATA),
+            ('real_run_ffmpeg', self._real_run_ffmpeg),
+            ('concat_files', self._concat_files),
+            ('_decodes', lambda *_: self.decodes),
+            ('force_keyframes', lambda filename, _: filename),
+        ):
+            patcher = unittest.mock.patch.object(ModifyChaptersPP, name, side_effect=func)
+            self.addCleanup(patcher.stop)
+            setattr(self, name, patcher.start())
+
+    def _real_run_ffmpeg(self, inputs, outputs):
+        self.encoded.append((inputs[0][1], outputs[0][1]))
+        with open(outputs[0][0], 'w'):
+            pass
+
+    def _concat_files(self, in_files, out_file, concat_opts):
+        self.concatenated.append(([os.path.basename(f) for f in in_files], concat_opts))
+        with open(out_file, 'w'):
+            pass
+
+    def _remove_chapters(self, chapters):
+        return self._pp.remove_chapters(
+            self.filename, chapters, self._pp._make_concat_opts(chapters, 30), smart_cut=True)
+
+    def test_smart_cut(self):
+        out_file = self._remove_chapters([{'start_time': 0, 'end_time': 2}, {'start_time': 10, 'end_time': 20}])
+        self.assertTrue(os.path.exists(out_file))
+        self.assertEqual(self.concatenated, [(
+            ['video.part0.temp.mp4', 'video.mp4', 'video.part1.temp.mp4', 'video.mp4'],
+            [{}, {'inpoint': '4.000000', 'outpoint': '8.000000'}, {}, {'inpoint': '20.000000'}])])
+        self.assertEqual([(i, o[:4]) for i, o in self.encoded], [
+            (['-ss', '0.000000'], ['-ss', '2.000000', '-t', '2.000000']),
+            (['-ss', '8.000000'], ['-ss', '0.000000', '-t', '2.000000']),
+        ])
+        opts = self.encoded[0][1]
+        for opt in (
+            ['-c:v:0', 'libx264'], ['-x264-params', 'repeat-headers=1'], ['-profile:v:0', 'high'],
+            ['-level:v:0', '4.0'], ['-pix_fmt:v:0', 'yuv420p'], ['-video_track_timescale', '12800'],
+        ):
+            self.assertIn(opt, [opts[i:i + 2] for i in range(len(opts) - 1)])
+        # The joined output is checked where each part starts
+        self.assertEqual(self._decodes.call_args[0][1], [2, 6, 8])
+        self.force_keyframes.assert_not_called()
+        self.assertFalse(self.warnings)
+        self.assertCountEqual(os.listdir(self._tmpdir.name), ['video.mp4', 'video.temp.mp4'])
+
+    def test_fallback(self):
+        for metadata, decodes in (
+            ({**self.METADATA, 'streams': [{'codec_name': 'mpeg4'}]}, True),
+            ({**self.METADATA, 'streams': [{**self.METADATA['streams'][0], 'profile': 'Extended'}]}, True),
+            (self.METADATA, False),
+        ):
+            with self.subTest(metadata=metadata['streams'], decodes=decodes):
+                self.METADATA, self.decodes = metadata, decodes
+                self.force_keyframes.reset_mock()
+                self.warnings.clear()
+                self._remove_chapters([{'start_time': 10, 'end_time': 20}])
+                self.force_keyframes.assert_called_once()
+                self.assertEqual(len(self.warnings), 1)
+                self.assertFalse([f for f in os.listdir(self._tmpdir.name) if '.part' in f])
+
+
+class TestFFmpegCombined(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.calls = []
+        patcher = unittest.mock.patch.object(FFmpegPostProcessor, 'available', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _path(self, name):
+        return os.path.join(self._tmpdir.name, name)
+
+    def _run_ffmpeg(self, input_paths, out_path, opts):
+        self.calls.append((list(input_paths), list(opts)))
+        if self.fail_combined and len(self.calls) == 1:
+            raise FFmpegPostProcessorError('Invalid argument')
+        with open(out_path, 'w'):
+            pass
+
+    def _post_process(self, compat_opts=(), fail_combined=False):
+        self.fail_combined = fail_combined
+        files = ['video.f1.mp4', 'video.f2.m4a', 'video.en.vtt']
+        for name in files:
+            with open(self._path(name), 'w'):
+                pass
+        info = {
+            'id': 'video', 'title': 'Video', 'ext': 'mp4', 'filepath': self._path('video.mp4'),
+            'vcodec': 'avc1', 'acodec': 'mp4a',
+            'requested_formats': [
+                {'url': 'https://example.com/v', 'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'https'},
+                {'url': 'https://example.com/a', 'vcodec': 'none', 'acodec': 'mp4a', 'protocol': 'https'},
+            ],
+            '__files_to_merge': [self._path('video.f1.mp4'), self._path('video.f2.m4a')],
+            'requested_subtitles': {'en': {'ext': 'vtt', 'filepath': self._path('video.en.vtt'), 'name': 'English'}},
+            'chapters': [{'start_time': 0, 'end_time': 10, 'title': 'Intro'}],
+        }
+        ydl = YoutubeDL({'quiet': True, 'compat_opts': compat_opts})
+        info['__postprocessors'] = [FFmpegMergerPP(ydl)]
+        ydl.add_post_processor(FFmpegMetadataPP(ydl), when='post_process')
+        ydl.add_post_processor(FFmpegEmbedSubtitlePP(ydl), when='post_process')
+        with unittest.mock.patch.object(FFmpegPostProcessor, 'run_ffmpeg_multiple_files', self._run_ffmpeg):
+            ydl.post_process(info['filepath'], info)
+        return files
+
+    def test_combined(self):
+        files = self._post_process()
+        self.assertEqual(len(self.calls), 1)
+        inputs, opts = self.calls[0]
+        self.assertEqual(inputs, [
+            self._path('video.f1.mp4'), self._path('video.f2.m4a'),
+            self._path('video.meta'), self._path('video.en.vtt')])
+        self.assertEqual(opts[:5], ['-c', 'copy', '-map', '0:v:0', '-map'])
+        for opt in (['-map_metadata', '2'], ['-map', '3:0'], ['-metadata:s:s:0', 'language=eng']):
+            self.assertIn(opt, [opts[i:i + 2] for i in range(len(opts) - 1)])
+        self.assertIn('title=Video', opts)
+        self.assertNotIn('-0:s', opts)
+        self.assertTrue(os.path.exists(self._path('video.mp4')))
+        for name in (*files, 'video.meta', 'video.temp.mp4'):
+            self.assertFalse(os.path.exists(self._path(name)), name)
+
+    def test_fallback(self):
+        self._post_process(fail_combined=True)
+        self.assertEqual([inputs[-1] for inputs, _ in self.calls], [
+            self._path('video.en.vtt'), self._path('video.f2.m4a'),
+            self._path('video.meta'), self._path('video.en.vtt')])
+        self.assertTrue(os.path.exists(self._path('video.mp4')))
+
+    def test_compat_option(self):
+        self._post_process(compat_opts={'no-combined-ffmpeg'})
+        self.assertEqual(len(self.calls), 3)
+
+    def test_no_changes(self):
+        ydl = YoutubeDL({'quiet': True})
+        info = {'id': 'video', 'ext': 'webm', 'protocol': 'https', 'filepath': self._path('video.webm'), 'vcodec': 'vp9'}
+        # Neither of them would rewrite the file when run on its own
+        self.assertIsNone(FFmpegCombinedPP.combine(ydl, [
+            FFmpegFixupM3u8PP(ydl), FFmpegMetadataPP(ydl, add_chapters=True, add_metadata=False)], info))
+        self.assertIsNone(FFmpegCombinedPP.combine(ydl, [
+            FFmpegMetadataPP(ydl, add_chapters=True, add_metadata=False), FFmpegFixupDurationPP(ydl)], info))
+
+    def test_chapters_not_modified(self):
+        ydl = YoutubeDL({'quiet': True})
+        chapters = [{'start_time': 0, 'end_time': 10}, {'start_time': 10}]
+        info = {'id': 'video', 'ext': 'mp4', 'filepath': self._path('video.mp4'), 'vcodec': 'avc1', 'chapters': chapters}
+        with unittest.mock.patch.object(FFmpegPostProcessor, '_get_real_video_duration', return_value=20):
+            pp = FFmpegCombinedPP.combine(ydl, [
+                FFmpegMetadataPP(ydl, add_metadata=False), FFmpegFixupDurationPP(ydl)], info)
+        self.assertIsNotNone(pp)
+        self.assertEqual(info['chapters'], [{'start_time': 0, 'end_time': 10}, {'start_time': 10}])
+
+
+class TestFFprobeCache(unittest.TestCase):
+    METADATA = {
+        'streams': [
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac'},
+            {'index': 2, 'codec_type': 'attachment', 'tags': {'mimetype': 'application/json'}},
+        ],
+        'format': {'format_name': 'matroska,webm', 'duration': '12.500000'},
+    }
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.filename = os.path.join(self._tmpdir.name, 'video.mkv')
+        with open(self.filename, 'w') as f:
+            f.write('video')
+        self.pp = FFmpegPostProcessor()
+        self.pp.basename, self.pp.probe_basename = 'ffmpeg', 'ffprobe'
+        self.commands = []
+        for target, attr, new in (
+            (FFmpegPostProcessor, 'check_version', lambda _: None),
+            (FFmpegPostProcessor, '_probe_cache', collections.OrderedDict()),
+            (Popen, 'run', self._run),
+        ):
+            patcher = unittest.mock.patch.object(target, attr, new)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, cmd, **kwargs):
+        self.commands.append(cmd)
+        return json.dumps(self.METADATA), '', 0
+
+    def test_cache(self):
+        self.assertEqual(self.pp.get_metadata_object(self.filename), self.METADATA)
+        self.assertEqual(self.pp.get_audio_codec(self.filename), 'aac')
+        self.assertEqual(self.pp.get_stream_number(self.filename, ('tags', 'mimetype'), 'application/json'), (2, 3))
+        self.assertEqual(self.pp._get_real_video_duration(self.filename), 12.5)
+        self.assertEqual(len(self.commands), 1)
+        self.assertIn('-show_streams', self.commands[0])
+        self.assertIn('-show_format', self.commands[0])
+
+        # The cached object is not modified by the callers
+        self.pp.get_metadata_object(self.filename)['streams'].clear()
+        self.assertEqual(self.pp.get_metadata_object(self.filename), self.METADATA)
+        self.assertEqual(len(self.commands), 1)
+
+        # Extra options are not cached
+        self.pp.get_metadata_object(self.filename, ['-select_streams', 'v'])
+        self.assertEqual(len(self.commands), 2)
+
+    def test_invalidation(self):
+        self.pp.get_metadata_object(self.filename)
+        # Rewritten with the same size and mtime, as ffmpeg postprocessors do
+        stat = os.stat(self.filename)
+        temp_filename = self.filename + '.temp'
+        with open(temp_filename, 'w') as f:
+            f.write('VIDEO')
+        os.utime(temp_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(temp_filename, self.filename)
+        self.pp.get_metadata_object(self.filename)
+        self.assertEqual(len(self.commands), 2)
+
+        self.pp.get_metadata_object(self.filename)
+        self.assertEqual(len(self.commands), 2)
+
+    @unittest.mock.patch.object(FFmpegPostProcessor, '_PROBE_CACHE_SIZE', 2)
+    def test_size(self):
+        filenames = []
+        for name in ('a', 'b', 'c'):
+            filenames.append(os.path.join(self._tmpdir.name, f'{name}.mkv'))
+            with open(filenames[-1], 'w') as f:
+                f.write(name)
+
+        self.pp.get_metadata_object(filenames[0])
+        self.pp.get_metadata_object(filenames[1])
+        self.pp.get_metadata_object(filenames[0])
+        self.pp.get_metadata_object(filenames[2])
+        self.assertEqual(len(self.commands), 3)
+        # The least recently used file was evicted
+        self.assertEqual(list(FFmpegPostProcessor._probe_cache), [filenames[0], filenames[2]])
+        self.pp.get_metadata_object(filenames[0])
+        self.assertEqual(len(self.commands), 3)
+        self.pp.get_metadata_object(filenames[1])
+        self.assertEqual(len(self.commands), 4)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import socket
+import tempfile
+import threading
+
+from test.helper import http_server_port
+from yt_dlp.server import BatchClient, BatchServer
+
+TEST_DATA = b'#' * 4096
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(TEST_DATA)))
+        self.end_headers()
+        self.wfile.write(TEST_DATA)
+
+
+class TestBatchServer(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{http_server_port(self.httpd)}/video.mp4'
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmpdir.cleanup()
+
+    def start_server(self, address, args=(), token=None):
+        server = BatchServer(address, ['--ignore-config', '--no-cache-dir', *args], token=token)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+        self.addCleanup(stop)
+        return server
+
+    def start_unix_server(self, args=()):
+        if not hasattr(socket, 'AF_UNIX'):
+            self.skipTest('Unix domain sockets are not supported')
+        return self.start_server(f'unix:{os.path.join(self.tmpdir.name, "server.sock")}', args)
+
+    @staticmethod
+    def run_job(server, args, token=None):
+        events = list(BatchClient(server.address, token=token, timeout=30).run(args))
+        assert events[-1]['type'] == 'result'
+        return events[-1]['retcode'], events
+
+    def test_download(self):
+        server = self.start_unix_server(['-o', os.path.join(self.tmpdir.name, '%(id)s.%(ext)s')])
+        retcode, events = self.run_job(server, [self.url])
+        self.assertEqual(retcode, 0)
+        filename = os.path.join(self.tmpdir.name, 'video.mp4')
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), TEST_DATA)
+
+        progress = [event for event in events if event['type'] == 'progress']
+        self.assertEqual(progress[-1]['status'], 'finished')
+        self.assertEqual(progress[-1]['filename'], filename)
+        self.assertEqual(progress[-1]['info_dict']['id'], 'video')
+        self.assertTrue(any(event['type'] == 'log' and event['level'] == 'info' for event in events))
+
+        # The server keeps running, so a second job downloads nothing again
+        retcode, events = self.run_job(server, [self.url])
+        self.assertEqual(retcode, 0)
+        self.assertIn('has already been downloaded', ''.join(
+            event['message'] for event in events if event['type'] == 'log'))
+
+    def test_job_options(self):
+        server = self.start_unix_server(['--simulate', '--print', 'filename', '-o', 'server.%(ext)s'])
+        retcode, events = self.run_job(server, [self.url])
+        self.assertEqual(retcode, 0)
+        self.assertEqual([event for event in events if event['type'] == 'stdout'], [
+            {'type': 'stdout', 'message': 'server.mp4'}])
+
+        retcode, events = self.run_job(server, ['-o', 'job.%(ext)s', self.url])
+        self.assertEqual(retcode, 0)
+        self.assertEqual([event for event in events if event['type'] == 'stdout'], [
+            {'type': 'stdout', 'message': 'job.mp4'}])
+
+    def test_invalid_jobs(self):
+        server = self.start_unix_server()
+        self.assertEqual(self.run_job(server, ['--no-such-option', self.url])[0], 2)
+        self.assertEqual(self.run_job(server, [])[0], 2)
+        self.assertEqual(self.run_job(server, ['--simulate', 'http://127.0.0.1:1/invalid'])[0], 1)
+
+        retcode, events = self.run_job(server, ['--no-such-option'])
+        self.assertIn('no such option: --no-such-option', events[0]['message'])
+        retcode, events = self.run_job(server, ['--help'])
+        self.assertEqual(retcode, 0)
+        self.assertIn('Usage:', events[0]['message'])
+        self.assertEqual(events[0]['type'], 'stdout')
+
+    def test_unix_socket_path(self):
+        if not hasattr(socket, 'AF_UNIX'):
+            self.skipTest('Unix domain sockets are not supported')
+        path = os.path.join(self.tmpdir.name, 'server.sock')
+        with open(path, 'w'):
+            pass
+        with self.assertRaisesRegex(ValueError, 'not a socket'):
+            BatchServer(f'unix:{path}', [])
+        self.assertTrue(os.path.isfile(path))
+        os.remove(path)
+
+        # The socket of a server that is no longer running is replaced
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(path)
+        server = self.start_server(f'unix:{path}', ['--simulate'])
+        self.assertEqual(self.run_job(server, [self.url])[0], 0)
+        with self.assertRaisesRegex(ValueError, 'already listening'):
+            BatchServer(f'unix:{path}', [])
+        self.assertEqual(self.run_job(server, [self.url])[0], 0)
+
+    def test_tcp_token(self):
+        server = self.start_server('127.0.0.1:0', ['--simulate'])
+        self.assertTrue(server.token)
+        retcode, events = self.run_job(server, [self.url])
+        self.assertEqual(retcode, 2)
+        self.assertEqual(events[0]['message'], 'ERROR: Invalid token')
+        self.assertEqual(self.run_job(server, [self.url], token=server.token)[0], 0)
+
+    def test_loopback_only(self):
+        with self.assertRaisesRegex(ValueError, 'loopback'):
+            BatchServer('0.0.0.0:0', [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -439,6 +439,25 @@ def test_traversal_filter(self):
         assert traverse_obj(data, [..., filter]) == [True, 1, 1.1, 'str', {0: 0}, [1]], \
             '`filter` should filter falsy values'
 
+    def test_traversal_compiled_paths(self):
+        data = {1: 'int', 'Key': 'value', 'list': ['a', 'b']}
+
+        for _ in range(2):
+            assert traverse_obj(data, (1,)) == 'int', 'int key should be looked up in dict'
+            assert traverse_obj(['a', 'b'], (1,)) == 'b', 'int key should index a list'
+            assert traverse_obj(['a', 'b'], (1.0,)) is None, \
+                'float key should not index a list, even when an equal int path was used'
+            assert traverse_obj(data, ('key',)) is None, 'path should be casesense by default'
+            assert traverse_obj(data, ('key',), casesense=False) == 'value', \
+                'casesense=False should not reuse a casesense path'
+            assert traverse_obj(data, ('list', -1)) == 'b', 'negative index should be supported'
+            assert traverse_obj(data, ('list', 2)) is None, 'out of range index should be `None`'
+            assert traverse_obj(data, (k for k in ('list', 0))) == 'a', 'generator path should be supported'
+            assert traverse_obj(data, ('list', ...)) == ['a', 'b'], '`...` should branch on lists'
+            assert traverse_obj({'a': {'b': 1}, 'c': None}, (..., 'b')) == [1], \
+                '`...` should branch on dict values and skip `None`'
+            assert traverse_obj('str', (...,)) == [], '`...` should not branch on str'
+
 
 class TestTraversalHelpers:
     def test_traversal_require(self):
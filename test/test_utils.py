@@ -15,6 +15,7 @@
 import ntpath
 import pickle
 import subprocess
+import tempfile
 import unittest
 import unittest.mock
 import warnings
@@ -72,6 +73,7 @@
     iri_to_uri,
     is_html,
     js_to_json,
+    json_object_end,
     jwt_decode_hs256,
     jwt_encode,
     limit_length,
@@ -134,7 +136,7 @@
     xpath_text,
     xpath_with_ns,
 )
-from yt_dlp.utils._utils import _UnsafeExtensionError
+from yt_dlp.utils._utils import _get_cached_exe_version_output, _UnsafeExtensionError
 from yt_dlp.utils.networking import (
     HTTPHeaderDict,
     escape_rfc3986,
@@ -377,6 +379,8 @@ def test_ordered_set(self):
         self.assertEqual(orderedSet([1]), [1])
         # keep the list ordered
         self.assertEqual(orderedSet([135, 1, 1, 1]), [135, 1])
+        # unhashable items
+        self.assertEqual(orderedSet([{'a': 1}, 'a', {'a': 1}, ['a'], 'a', ['a']]), [{'a': 1}, 'a', ['a']])
 
     def test_unescape_html(self):
         self.assertEqual(unescapeHTML('%20;'), '%20;')
@@ -775,6 +779,22 @@ def get_page(pagenum):
         testPL(5, 2, (2, 99), [2, 3, 4])
         testPL(5, 2, (20, 99), [])
 
+    def test_paged_list_limit_cache(self):
+        fetched = []
+
+        def get_page(pagenum):
+            fetched.append(pagenum)
+            yield from range(pagenum * 2, min(pagenum * 2 + 2, 7))
+
+        pl = OnDemandPagedList(get_page, 2)
+        pl.limit_cache(2)
+        self.assertEqual(pl.getslice(), list(range(7)))
+        self.assertEqual(list(pl._cache), [2, 3])
+        self.assertEqual(pl[5], 5)
+        self.assertEqual(pl[0], 0)
+        self.assertEqual(list(pl._cache), [2, 0])
+        self.assertEqual(fetched, [0, 1, 2, 3, 0])
+
     def test_read_batch_urls(self):
         f = io.StringIO('''\xef\xbb\xbf foo
             bar\r
@@ -1300,6 +1320,15 @@ def test_js_to_json_common_constructors(self):
         self.assertEqual(json.loads(js_to_json('new Date("123")')), '123')
         self.assertEqual(json.loads(js_to_json('new Date(\'2023-10-19\')')), '2023-10-19')
 
+    def test_json_object_end(self):
+        self.assertEqual(json_object_end('{"a": [1, {"b": 2}]}, {}'), 20)
+        self.assertEqual(json_object_end('x = [1, [2]];', 4), 12)
+        self.assertEqual(json_object_end('{"a": "}]", "b\\"}": 1}'), 22)
+        self.assertEqual(json_object_end("{a: '}', b: `}`} ;"), 16)
+        self.assertEqual(json_object_end('{a: 1 /* } */, b: 2 // }\n}'), 26)
+        self.assertIsNone(json_object_end('{"a": {}'))
+        self.assertIsNone(json_object_end('x = {}'))
+
     def test_extract_attributes(self):
         self.assertEqual(extract_attributes('<e x="y">'), {'x': 'y'})
         self.assertEqual(extract_attributes("<e x='y'>"), {'x': 'y'})
@@ -1422,6 +1451,72 @@ def test_detect_exe_version(self):
 Success at /dev/dri/renderD128.
 ffmpeg version 2.4.4 Copyright (c) 2000-2014 the FFmpeg ...'''), '2.4.4')
 
+    def test_get_cached_exe_version_output(self):
+        class FakeCache:
+            enabled = True
+
+            def __init__(self):
+                self.data = {}
+
+            def load(self, section, key):
+                return json.loads(self.data.get((section, key), 'null'))
+
+            def store(self, section, key, data):
+                self.data[(section, key)] = json.dumps(data)
+
+        cache = FakeCache()
+        outputs = iter(('ffmpeg version 1.0', 'ffmpeg version 2.0', 'ffmpeg version 3.0'))
+        with tempfile.TemporaryDirectory() as tmpdir, unittest.mock.patch(
+                'yt_dlp.utils._utils._get_exe_version_output', side_effect=lambda *_: next(outputs)) as run:
+            exe = os.path.join(tmpdir, 'ffmpeg.exe')
+            with open(exe, 'w') as f:
+                f.write('1')
+            os.chmod(exe, 0o755)
+
+            self.assertEqual(_get_cached_exe_version_output(cache, exe, ['-bsfs']), 'ffmpeg version 1.0')
+            self.assertEqual(_get_cached_exe_version_output(cache, exe, ['-bsfs']), 'ffmpeg version 1.0')
+            self.assertEqual(run.call_count, 1)
+
+            # The executable was updated
+            with open(exe, 'w') as f:
+                f.write('22')
+            self.assertEqual(_get_cached_exe_version_output(cache, exe, ['-bsfs']), 'ffmpeg version 2.0')
+            self.assertEqual(_get_cached_exe_version_output(cache, exe, ['-bsfs']), 'ffmpeg version 2.0')
+            self.assertEqual(run.call_count, 2)
+
+            cache.enabled = False
+            self.assertEqual(_get_cached_exe_version_output(cache, exe, ['-bsfs']), 'ffmpeg version 3.0')
+            self.assertEqual(run.call_count, 3)
+
+            run.side_effect = lambda *_: False
+            cache.enabled = True
+            self.assertIs(_get_cached_exe_version_output(cache, os.path.join(tmpdir, 'missing'), ['-bsfs']), False)
+            self.assertEqual(len(json.loads(cache.data['executables', 'versions'])), 1)
+
+            # Symbolic links share the entry of their target
+            run.side_effect = lambda *_: 'ffmpeg version 4.0'
+            if hasattr(os, 'symlink'):
+                os.mkdir(os.path.join(tmpdir, 'bin'))
+                link = os.path.join(tmpdir, 'bin', 'ffmpeg.exe')
+                os.symlink(exe, link)
+                self.assertEqual(_get_cached_exe_version_output(cache, link, ['-bsfs']), 'ffmpeg version 2.0')
+                self.assertEqual(len(json.loads(cache.data['executables', 'versions'])), 1)
+                # but links with another name are always run
+                link = os.path.join(tmpdir, 'ffprobe.exe')
+                os.symlink(exe, link)
+                self.assertEqual(_get_cached_exe_version_output(cache, link, ['-bsfs']), 'ffmpeg version 4.0')
+                self.assertEqual(run.call_count, 5)
+
+            # Scripts such as the shims of version managers are always run
+            shim = os.path.join(tmpdir, 'node')
+            with open(shim, 'w') as f:
+                f.write('#!/bin/sh\n')
+            os.chmod(shim, 0o755)
+            self.assertEqual(_get_cached_exe_version_output(cache, shim, ['--version']), 'ffmpeg version 4.0')
+            self.assertEqual(_get_cached_exe_version_output(cache, shim, ['--version']), 'ffmpeg version 4.0')
+            self.assertEqual(run.call_count, 6 + hasattr(os, 'symlink'))
+            self.assertEqual(len(json.loads(cache.data['executables', 'versions'])), 1)
+
     def test_age_restricted(self):
         self.assertFalse(age_restricted(None, 10))  # unrestricted content
         self.assertFalse(age_restricted(1, None))  # unrestricted policy
@@ -1982,6 +2077,28 @@ def test(ll, idx, val, cache):
         ll = reversed(ll)
         test(ll, -15, 14, range(15))
 
+    def test_LazyList_window(self):
+        ll = LazyList(range(100), window=10)
+        self.assertEqual(ll[5], 5)
+        self.assertEqual(ll[50], 50)
+        self.assertLess(len(ll._cache), 20)
+        self.assertEqual(ll[45], 45)
+        self.assertRaises(LazyList.EvictedError, lambda: ll[5])
+        self.assertRaises(LazyList.EvictedError, lambda: ll[:5])
+        self.assertTrue(ll)
+        self.assertRaises(TypeError, len, ll)
+        self.assertEqual(ll[-1], 99)
+        self.assertEqual(len(ll), 100)
+        self.assertRaises(LazyList.IndexError, lambda: ll[100])
+        self.assertRaises(LazyList.EvictedError, ll.exhaust)
+        self.assertRaises(TypeError, reversed, ll)
+
+        ll = LazyList(iter(range(100)), window=10)
+        self.assertEqual(list(itertools.islice(ll, 50)), list(range(50)))
+        self.assertLess(len(ll._cache), 20)
+        self.assertEqual(list(LazyList(range(100), window=10)), list(range(100)))
+        self.assertFalse(LazyList(range(0), window=10))
+
     def test_format_bytes(self):
         self.assertEqual(format_bytes(0), '0.00B')
         self.assertEqual(format_bytes(1000), '1000.00B')
@@ -1,5 +1,6 @@
 import collections
 import contextlib
+import concurrent.futures
 import copy
 import datetime as dt
 import errno
@@ -19,18 +20,22 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
 import unicodedata
 
+from .archive import DownloadArchive, load_download_archive
 from .cache import Cache
 from .compat import urllib  # isort: split
 from .compat import urllib_req_to_req
 from .cookies import CookieLoadError, LenientSimpleCookie, load_cookies
 from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
+from .downloader._scheduler import BandwidthScheduler, TransferScheduler
 from .downloader.rtmp import rtmpdump_version
 from .extractor import gen_extractor_classes, get_info_extractor, import_extractors
+from .extractor._url_index import URLDispatchIndex
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .globals import (
@@ -59,6 +64,7 @@
 from .plugins import directories as plugin_directories, load_all_plugins
 from .postprocessor import (
     EmbedThumbnailPP,
+    FFmpegCombinedPP,
     FFmpegFixupDuplicateMoovPP,
     FFmpegFixupDurationPP,
     FFmpegFixupM3u8PP,
@@ -134,9 +140,7 @@
     get_domain,
     int_or_none,
     iri_to_uri,
-    is_path_like,
     join_nonempty,
-    locked_file,
     make_archive_id,
     make_dir,
     number_of_digits,
@@ -293,6 +297,15 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+    concurrent_entries: Number of upcoming playlist entries to extract in
+                       parallel while the current one is being processed.
+                       Entries are still processed in order (Default: 1)
+    concurrent_postprocessing: Number of videos to post-process in parallel
+                       while the next ones are downloaded, within a call of
+                       download(). The files are still moved and recorded in
+                       the download archive in order (Default: 1). The info
+                       returned by the "after_video" postprocessors is then
+                       not passed back to the caller
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            A class having a `debug`, `warning` and `error` function where
@@ -328,6 +341,9 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    cache_batch_size:  Write the cache files in batches of this many files,
+                       and when the instance is closed, rather than immediately.
+                       The files of a pending batch are lost if the process is killed
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -340,8 +356,11 @@ class YoutubeDL:
                        downloaded.
                        Videos without view count information are always
                        downloaded. None for no limit.
-    download_archive:  A set, or the name of a file where all downloads are recorded.
-                       Videos already present in the file are not downloaded again.
+    download_archive:  A set, a DownloadArchive instance, or the name of a file where
+                       all downloads are recorded. Videos already present in the file
+                       are not downloaded again. Files with a .sqlite, .sqlite3 or .db
+                       extension use an indexed SQLite database instead of plain text
+                       (see yt_dlp.archive.SQLiteDownloadArchive.import_text to migrate)
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
     break_per_url:     Whether break_on_reject and break_on_existing
@@ -366,6 +385,10 @@ class YoutubeDL:
     geo_verification_proxy:  URL of the proxy to use for IP address verification
                        on geo-restricted sites.
     socket_timeout:    Time to wait for unresponsive hosts, in seconds
+    connection_pool_size: Maximum number of idle keep-alive connections
+                       to keep per host. 0 disables connection reuse
+    connection_idle_timeout: Time after which an idle keep-alive connection
+                       is closed, in seconds
     bidi_workaround:   Work around buggy terminals without bidirectional text
                        support, using fridibi
     debug_printtraffic:Print out sent and received HTTP traffic
@@ -411,6 +434,14 @@ class YoutubeDL:
                                          downloaded video fragment.
                        * fragment_count: The number of fragments (= individual
                                          files that will be merged)
+                       * priority: The priority class of the download; "live"
+                                   or "vod". Only present if the bandwidth or
+                                   the connections are limited
+                       * scheduler_wait: The number of seconds the download has
+                                         waited for its share of the bandwidth
+                                         or for a connection. Only present if
+                                         the bandwidth or the connections are
+                                         limited
 
                        Progress hooks are guaranteed to be called at least once
                        (with status "finished") if the download is successful.
@@ -510,10 +541,10 @@ class YoutubeDL:
 
     The following parameters are not used by YoutubeDL itself, they are used by
     the downloader (see yt_dlp/downloader/common.py):
-    nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
+    nopart, updatetime, buffersize, ratelimit, global_ratelimit, max_host_connections, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
-    continuedl, hls_use_mpegts, http_chunk_size, external_downloader_args,
-    concurrent_fragment_downloads, progress_delta.
+    continuedl, hls_use_mpegts, http_chunk_size, http_connections, external_downloader_args,
+    concurrent_fragment_downloads, fragment_window, max_concurrent_transfers, progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg binary; either the path
@@ -636,6 +667,8 @@ def __init__(self, params=None, auto_init=True):
         self.params = params
         self._ies = {}
         self._ies_instances = {}
+        self._url_dispatch_index = None
+        self._url_dispatch_deferred = False
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -648,7 +681,19 @@ def __init__(self, params=None, auto_init=True):
         self._num_videos = 0
         self._playlist_level = 0
         self._playlist_urls = set()
-        self.cache = Cache(self)
+        self._format_selector_cache = {}
+        self._format_filter_cache = {}
+        self._format_sorter_cache = {}
+        self._prefetched_extractions = {}
+        self._pp_pool = None
+        self._pp_jobs = collections.deque()
+        self._pp_deferred = None
+        self._pp_local = threading.local()
+        # The limits apply to the downloads of this instance only, e.g. to a single job of --serve
+        self._transfer_scheduler = TransferScheduler(self.params.get('max_concurrent_transfers'))
+        self._bandwidth_scheduler = BandwidthScheduler(
+            self.params.get('global_ratelimit'), self.params.get('max_host_connections'))
+        self.cache = Cache(self, batch_size=self.params.get('cache_batch_size') or 1)
         self.__header_cookies = []
 
         # compat for API: load plugins if they have not already
@@ -830,25 +875,7 @@ def check_deprecated(param, option, suggestion):
                 get_postprocessor(pp_def.pop('key'))(self, **pp_def),
                 when=when)
 
-        def preload_download_archive(fn):
-            """Preload the archive, if any is specified"""
-            archive = set()
-            if fn is None:
-                return archive
-            elif not is_path_like(fn):
-                return fn
-
-            self.write_debug(f'Loading archive file {fn!r}')
-            try:
-                with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                    for line in archive_file:
-                        archive.add(line.strip())
-            except OSError as ioe:
-                if ioe.errno != errno.ENOENT:
-                    raise
-            return archive
-
-        self.archive = preload_download_archive(self.params.get('download_archive'))
+        self.archive = load_download_archive(self.params.get('download_archive'), self)
 
     def _clean_js_runtimes(self, runtimes):
         if not (
@@ -877,7 +904,7 @@ def _js_runtimes(self):
         runtimes = {}
         for name, config in self.params.get('js_runtimes', {}).items():
             runtime_cls = supported_js_runtimes.value.get(name)
-            runtimes[name] = runtime_cls(path=config.get('path')) if runtime_cls else None
+            runtimes[name] = runtime_cls(path=config.get('path'), cache=self.cache) if runtime_cls else None
         return runtimes
 
     def warn_if_short_id(self, argv):
@@ -898,6 +925,10 @@ def warn_if_short_id(self, argv):
     def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
+        # Adding the instance of an extractor that is already in the index does not change it
+        old_ie = self._ies.get(ie_key)
+        if old_ie is None or getattr(old_ie, '_VALID_URL', None) != getattr(ie, '_VALID_URL', None):
+            self._url_dispatch_index = None
         self._ies[ie_key] = ie
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
@@ -915,6 +946,21 @@ def get_info_extractor(self, ie_key):
             self.add_info_extractor(ie)
         return ie
 
+    def _candidate_ies(self, url):
+        """Yield the extractors whose _VALID_URL may match the URL, in order"""
+        if self._url_dispatch_index is None:
+            # Without lazy extractors, building the index parses every _VALID_URL.
+            # This only pays off once more than one URL has to be matched
+            if not LAZY_EXTRACTORS.value and not self._url_dispatch_deferred:
+                self._url_dispatch_deferred = True
+                yield from self._ies.items()
+                return
+            self._url_dispatch_index = URLDispatchIndex(self._ies)
+        for ie_key in self._url_dispatch_index.candidates(url):
+            ie = self._ies.get(ie_key)
+            if ie is not None:
+                yield ie_key, ie
+
     def add_default_info_extractors(self):
         """
         Add the InfoExtractors returned by gen_extractors to the end of the list
@@ -1052,13 +1098,28 @@ def __exit__(self, *args):
 
     def close(self):
         self.save_cookies()
+        if isinstance(self.__dict__.get('archive'), DownloadArchive):
+            self.archive.close()
         if '_request_director' in self.__dict__:
+            stats = self._request_director.connection_stats()
+            if stats.requests:
+                self.write_debug(
+                    f'Connections: {stats.opened} opened, {stats.reused} reused '
+                    f'({stats.reuse_ratio:.0%} of {stats.requests} requests)')
             self._request_director.close()
             del self._request_director
 
         for close_hook in self._close_hooks:
             close_hook()
 
+        if 'cache' in self.__dict__:
+            self.cache.flush()
+            stats = self.cache.stats
+            if stats.lookups or stats.bytes_written:
+                self.write_debug(
+                    f'Cache: {stats.hits} hits, {stats.misses} misses, '
+                    f'{format_bytes(stats.bytes_read)} read, {format_bytes(stats.bytes_written)} written')
+
     def trouble(self, message=None, tb=None, is_error=True):
         """Determine action to take when a download problem appears.
 
@@ -1663,11 +1724,11 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             ie_key = 'Generic'
 
         if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
+            ies = [(ie_key, self._ies[ie_key])] if ie_key in self._ies else []
         else:
-            ies = self._ies
+            ies = self._candidate_ies(url)
 
-        for key, ie in ies.items():
+        for key, ie in ies:
             if not ie.suitable(url):
                 continue
 
@@ -1828,7 +1889,8 @@ def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
         try:
-            ie_result = ie.extract(url)
+            prefetched = self._prefetched_extractions.pop((ie.ie_key(), url), None)
+            ie_result = prefetched.result() if prefetched else ie.extract(url)
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -2049,7 +2111,7 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Downloading {ie_result["_type"]}: {title}')
 
         all_entries = PlaylistEntries(self, ie_result)
-        entries = orderedSet(all_entries.get_requested_items(), lazy=True)
+        entries = all_entries.get_requested_items()
 
         lazy = self.params.get('lazy_playlist')
         if lazy:
@@ -2097,47 +2159,54 @@ def __process_playlist(self, ie_result, download):
             keep_resolved_entries = ie_result['_type'] != 'playlist'
         if keep_resolved_entries:
             self.write_debug('The information of all playlist entries will be held in memory')
+        # The result is discarded, so entries that are processed as they are received need not be kept
+        keep_entries = keep_resolved_entries or not lazy
 
         failures = 0
         max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
-        for i, (playlist_index, entry) in enumerate(entries):
-            if lazy:
-                resolved_entries.append((playlist_index, entry))
-            if not entry:
-                continue
+        concurrent_entries = self.params.get('concurrent_entries') or 1
+        with contextlib.ExitStack() as stack:
+            if concurrent_entries > 1 and self.params.get('extract_flat') not in (True, 'in_playlist'):
+                entries = stack.enter_context(contextlib.closing(self._prefetch_entries(entries, concurrent_entries)))
+            for i, (playlist_index, entry) in enumerate(entries):
+                if lazy and keep_entries:
+                    resolved_entries.append((playlist_index, entry))
+                if not entry:
+                    continue
 
-            entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
-            if not lazy and 'playlist-index' in self.params['compat_opts']:
-                playlist_index = ie_result['requested_entries'][i]
+                entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
+                if not lazy and 'playlist-index' in self.params['compat_opts']:
+                    playlist_index = ie_result['requested_entries'][i]
 
-            entry_copy = collections.ChainMap(entry, {
-                **common_info,
-                'n_entries': int_or_none(n_entries),
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            })
+                entry_copy = collections.ChainMap(entry, {
+                    **common_info,
+                    'n_entries': int_or_none(n_entries),
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                })
 
-            if self._match_entry(entry_copy, incomplete=True) is not None:
-                # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
-                resolved_entries[i] = (playlist_index, NO_DEFAULT)
-                continue
+                if self._match_entry(entry_copy, incomplete=True) is not None:
+                    # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
+                    if keep_entries:
+                        resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                    continue
 
-            self.to_screen(
-                f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
-                f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
-
-            entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            }, extra))
-            if not entry_result:
-                failures += 1
-            if failures >= max_failures:
-                self.report_error(
-                    f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
-                break
-            if keep_resolved_entries:
-                resolved_entries[i] = (playlist_index, entry_result)
+                self.to_screen(
+                    f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
+                    f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
+
+                entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                }, extra))
+                if not entry_result:
+                    failures += 1
+                if failures >= max_failures:
+                    self.report_error(
+                        f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
+                    break
+                if keep_resolved_entries:
+                    resolved_entries[i] = (playlist_index, entry_result)
 
         # Update with processed data
         ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
@@ -2146,6 +2215,9 @@ def __process_playlist(self, ie_result, download):
             # Do not set for full playlist
             ie_result.pop('requested_entries')
 
+        # The entries are post-processed before the playlist
+        self._wait_post_processing()
+
         # Write the updated info to json
         if _infojson_written is True and self._write_info_json(
                 'updated playlist', ie_result,
@@ -2156,6 +2228,64 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    def _prefetch_entries(self, entries, workers):
+        """
+        Yield the playlist entries unchanged, while extracting the next `workers` entries in a thread pool.
+        The results are picked up by __extract_info when the entries are processed
+        """
+        prefetched = []
+        pending = collections.deque()
+        max_downloads = float(self.params.get('max_downloads') or 'inf')
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='entry_') as pool:
+            try:
+                for item in entries:
+                    pending.append(item)
+                    # The entries after --max-downloads is reached are never processed
+                    key = self._num_downloads + len(pending) <= max_downloads and self._prefetch_entry(pool, item[1])
+                    if key:
+                        prefetched.append(key)
+                    if len(pending) > workers:
+                        yield pending.popleft()
+                while pending:
+                    yield pending.popleft()
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+                for key in prefetched:
+                    self._prefetched_extractions.pop(key, None)
+
+    def _prefetch_entry(self, pool, entry):
+        if not entry or entry.get('_type') != 'url':
+            return None
+        url = sanitize_url(entry['url'], scheme='http' if self.params.get('prefer_insecure') else 'https')
+        ie_key = entry.get('ie_key')
+        ies = [(ie_key, self._ies.get(ie_key))] if ie_key else self._candidate_ies(url)
+        key, ie = next(((key, ie) for key, ie in ies if ie and ie.suitable(url)), (None, None))
+        if ie is None:
+            return None
+        temp_id = ie.get_temp_id(url)
+        if temp_id is not None and self.in_download_archive({'id': temp_id, 'ie_key': key}):
+            # Handled when the entry is processed
+            return None
+        try:
+            if self._match_entry(entry, incomplete=True, silent=True) is not None:
+                return None
+        except DownloadCancelled:
+            # Raised again when the entry is processed
+            return None
+        ie = self.get_info_extractor(key)
+        if (key, url) not in self._prefetched_extractions:
+            try:
+                # Log in only once, from this thread
+                ie.initialize()
+            except Exception:
+                # The error is reported when the entry is processed
+                return None
+            self._apply_header_cookies(url)
+            # The extractors keep the state of an extraction in their attributes,
+            # so each extraction that runs in parallel needs its own instance
+            self._prefetched_extractions[key, url] = pool.submit(copy.copy(ie).extract, url)
+        return key, url
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -2163,7 +2293,11 @@ def __process_iterable_entry(self, entry, download, extra_info):
 
     def _build_format_filter(self, filter_spec):
         " Returns a function to filter the formats according to the filter_spec "
+        if filter_spec not in self._format_filter_cache:
+            self._format_filter_cache[filter_spec] = self._compile_format_filter(filter_spec)
+        return self._format_filter_cache[filter_spec]
 
+    def _compile_format_filter(self, filter_spec):
         OPERATORS = {
             '<': operator.lt,
             '<=': operator.le,
@@ -2300,6 +2434,16 @@ def can_merge():
                 else 'bestvideo*+bestaudio/best')
 
     def build_format_selector(self, format_spec):
+        # The compiled selector only depends on these params; the rest are read when it is called
+        cache_key = (
+            format_spec,
+            self.params.get('allow_multiple_audio_streams', False),
+            self.params.get('allow_multiple_video_streams', False))
+        if cache_key not in self._format_selector_cache:
+            self._format_selector_cache[cache_key] = self._compile_format_selector(format_spec)
+        return self._format_selector_cache[cache_key]
+
+    def _compile_format_selector(self, format_spec):
         def syntax_error(note, start):
             message = (
                 'Invalid format specification: '
@@ -2791,8 +2935,18 @@ def _raise_pending_errors(self, info):
 
     def sort_formats(self, info_dict):
         formats = self._get_formats(info_dict)
-        formats.sort(key=FormatSorter(
-            self, info_dict.get('_format_sort_fields') or []).calculate_preference)
+        formats.sort(key=self._get_format_sorter(info_dict.get('_format_sort_fields') or []).calculate_preference)
+
+    def _get_format_sorter(self, sort_extractor):
+        """Get a FormatSorter for the extractor's sort order. Sorters are reused for identical sort orders"""
+        key = (tuple(sort_extractor), tuple(self.params.get('format_sort') or ()),
+               self.params.get('prefer_free_formats'), self.params.get('format_sort_force'))
+        sorter = self._format_sorter_cache.get(key)
+        if sorter is None:
+            sorter = self._format_sorter_cache[key] = FormatSorter(self, sort_extractor)
+        elif self.params.get('verbose'):
+            sorter.print_verbose_info(self.write_debug)
+        return sorter
 
     def process_video_result(self, info_dict, download=True):
         assert info_dict.get('_type', 'video') == 'video'
@@ -3073,41 +3227,58 @@ def to_screen(*msg):
                               (f'{c["start_time"]:.1f}-{c["end_time"]:.1f}' for c in requested_ranges))
             max_downloads_reached = False
 
-            for fmt, chapter in itertools.product(formats_to_download, requested_ranges):
-                new_info = self._copy_infodict(info_dict)
-                new_info.update(fmt)
-                offset, duration = info_dict.get('section_start') or 0, info_dict.get('duration') or float('inf')
-                end_time = offset + min(chapter.get('end_time', duration), duration)
-                # duration may not be accurate. So allow deviations <1sec
-                if end_time == float('inf') or end_time > offset + duration + 1:
-                    end_time = None
-                if chapter or offset:
-                    new_info.update({
-                        'section_start': offset + chapter.get('start_time', 0),
-                        'section_end': end_time,
-                        'section_title': chapter.get('title'),
-                        'section_number': chapter.get('index'),
-                    })
-                downloaded_formats.append(new_info)
-                try:
-                    self.process_info(new_info)
-                except MaxDownloadsReached:
-                    max_downloads_reached = True
-                self._raise_pending_errors(new_info)
-                # Remove copied info
-                for key, val in tuple(new_info.items()):
-                    if info_dict.get(key) == val:
-                        new_info.pop(key)
-                if max_downloads_reached:
-                    break
+            with self._defer_post_processing() as deferred:
+                for fmt, chapter in itertools.product(formats_to_download, requested_ranges):
+                    new_info = self._copy_infodict(info_dict)
+                    new_info.update(fmt)
+                    offset, duration = info_dict.get('section_start') or 0, info_dict.get('duration') or float('inf')
+                    end_time = offset + min(chapter.get('end_time', duration), duration)
+                    # duration may not be accurate. So allow deviations <1sec
+                    if end_time == float('inf') or end_time > offset + duration + 1:
+                        end_time = None
+                    if chapter or offset:
+                        new_info.update({
+                            'section_start': offset + chapter.get('start_time', 0),
+                            'section_end': end_time,
+                            'section_title': chapter.get('title'),
+                            'section_number': chapter.get('index'),
+                        })
+                    downloaded_formats.append(new_info)
+                    try:
+                        self.process_info(new_info)
+                    except MaxDownloadsReached:
+                        max_downloads_reached = True
+                    self._raise_pending_errors(new_info)
+                    if max_downloads_reached:
+                        break
+
+            # The formats may still be post-processed after info_dict is updated with the best format below
+            copied_info = dict(info_dict)
+
+            def remove_copied_info():
+                for new_info in downloaded_formats:
+                    for key, val in tuple(new_info.items()):
+                        if copied_info.get(key) == val:
+                            new_info.pop(key)
 
-            write_archive = {f.get('__write_download_archive', False) for f in downloaded_formats}
-            assert write_archive.issubset({True, False, 'ignore'})
-            if True in write_archive and False not in write_archive:
-                self.record_download_archive(info_dict)
+            def finish_video(info):
+                write_archive = {f.get('__write_download_archive', False) for f in downloaded_formats}
+                assert write_archive.issubset({True, False, 'ignore'})
+                if True in write_archive and False not in write_archive:
+                    self.record_download_archive(info)
+                return self.run_all_pps('after_video', info)
 
             info_dict['requested_downloads'] = downloaded_formats
-            info_dict = self.run_all_pps('after_video', info_dict)
+            if deferred is None:
+                remove_copied_info()
+                info_dict = finish_video(info_dict)
+            else:
+                # Like in the synchronous case, the after_video PPs get the info without the best format.
+                # The info they return is dropped, since info_dict has already been returned
+                video_info = dict(info_dict)
+                self._submit_post_processing(
+                    [*deferred, remove_copied_info], lambda: finish_video(video_info),
+                    self._make_archive_id(info_dict))
             if max_downloads_reached:
                 raise MaxDownloadsReached
 
@@ -3613,19 +3784,25 @@ def ffmpeg_fixup(cndn, msg, cls):
                     ffmpeg_fixup(downloader == 'web_socket_fragment', 'Malformed timestamps detected', FFmpegFixupTimestampPP)
                     ffmpeg_fixup(downloader == 'web_socket_fragment', 'Malformed duration detected', FFmpegFixupDurationPP)
 
-                fixup()
-                try:
-                    replace_info_dict(self.post_process(dl_filename, info_dict, files_to_move))
-                except PostProcessingError as err:
-                    self.report_error(f'Postprocessing: {err}')
-                    return
-                try:
-                    for ph in self._post_hooks:
-                        ph(info_dict['filepath'])
-                except Exception as err:
-                    self.report_error(f'post hooks: {err}')
-                    return
-                info_dict['__write_download_archive'] = True
+                def post_process():
+                    fixup()
+                    try:
+                        replace_info_dict(self.post_process(dl_filename, info_dict, files_to_move))
+                    except PostProcessingError as err:
+                        self.report_error(f'Postprocessing: {err}')
+                        return
+                    try:
+                        for ph in self._post_hooks:
+                            ph(info_dict['filepath'])
+                    except Exception as err:
+                        self.report_error(f'post hooks: {err}')
+                        return
+                    info_dict['__write_download_archive'] = True
+
+                if self._pp_deferred is None:
+                    post_process()
+                else:
+                    self._pp_deferred.append(post_process)
 
         assert info_dict is original_infodict  # Make sure the info_dict was modified in-place
         if self.params.get('force_write_download_archive'):
@@ -3648,6 +3825,7 @@ def wrapper(*args, **kwargs):
                 self._num_downloads = 0
             else:
                 if self.params.get('dump_single_json', False):
+                    self._wait_post_processing()
                     self.post_extract(res)
                     self.to_stdout(json.dumps(self.sanitize_info(res)))
         return wrapper
@@ -3662,9 +3840,10 @@ def download(self, url_list):
                 and self.params.get('max_downloads') != 1):
             raise SameFileError(outtmpl)
 
-        for url in url_list:
-            self.__download_wrapper(self.extract_info)(
-                url, force_generic_extractor=self.params.get('force_generic_extractor', False))
+        with self._post_processing_pool():
+            for url in url_list:
+                self.__download_wrapper(self.extract_info)(
+                    url, force_generic_extractor=self.params.get('force_generic_extractor', False))
 
         return self._download_retcode
 
@@ -3782,7 +3961,17 @@ def run_pp(self, pp, infodict):
     def run_all_pps(self, key, info, *, additional_pps=None):
         if key != 'video':
             self._forceprint(key, info)
-        for pp in (additional_pps or []) + self._pps[key]:
+        pps = (additional_pps or []) + self._pps[key]
+        index = 0
+        while index < len(pps):
+            pp = None
+            if key == 'post_process' and 'no-combined-ffmpeg' not in self.params['compat_opts']:
+                pp = FFmpegCombinedPP.combine(self, pps[index:], info)
+            if pp:
+                index += len(pp.pps)
+            else:
+                pp = pps[index]
+                index += 1
             info = self.run_pp(pp, info)
         return info
 
@@ -3802,10 +3991,97 @@ def post_process(self, filename, info, files_to_move=None):
         info['filepath'] = filename
         info['__files_to_move'] = files_to_move or {}
         info = self.run_all_pps('post_process', info, additional_pps=info.get('__postprocessors'))
+        self._wait_post_processing_turn()
         info = self.run_pp(MoveFilesAfterDownloadPP(self), info)
         del info['__files_to_move']
         return self.run_all_pps('after_move', info)
 
+    @contextlib.contextmanager
+    def _post_processing_pool(self):
+        """Post-process the videos in a thread pool, if concurrent_postprocessing is set"""
+        workers = self.params.get('concurrent_postprocessing') or 1
+        if workers <= 1 or self._pp_pool:
+            yield
+            return
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='postprocess_') as self._pp_pool:
+            try:
+                yield
+            except KeyboardInterrupt:
+                self._pp_pool.shutdown(wait=True, cancel_futures=True)
+                raise
+            except BaseException:
+                # The videos that were already downloaded are still post-processed.
+                # Their errors have been reported, and the original exception takes precedence
+                self._wait_post_processing(raise_errors=False)
+                raise
+            else:
+                self._wait_post_processing()
+            finally:
+                self._pp_jobs.clear()
+                self._pp_pool = None
+
+    @contextlib.contextmanager
+    def _defer_post_processing(self):
+        """
+        Collect the post-processing of the formats of a video, so that it is run in the
+        post-processing pool once they are all downloaded. Yields None if there is no pool
+        """
+        if not self._pp_pool:
+            yield None
+            return
+        deferred = self._pp_deferred = []
+        try:
+            yield deferred
+        except Exception:
+            if deferred:
+                self._submit_post_processing(deferred)
+            raise
+        finally:
+            self._pp_deferred = None
+
+    def _submit_post_processing(self, funcs, finish=None, archive_id=None):
+        """
+        Run funcs in the post-processing pool, and then finish once the previous job is done.
+        The jobs run in parallel, but each of them waits for the previous one to finish before
+        moving the files (see _wait_post_processing_turn) and before finish
+        """
+        previous_done = self._pp_jobs[-1][1] if self._pp_jobs else None
+        done = threading.Event()
+
+        def job():
+            self._pp_local.previous_done = previous_done
+            self._pp_local.done = done
+            try:
+                for func in funcs:
+                    func()
+                self._wait_post_processing_turn()
+                if finish:
+                    finish()
+            finally:
+                self._wait_post_processing_turn()
+                done.set()
+
+        self._pp_jobs.append((self._pp_pool.submit(job), done, archive_id))
+        # Bound the number of downloaded videos that are waiting to be post-processed
+        while len(self._pp_jobs) > self.params['concurrent_postprocessing']:
+            self._pp_jobs.popleft()[0].result()
+
+    def _wait_post_processing_turn(self):
+        previous_done = getattr(self._pp_local, 'previous_done', None)
+        if previous_done:
+            previous_done.wait()
+            self._pp_local.previous_done = None
+
+    def _wait_post_processing(self, raise_errors=True):
+        """Wait for the pending post-processing jobs, raising the error of the first that failed"""
+        while self._pp_jobs:
+            future, _, _ = self._pp_jobs.popleft()
+            try:
+                future.result()
+            except Exception:
+                if raise_errors:
+                    raise
+
     def _make_archive_id(self, info_dict):
         video_id = info_dict.get('id')
         if not video_id:
@@ -3818,7 +4094,7 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
+            for ie_key, ie in self._candidate_ies(url):
                 if ie.suitable(url):
                     extractor = ie_key
                     break
@@ -3832,6 +4108,11 @@ def in_download_archive(self, info_dict):
 
         vid_ids = [self._make_archive_id(info_dict)]
         vid_ids.extend(info_dict.get('_old_archive_ids') or [])
+        # A video that is still being post-processed is only recorded once its job is done
+        current_done = getattr(self._pp_local, 'done', None)
+        for _, done, archive_id in tuple(self._pp_jobs):
+            if archive_id in vid_ids and done is not current_done:
+                done.wait()
         return any(id_ in self.archive for id_ in vid_ids)
 
     def record_download_archive(self, info_dict):
@@ -3842,9 +4123,6 @@ def record_download_archive(self, info_dict):
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
-            with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-                archive_file.write(vid_id + '\n')
         self.archive.add(vid_id)
 
     @staticmethod
@@ -4316,6 +4594,8 @@ def build_request_director(self, handlers, preferences=None):
                     'verbose': 'debug_printtraffic',
                     'source_address': 'source_address',
                     'timeout': 'socket_timeout',
+                    'connection_pool_size': 'connection_pool_size',
+                    'connection_idle_timeout': 'connection_idle_timeout',
                     'legacy_ssl_support': 'legacyserverconnect',
                     'enable_file_urls': 'enable_file_urls',
                     'impersonate': 'impersonate',
@@ -217,6 +217,14 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('fragment window', opts.fragment_window, True)
+    validate_positive('concurrent transfers', opts.max_concurrent_transfers, True)
+    validate_positive('host connections', opts.max_host_connections, True)
+    validate_positive('HTTP connections', opts.http_connections, True)
+    validate_positive('concurrent entries', opts.concurrent_entries, True)
+    validate_positive('concurrent postprocessing', opts.concurrent_postprocessing, True)
+    validate_positive('connection pool size', opts.connection_pool_size)
+    validate_positive('connection idle timeout', opts.connection_idle_timeout, True)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -315,6 +323,7 @@ def validate_bytes(name, value, strict_positive=False):
         return numeric_limit
 
     opts.ratelimit = validate_bytes('rate limit', opts.ratelimit, True)
+    opts.global_ratelimit = validate_bytes('global rate limit', opts.global_ratelimit, True)
     opts.throttledratelimit = validate_bytes('throttled rate limit', opts.throttledratelimit)
     opts.min_filesize = validate_bytes('min filesize', opts.min_filesize)
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
@@ -689,6 +698,7 @@ def get_postprocessors(opts):
             'remove_ranges': opts.remove_ranges,
             'sponsorblock_chapter_title': opts.sponsorblock_chapter_title,
             'force_keyframes': opts.force_keyframes_at_cuts,
+            'smart_cut': opts.smart_cuts,
         }
     # FFmpegMetadataPP should be run after FFmpegVideoConvertorPP and
     # FFmpegExtractAudioPP as containers before conversion may not support
@@ -836,6 +846,8 @@ def parse_options(argv=None):
         'force_generic_extractor': opts.force_generic_extractor,
         'allowed_extractors': opts.allowed_extractors or ['default'],
         'ratelimit': opts.ratelimit,
+        'global_ratelimit': opts.global_ratelimit,
+        'max_host_connections': opts.max_host_connections,
         'throttledratelimit': opts.throttledratelimit,
         'overwrites': opts.overwrites,
         'retries': opts.retries,
@@ -846,9 +858,12 @@ def parse_options(argv=None):
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
         'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'fragment_window': opts.fragment_window,
+        'max_concurrent_transfers': opts.max_concurrent_transfers,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
+        'http_connections': opts.http_connections,
         'continuedl': opts.continue_dl,
         'noprogress': opts.quiet if opts.noprogress is None else opts.noprogress,
         'progress_with_newline': opts.progress_with_newline,
@@ -859,6 +874,7 @@ def parse_options(argv=None):
         'playlistreverse': opts.playlist_reverse,
         'playlistrandom': opts.playlist_random,
         'lazy_playlist': opts.lazy_playlist,
+        'concurrent_entries': opts.concurrent_entries,
         'noplaylist': opts.noplaylist,
         'logtostderr': opts.outtmpl.get('default') == '-',
         'consoletitle': opts.consoletitle,
@@ -913,6 +929,8 @@ def parse_options(argv=None):
         'http_headers': opts.headers,
         'proxy': opts.proxy,
         'socket_timeout': opts.socket_timeout,
+        'connection_pool_size': opts.connection_pool_size,
+        'connection_idle_timeout': opts.connection_idle_timeout,
         'bidi_workaround': opts.bidi_workaround,
         'debug_printtraffic': opts.debug_printtraffic,
         'default_search': opts.default_search,
@@ -946,6 +964,7 @@ def parse_options(argv=None):
         'hls_split_discontinuity': opts.hls_split_discontinuity,
         'external_downloader_args': opts.external_downloader_args,
         'postprocessor_args': opts.postprocessor_args,
+        'concurrent_postprocessing': opts.concurrent_postprocessing,
         'geo_verification_proxy': opts.geo_verification_proxy,
         'geo_bypass': opts.geo_bypass,
         'geo_bypass_country': opts.geo_bypass_country,
@@ -978,6 +997,9 @@ def _real_main(argv=None):
     if plugin_dirs.value:
         _load_all_plugins()
 
+    if opts.serve:
+        return run_server(parser, opts, all_urls, argv)
+
     with YoutubeDL(ydl_opts) as ydl:
         pre_process = opts.update_self or opts.rm_cachedir
         actual_use = all_urls or opts.load_info_filename
@@ -1073,6 +1095,27 @@ def make_row(target, handler):
             return 101
 
 
+def run_server(parser, opts, all_urls, argv=None):
+    # Only import the server when it is used
+    from .server import BatchServer
+
+    if all_urls or opts.load_info_filename is not None:
+        parser.error('URLs cannot be given together with --serve; they are sent by the clients')
+    try:
+        server = BatchServer(opts.serve, sys.argv[1:] if argv is None else argv, token=opts.serve_token)
+    except (ValueError, OSError) as err:
+        parser.error(f'unable to start the server: {err}')
+    parser.destroy()
+
+    write_string(f'[server] Listening on {server.address}\n')
+    if server.token and not opts.serve_token:
+        write_string(f'[server] Token: {server.token}\n')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        write_string('[server] Stopped\n')
+
+
 def main(argv=None):
     IN_CLI.value = True
     try:
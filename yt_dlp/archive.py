@@ -0,0 +1,207 @@
+import errno
+import os
+import threading
+import time
+
+from .dependencies import sqlite3
+from .utils import is_path_like, locked_file
+
+
+class DownloadArchive:
+    """Base class for download archive backends
+
+    An archive is a set-like collection of archive ids (see `make_archive_id`).
+    Subclasses must implement `__contains__` and `add`
+    """
+
+    def __contains__(self, archive_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def __bool__(self):
+        return True
+
+    def add(self, archive_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def flush(self):
+        """Persist all pending additions"""
+
+    def close(self):
+        self.flush()
+
+
+class TextDownloadArchive(DownloadArchive):
+    """The plain text archive: one archive id per line, preloaded into memory"""
+
+    def __init__(self, filename, logger=None):
+        self.filename = filename
+        self._archive = set()
+        if logger:
+            logger.write_debug(f'Loading archive file {filename!r}')
+        try:
+            with locked_file(filename, 'r', encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    self._archive.add(line.strip())
+        except OSError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+
+    def __contains__(self, archive_id):
+        return archive_id in self._archive
+
+    def __bool__(self):
+        return bool(self._archive)
+
+    def __len__(self):
+        return len(self._archive)
+
+    def __iter__(self):
+        return iter(self._archive)
+
+    def add(self, archive_id):
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.write(archive_id + '\n')
+        self._archive.add(archive_id)
+
+
+class SQLiteDownloadArchive(DownloadArchive):
+    """An on-disk, indexed archive backed by an SQLite database
+
+    Lookups are done against the database, so the archive is never loaded into memory.
+    Each addition is written in its own transaction, like the lines of the text archive.
+    If `batch_size` is larger than 1, additions are instead buffered and written in a single
+    transaction once `batch_size` ids are pending or, on the next addition, `flush_interval`
+    seconds have passed since the last write, and on `close`. Buffered ids are lost if the
+    process is killed, and are not seen by other processes until they are written.
+    The database uses WAL journaling so that several processes can share the same archive.
+    The archive may be used from several threads, and is reopened if it is used after `close`
+    """
+
+    EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+    _HEADER = b'SQLite format 3\0'
+    _TIMEOUT = 60
+
+    def __init__(self, filename, logger=None, *, batch_size=1, flush_interval=5):
+        if not sqlite3:
+            raise ImportError(
+                'Cannot use an SQLite download archive without sqlite3 support. '
+                'Please use a Python interpreter compiled with sqlite3 support')
+        self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = set()
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._conn = None
+        if logger:
+            logger.write_debug(f'Opening SQLite archive {filename!r}')
+        self._connection()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.filename, timeout=self._TIMEOUT, isolation_level=None, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY) WITHOUT ROWID')
+        return self._conn
+
+    @classmethod
+    def is_sqlite_filename(cls, filename):
+        """Whether the archive is an SQLite database, by the header of an existing file or else by the extension"""
+        try:
+            with open(filename, 'rb') as f:
+                header = f.read(len(cls._HEADER))
+        except OSError:
+            header = None
+        if header:
+            return header == cls._HEADER
+        return os.path.splitext(os.fspath(filename))[1].lower() in cls.EXTENSIONS
+
+    def __contains__(self, archive_id):
+        with self._lock:
+            if archive_id in self._pending:
+                return True
+            return self._connection().execute(
+                'SELECT 1 FROM archive WHERE id = ?', (archive_id,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            self.flush()
+            return self._connection().execute('SELECT COUNT(*) FROM archive').fetchone()[0]
+
+    def __iter__(self):
+        with self._lock:
+            self.flush()
+            archive_ids = self._connection().execute('SELECT id FROM archive').fetchall()
+        for (archive_id,) in archive_ids:
+            yield archive_id
+
+    def add(self, archive_id):
+        with self._lock:
+            self._pending.add(archive_id)
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
+    def update(self, archive_ids):
+        with self._lock:
+            self._insert(archive_ids)
+
+    def _insert(self, archive_ids):
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT OR IGNORE INTO archive (id) VALUES (?)', ((id_,) for id_ in archive_ids))
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._insert(sorted(self._pending))
+                self._pending.clear()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def import_text(self, filename):
+        """Import all ids from a plain text archive file. Returns the number of lines read"""
+        count = 0
+
+        def read_ids():
+            nonlocal count
+            with locked_file(filename, 'r', encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    line = line.strip()
+                    if line:
+                        count += 1
+                        yield line
+
+        with self._lock:
+            self._insert(read_ids())
+        return count
+
+
+def load_download_archive(archive, logger=None):
+    """Create an archive from the `download_archive` param"""
+    if archive is None:
+        return set()
+    elif not is_path_like(archive):
+        return archive
+    elif SQLiteDownloadArchive.is_sqlite_filename(archive):
+        return SQLiteDownloadArchive(archive, logger)
+    return TextDownloadArchive(archive, logger)
+
+
+__all__ = [
+    'DownloadArchive',
+    'SQLiteDownloadArchive',
+    'TextDownloadArchive',
+    'load_download_archive',
+]
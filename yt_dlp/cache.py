@@ -1,18 +1,125 @@
+import collections
 import contextlib
+import dataclasses
 import json
 import os
 import re
 import shutil
+import tempfile
+import threading
 import traceback
 import urllib.parse
 
-from .utils import expand_path, traverse_obj, version_tuple, write_json_file
+from .utils import expand_path, traverse_obj, version_tuple
 from .version import __version__
 
 
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+
+def _stat_key(fn):
+    """The size and modification time of the file, or None if it does not exist"""
+    try:
+        stat = os.stat(fn)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _MemoryCache:
+    """A size-bounded LRU of serialized cache files, shared by all `Cache` instances of the process
+
+    Each entry is stored with the `_stat_key` of its file, and is only returned for the same key,
+    so that files that were rewritten by other processes are read again
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fn, stat_key):
+        with self._lock:
+            entry_key, content = self._entries.get(fn, (None, None))
+            if content is None or entry_key != stat_key:
+                return None
+            self._entries.move_to_end(fn)
+            return content
+
+    def put(self, fn, content, stat_key):
+        with self._lock:
+            self._remove(fn)
+            if stat_key is None or len(content) > self.max_size:
+                return
+            self._entries[fn] = stat_key, content
+            self.size += len(content)
+            while self.size > self.max_size:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def _remove(self, fn):
+        _, content = self._entries.pop(fn, (None, None))
+        if content is not None:
+            self.size -= len(content)
+
+    def clear(self, root_dir):
+        with self._lock:
+            for fn in [fn for fn in self._entries if fn.startswith(root_dir)]:
+                self._remove(fn)
+
+
+_memory_cache = _MemoryCache(64 * 1024 * 1024)
+
+
+def _write_cache_file(content, fn):
+    """Write content to fn atomically
+    @returns The `_stat_key` of the written file"""
+    tf = tempfile.NamedTemporaryFile(
+        prefix=f'{os.path.basename(fn)}.', dir=os.path.dirname(fn),
+        suffix='.tmp', delete=False, mode='w', encoding='utf-8')
+    try:
+        with tf:
+            tf.write(content)
+        with contextlib.suppress(OSError):
+            mask = os.umask(0)
+            os.umask(mask)
+            os.chmod(tf.name, 0o666 & ~mask)
+        # Before it is replaced, the file cannot have been changed by another process
+        stat_key = _stat_key(tf.name)
+        os.replace(tf.name, fn)
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.remove(tf.name)
+        raise
+    return stat_key
+
+
 class Cache:
-    def __init__(self, ydl):
+    """On-disk cache of JSON data, organized in sections
+
+    Loaded and stored data is kept in a process-wide in-memory LRU, so that repeated loads
+    only check that the file has not changed. Stored data is written immediately, unless
+    `batch_size` (the `cache_batch_size` param) is more than 1; it is then written in batches
+    of `batch_size` files, on `flush` and when the YoutubeDL instance is closed.
+    The data of a pending batch is lost if the process is killed
+    """
+
+    def __init__(self, ydl, *, batch_size=1):
         self._ydl = ydl
+        self.batch_size = batch_size
+        self.stats = CacheStats()
+        self._pending = {}
+        self._lock = threading.Lock()
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -37,13 +144,26 @@ def store(self, section, key, data, dtype='json'):
             return
 
         fn = self._get_cache_fn(section, key, dtype)
-        try:
-            os.makedirs(os.path.dirname(fn), exist_ok=True)
-            self._ydl.write_debug(f'Saving {section}.{key} to cache')
-            write_json_file({'yt-dlp_version': __version__, 'data': data}, fn)
-        except Exception:
-            tb = traceback.format_exc()
-            self._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
+        self._ydl.write_debug(f'Saving {section}.{key} to cache')
+        content = json.dumps({'yt-dlp_version': __version__, 'data': data}, ensure_ascii=False)
+        with self._lock:
+            self._pending[fn] = content
+            if len(self._pending) < self.batch_size:
+                return
+        self.flush()
+
+    def flush(self):
+        """Write all pending data to disk"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fn, content in pending.items():
+            try:
+                os.makedirs(os.path.dirname(fn), exist_ok=True)
+                _memory_cache.put(fn, content, _write_cache_file(content, fn))
+                self.stats.bytes_written += len(content)
+            except Exception:
+                tb = traceback.format_exc()
+                self._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
 
     def _validate(self, data, min_ver):
         version = traverse_obj(data, 'yt-dlp_version')
@@ -60,11 +180,27 @@ def load(self, section, key, dtype='json', default=None, *, min_ver=None):
             return default
 
         cache_fn = self._get_cache_fn(section, key, dtype)
+        with self._lock:
+            content = self._pending.get(cache_fn)
+        stat_key = _stat_key(cache_fn) if content is None else None
+        if stat_key is not None:
+            content = _memory_cache.get(cache_fn, stat_key)
+        if content is not None:
+            self.stats.hits += 1
+            self._ydl.write_debug(f'Loading {section}.{key} from cache')
+            return self._validate(json.loads(content), min_ver)
+
+        self.stats.misses += 1
         with contextlib.suppress(OSError):
             try:
                 with open(cache_fn, encoding='utf-8') as cachef:
                     self._ydl.write_debug(f'Loading {section}.{key} from cache')
-                    return self._validate(json.load(cachef), min_ver)
+                    content = cachef.read()
+                    self.stats.bytes_read += len(content)
+                    data = self._validate(json.loads(content), min_ver)
+                    # If the file was replaced after it was checked, it is read again on the next load
+                    _memory_cache.put(cache_fn, content, stat_key)
+                    return data
             except (ValueError, KeyError):
                 try:
                     file_size = os.path.getsize(cache_fn)
@@ -83,6 +219,10 @@ def remove(self):
         if not any((term in cachedir) for term in ('cache', 'tmp')):
             raise Exception(f'Not removing directory {cachedir} - this does not look like a cache dir')
 
+        with self._lock:
+            self._pending.clear()
+        _memory_cache.clear(cachedir)
+
         self._ydl.to_screen(
             f'Removing cache dir {cachedir} .', skip_eol=True)
         if os.path.exists(cachedir):
@@ -27,6 +27,7 @@ def get_suitable_downloader(info_dict, params={}, default=NO_DEFAULT, protocol=N
 from .f4m import F4mFD
 from .fc2 import FC2LiveFD
 from .hls import HlsFD
+from .hls_live import HlsLiveFD
 from .http import HttpFD
 from .ism import IsmFD
 from .mhtml import MhtmlFD
@@ -110,6 +111,9 @@ def _get_suitable_downloader(info_dict, protocol, params, default):
 
     if protocol in ('m3u8', 'm3u8_native'):
         if info_dict.get('is_live'):
+            if ((external_downloader or '').lower() == 'native' or params.get('hls_prefer_native') is True
+                    or not FFmpegFD.available()):
+                return HlsLiveFD
             return FFmpegFD
         elif (external_downloader or '').lower() == 'native':
             return HlsFD
@@ -0,0 +1,303 @@
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import threading
+import time
+import urllib.parse
+
+
+class _TransferExecutor(concurrent.futures.Executor):
+    """The transfers of a single download, run by a TransferScheduler"""
+
+    def __init__(self, scheduler, max_workers):
+        self._scheduler = scheduler
+        self.max_workers = max_workers
+        self._queue = collections.deque()
+        self._running = 0
+        self._shutdown = False
+
+    def _runnable(self):
+        return self._queue and self._running < self.max_workers
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = concurrent.futures.Future()
+        if self._scheduler.in_worker():
+            # A transfer that waits for other transfers could deadlock the workers
+            _run(future, fn, args, kwargs)
+            return future
+        with self._scheduler._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            self._queue.append((future, fn, args, kwargs))
+            if self._running + len(self._queue) <= self.max_workers:
+                self._scheduler._wake_worker()
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._scheduler._lock:
+            self._shutdown = True
+            if cancel_futures:
+                for future, *_ in self._queue:
+                    future.cancel()
+                self._queue.clear()
+            if wait:
+                self._scheduler._done.wait_for(lambda: not self._queue and not self._running)
+            self._scheduler._remove(self)
+
+
+def _run(future, fn, args, kwargs):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = fn(*args, **kwargs)
+    except BaseException as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+class TransferScheduler:
+    """Run the transfers of all the downloads of a YoutubeDL instance on a shared pool of threads
+
+    Each download gets an executor that runs at most its own number of transfers at a time.
+    When all the workers are busy, the downloads take turns, so that a download with many
+    queued fragments does not hold up the others. Idle workers are stopped after a while.
+
+    @param max_workers  The maximum number of transfers of all the downloads, or None for no limit
+    """
+
+    _IDLE_TIMEOUT = 30
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._done = threading.Condition(self._lock)
+        self._executors = collections.deque()
+        self._workers = 0
+        self._idle = 0
+        # The number of idle workers that were woken, but have not yet got the lock
+        self._wakeups = 0
+        self._local = threading.local()
+
+    def executor(self, max_workers):
+        """An executor for the transfers of one download, of which at most max_workers run at a time"""
+        executor = _TransferExecutor(self, max_workers)
+        with self._lock:
+            self._executors.append(executor)
+        return executor
+
+    def in_worker(self):
+        return getattr(self._local, 'in_worker', False)
+
+    def _remove(self, executor):
+        if executor in self._executors:
+            self._executors.remove(executor)
+
+    def _next_task(self):
+        for _ in range(len(self._executors)):
+            executor = self._executors[0]
+            # Start from the next download the next time
+            self._executors.rotate(-1)
+            if executor._runnable():
+                executor._running += 1
+                return executor, executor._queue.popleft()
+        return None, None
+
+    def _wake_worker(self):
+        if self._idle > self._wakeups:
+            # A worker whose wait has already timed out still takes the wakeup
+            self._wakeups += 1
+            self._work.notify()
+        elif self.max_workers is None or self._workers < self.max_workers:
+            self._workers += 1
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def _worker(self):
+        self._local.in_worker = True
+        with self._lock:
+            while True:
+                executor, task = self._next_task()
+                if executor is None:
+                    self._idle += 1
+                    self._work.wait_for(lambda: self._wakeups, self._IDLE_TIMEOUT)
+                    self._idle -= 1
+                    if self._wakeups:
+                        self._wakeups -= 1
+                        continue
+                    if any(executor._runnable() for executor in self._executors):
+                        continue
+                    self._workers -= 1
+                    return
+
+                self._lock.release()
+                try:
+                    _run(*task)
+                finally:
+                    self._lock.acquire()
+                    executor._running -= 1
+                    self._done.notify_all()
+
+
+# Downloads of a lower class wait while those of a higher class are waiting
+PRIORITY_CLASSES = ('live', 'vod')
+
+
+class TokenBucket:
+    """Limit the rate of transfers to `rate` bytes per second
+
+    Each transfer takes its bytes from the bucket, which may go into debt.
+    Further transfers wait until it has been refilled, so that the average rate
+    over any period longer than a single transfer stays below the limit
+    """
+
+    # Idle time that may be made up for by a burst
+    _MAX_BURST = 1
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._cond = threading.Condition()
+        self._tokens = 0
+        self._last = time.monotonic()
+        self._waiting = collections.Counter()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._last) * self.rate, self.rate * self._MAX_BURST)
+        self._last = now
+
+    def consume(self, amount, priority=0):
+        """Wait until `amount` bytes may be transferred. Lower priority values go first
+        @returns The time waited, in seconds"""
+        if not self.rate:
+            return 0
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    higher_waiting = any(count for other, count in self._waiting.items() if other < priority)
+                    if self._tokens >= 0 and not higher_waiting:
+                        self._tokens -= amount
+                        break
+                    self._cond.wait(max(-self._tokens / self.rate, 0.01))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+        return time.monotonic() - start
+
+    def charge(self, amount):
+        """Account for bytes that were transferred without waiting, e.g. by an external program"""
+        if not self.rate:
+            return
+        with self._cond:
+            self._refill()
+            self._tokens -= amount
+
+
+class BandwidthScheduler:
+    """Limit the bandwidth and the connections per host of all the downloads of a YoutubeDL instance
+
+    @param rate                  The maximum rate of all downloads, in bytes per second
+    @param max_host_connections  The maximum number of connections to each host
+    """
+
+    def __init__(self, rate=None, max_host_connections=None):
+        self._bucket = TokenBucket(rate)
+        self.max_host_connections = max_host_connections
+        self._cond = threading.Condition()
+        self._connections = collections.Counter()
+        self._host_waiters = collections.defaultdict(list)
+        self._counter = itertools.count()
+
+    @property
+    def rate(self):
+        return self._bucket.rate
+
+    @rate.setter
+    def rate(self, rate):
+        self._bucket.rate = rate
+
+    def consume(self, amount, priority=0):
+        return self._bucket.consume(amount, priority)
+
+    def charge(self, amount):
+        self._bucket.charge(amount)
+
+    @contextlib.contextmanager
+    def connection(self, host, priority=0):
+        """Hold one of the connections to the host. Yields the time waited, in seconds"""
+        if not self.max_host_connections:
+            yield 0
+            return
+        start = time.monotonic()
+        with self._cond:
+            waiter = (priority, next(self._counter))
+            waiters = self._host_waiters[host]
+            waiters.append(waiter)
+            try:
+                self._cond.wait_for(lambda: (
+                    self._connections[host] < self.max_host_connections and min(waiters) == waiter))
+            finally:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._host_waiters[host]
+            self._connections[host] += 1
+            # Others may also be able to connect if the limit was increased
+            self._cond.notify_all()
+        try:
+            yield time.monotonic() - start
+        finally:
+            with self._cond:
+                self._connections[host] -= 1
+                if not self._connections[host]:
+                    del self._connections[host]
+                self._cond.notify_all()
+
+
+class DownloadThrottle:
+    """The share of the bandwidth and connections of a single download
+
+    It is shared by all the fragments and byte ranges of the download, so that its rate limit
+    applies to the whole download rather than to each of them
+
+    @param scheduler  The BandwidthScheduler of the YoutubeDL instance
+    @param rate       The maximum rate of this download, in bytes per second
+    @param priority   One of PRIORITY_CLASSES
+    """
+
+    def __init__(self, scheduler, rate=None, priority='vod'):
+        self._scheduler = scheduler
+        self._bucket = TokenBucket(rate)
+        self.priority = priority
+        self._lock = threading.Lock()
+        self.wait_time = 0
+
+    @property
+    def limited(self):
+        return bool(self._bucket.rate or self._scheduler.rate or self._scheduler.max_host_connections)
+
+    def _add_wait_time(self, wait_time):
+        with self._lock:
+            self.wait_time += wait_time
+
+    def consume(self, amount):
+        """Wait until `amount` bytes may be transferred"""
+        priority = PRIORITY_CLASSES.index(self.priority)
+        self._add_wait_time(
+            self._bucket.consume(amount, priority) + self._scheduler.consume(amount, priority))
+
+    def charge(self, amount):
+        self._bucket.charge(amount)
+        self._scheduler.charge(amount)
+
+    @contextlib.contextmanager
+    def connection(self, url):
+        """Hold one of the connections to the host of the URL"""
+        host = (urllib.parse.urlparse(url).hostname or '').lower()
+        with self._scheduler.connection(host, PRIORITY_CLASSES.index(self.priority)) as wait_time:
+            self._add_wait_time(wait_time)
+            yield
+
@@ -7,6 +7,7 @@
 import threading
 import time
 
+from ._scheduler import DownloadThrottle
 from ..minicurses import (
     BreaklineStatusPrinter,
     MultilineLogger,
@@ -49,6 +50,11 @@ class FileDownloader:
     verbose:            Print additional info to stdout.
     quiet:              Do not print messages to stdout.
     ratelimit:          Download speed limit, in bytes/sec.
+    global_ratelimit:   Download speed limit of all the downloads of the
+                        YoutubeDL instance together, in bytes/sec.
+    max_host_connections: Maximum number of connections to the same host of
+                        all the downloads of the YoutubeDL instance. Live streams
+                        take precedence over other downloads for both limits
     throttledratelimit: Assume the download is being throttled below this speed (bytes/sec)
     retries:            Number of times to retry for expected network errors.
                         Default is 0 for API, but 10 for CLI
@@ -74,12 +80,16 @@ class FileDownloader:
                         a webserver (experimental)
     progress_template:  See YoutubeDL.py
     retry_sleep_functions: See YoutubeDL.py
+    max_concurrent_transfers: The maximum number of fragments and byte ranges
+                        that all the downloads of the YoutubeDL instance download
+                        at the same time. Downloads take turns when it is reached
 
     Subclasses of this one must re-define the real_download method.
     """
 
     _TEST_FILE_SIZE = 10241
     params = None
+    _throttle = None
 
     def __init__(self, ydl, params):
         """Create a FileDownloader object with the given options."""
@@ -109,6 +119,18 @@ def _set_ydl(self, ydl):
             if not hasattr(self, func):
                 setattr(self, func, getattr(ydl, func))
 
+    def _transfer_executor(self, max_workers):
+        """An executor that downloads at most max_workers fragments or byte ranges of this download at a time"""
+        return self.ydl._transfer_scheduler.executor(max_workers)
+
+    def _get_throttle(self, is_live=False):
+        """The DownloadThrottle of this download, which is shared with the downloaders of its fragments"""
+        if self._throttle is None:
+            self._throttle = self.params.get('_throttle') or DownloadThrottle(
+                self.ydl._bandwidth_scheduler, self.params.get('ratelimit'),
+                'live' if is_live else 'vod')
+        return self._throttle
+
     def to_screen(self, *args, **kargs):
         self.ydl.to_screen(*args, quiet=self.params.get('quiet'), **kargs)
 
@@ -488,6 +510,9 @@ def real_download(self, filename, info_dict):
     def _hook_progress(self, status, info_dict):
         # Ideally we want to make a copy of the dict, but that is too slow
         status['info_dict'] = info_dict
+        if self._throttle is not None and self._throttle.limited:
+            status['priority'] = self._throttle.priority
+            status['scheduler_wait'] = self._throttle.wait_time
         # youtube-dl passes the same status object to all the hooks.
         # Some third party scripts seems to be relying on this.
         # So keep this behavior if possible
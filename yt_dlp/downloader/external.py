@@ -44,9 +44,12 @@ def real_download(self, filename, info_dict):
         tmpfilename = self.temp_name(filename)
         self._cookies_tempfile = None
 
+        throttle = self._get_throttle(info_dict.get('is_live'))
         try:
             started = time.time()
-            retval = self._call_downloader(tmpfilename, info_dict)
+            # The program limits its own rate, but counts as a connection to the host
+            with throttle.connection(traverse_obj(info_dict, 'url', ('requested_formats', 0, 'url'), default='')):
+                retval = self._call_downloader(tmpfilename, info_dict)
         except KeyboardInterrupt:
             if not info_dict.get('is_live'):
                 raise
@@ -67,6 +70,8 @@ def real_download(self, filename, info_dict):
             }
             if filename != '-':
                 fsize = os.path.getsize(tmpfilename)
+                # Let the other downloads make up for the bandwidth that was used
+                throttle.charge(fsize)
                 self.try_rename(tmpfilename, filename)
                 status.update({
                     'downloaded_bytes': fsize,
@@ -1,9 +1,13 @@
+import collections
 import concurrent.futures
 import contextlib
+import io
+import itertools
 import json
 import math
 import os
 import struct
+import threading
 import time
 
 from .common import FileDownloader
@@ -23,6 +27,27 @@ def to_screen(self, *args, **kargs):
     to_console_title = to_screen
 
 
+class HttpMemoryDownloader(HttpQuietDownloader):
+    """
+    Downloads fragments into memory instead of temporary files.
+    The filename must be "-"; the content is retrieved with pop_content() from the same thread
+    """
+
+    def __init__(self, ydl, params):
+        super().__init__(ydl, {**params, 'continuedl': False})
+        self._local = threading.local()
+
+    def sanitize_open(self, filename, open_mode):
+        assert filename == '-'
+        if 'a' not in open_mode or getattr(self._local, 'buffer', None) is None:
+            self._local.buffer = io.BytesIO()
+        return self._local.buffer, filename
+
+    def pop_content(self):
+        buffer, self._local.buffer = getattr(self._local, 'buffer', None), None
+        return buffer.getvalue() if buffer else None
+
+
 class FragmentFD(FileDownloader):
     """
     A base file downloader class for fragmented media (e.g. f4m/m3u8 manifests).
@@ -36,6 +61,11 @@ class FragmentFD(FileDownloader):
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    fragment_window:    Download fragments into memory instead of temporary files,
+                        keeping at most this many downloaded fragments in memory
+                        before they are written to the output in order.
+                        At most this many fragments are downloaded at a time.
+                        Ignored when keep_fragments is set
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -109,13 +139,23 @@ def _write_ytdl_file(self, ctx):
             frag_index_stream.close()
 
     def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
-        fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
         fragment_info_dict = {
             'url': frag_url,
             'http_headers': headers or info_dict.get('http_headers'),
             'request_data': request_data,
             'ctx_id': ctx.get('ctx_id'),
         }
+        if ctx.get('fragments_in_memory'):
+            ctx['dl'].pop_content()
+            success, _ = ctx['dl'].download('-', fragment_info_dict)
+            if not success:
+                return False
+            if fragment_info_dict.get('filetime'):
+                ctx['fragment_filetime'] = fragment_info_dict.get('filetime')
+            ctx['fragment_content'] = ctx['dl'].pop_content()
+            return True
+
+        fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
             frag_resume_len = self.filesize_or_none(self.temp_name(fragment_filename))
@@ -130,6 +170,8 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
         return True
 
     def _read_fragment(self, ctx):
+        if ctx.get('fragments_in_memory'):
+            return ctx.pop('fragment_content', None)
         if not ctx.get('fragment_filename_sanitized'):
             return None
         try:
@@ -150,9 +192,10 @@ def _append_fragment(self, ctx, frag_content):
         finally:
             if self.__do_ytdl_file(ctx):
                 self._write_ytdl_file(ctx)
-            if not self.params.get('keep_fragments', False):
-                self.try_remove(ctx['fragment_filename_sanitized'])
-            del ctx['fragment_filename_sanitized']
+            if not ctx.get('fragments_in_memory'):
+                if not self.params.get('keep_fragments', False):
+                    self.try_remove(ctx['fragment_filename_sanitized'])
+                del ctx['fragment_filename_sanitized']
 
     def _prepare_frag_download(self, ctx):
         if not ctx.setdefault('live', False):
@@ -164,13 +207,17 @@ def _prepare_frag_download(self, ctx):
             total_frags_str = 'unknown (live)'
         self.to_screen(f'[{self.FD_NAME}] Total fragments: {total_frags_str}')
         self.report_destination(ctx['filename'])
-        dl = HttpQuietDownloader(self.ydl, {
+        ctx['fragments_in_memory'] = bool(
+            self.params.get('fragment_window') and not self.params.get('keep_fragments', False))
+        dl = (HttpMemoryDownloader if ctx['fragments_in_memory'] else HttpQuietDownloader)(self.ydl, {
             **self.params,
             'noprogress': True,
             'test': False,
             'sleep_interval': 0,
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
+            'http_connections': 1,
+            '_throttle': self._get_throttle(ctx['live']),
         })
         tmpfilename = self.temp_name(ctx['filename'])
         open_mode = 'wb'
@@ -364,6 +411,23 @@ def decrypt_fragment(fragment, frag_content):
 
         return decrypt_fragment
 
+    @staticmethod
+    def _bounded_map(pool, func, iterable, window):
+        """
+        Like pool.map, but yields the results in order while keeping at most
+        `window` items submitted or awaiting consumption at any time
+        """
+        iterator = iter(iterable)
+        pending = collections.deque(pool.submit(func, item) for item in itertools.islice(iterator, window))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(pool.submit(func, item) for item in itertools.islice(iterator, 1))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
     def download_and_append_fragments_multiple(self, *args, **kwargs):
         """
         @params (ctx1, fragments1, info_dict1), (ctx2, fragments2, info_dict2), ...
@@ -373,21 +437,15 @@ def download_and_append_fragments_multiple(self, *args, **kwargs):
         max_progress = len(args)
         if max_progress == 1:
             return self.download_and_append_fragments(*args[0], **kwargs)
-        max_workers = self.params.get('concurrent_fragment_downloads', 1)
         if max_progress > 1:
             self._prepare_multiline_status(max_progress)
         is_live = any(traverse_obj(args, (..., 2, 'is_live')))
 
-        def thread_func(idx, ctx, fragments, info_dict, tpe):
+        def thread_func(idx, ctx, fragments, info_dict):
             ctx['max_progress'] = max_progress
             ctx['progress_idx'] = idx
             return self.download_and_append_fragments(
-                ctx, fragments, info_dict, **kwargs, tpe=tpe, interrupt_trigger=interrupt_trigger)
-
-        class FTPE(concurrent.futures.ThreadPoolExecutor):
-            # has to stop this or it's going to wait on the worker thread itself
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                pass
+                ctx, fragments, info_dict, **kwargs, interrupt_trigger=interrupt_trigger)
 
         if os.name == 'nt':
             def future_result(future):
@@ -410,8 +468,10 @@ def interrupt_trigger_iter(fg):
 
         spins = []
         for idx, (ctx, fragments, info_dict) in enumerate(args):
-            tpe = FTPE(math.ceil(max_workers / max_progress))
-            job = tpe.submit(thread_func, idx, ctx, interrupt_trigger_iter(fragments), info_dict, tpe)
+            # The fragments themselves are downloaded by the transfer scheduler,
+            # with the concurrent_fragment_downloads split between the formats (see max_progress)
+            tpe = concurrent.futures.ThreadPoolExecutor(1)
+            job = tpe.submit(thread_func, idx, ctx, interrupt_trigger_iter(fragments), info_dict)
             spins.append((tpe, job))
 
         result = True
@@ -484,17 +544,27 @@ def append_fragment(frag_content, frag_index, ctx):
 
         max_workers = math.ceil(
             self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
+        if ctx.get('fragments_in_memory'):
+            max_workers = min(max_workers, self.params['fragment_window'])
         if max_workers > 1:
             def _download_fragment(fragment):
                 ctx_copy = ctx.copy()
                 download_fragment(fragment, ctx_copy)
-                return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
-
-            with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+                return fragment, fragment['frag_index'], {
+                    key: ctx_copy[key] for key in ('fragment_filename_sanitized', 'fragment_content') if key in ctx_copy}
+
+            with tpe or self._transfer_executor(max_workers) as pool:
+                if ctx.get('fragments_in_memory'):
+                    # The window bounds the number of fragments held in memory; each fragment
+                    # is appended as soon as all the preceding ones have been written
+                    results = self._bounded_map(pool, _download_fragment, fragments, self.params['fragment_window'])
+                else:
+                    results = pool.map(_download_fragment, fragments)
                 try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
+                    for fragment, frag_index, frag_state in results:
                         ctx.update({
-                            'fragment_filename_sanitized': frag_filename,
+                            'fragment_filename_sanitized': None,
+                            **frag_state,
                             'fragment_index': frag_index,
                         })
                         if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
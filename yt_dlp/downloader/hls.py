@@ -106,7 +106,7 @@ def real_download(self, filename, info_dict):
                 if has_ffmpeg and ffmpeg_can_dl:
                     can_download = False
                 else:
-                    message += '; decryption will be performed natively, but will be extremely slow'
+                    message += '; decryption will be performed natively, but will be slow'
             elif info_dict.get('extractor_key') == 'Generic' and re.search(r'(?m)#EXT-X-MEDIA-SEQUENCE:(?!0$)', s):
                 install_ffmpeg = '' if has_ffmpeg else 'install ffmpeg and '
                 message = ('Live HLS streams are not supported by the native downloader. If this is a livestream, '
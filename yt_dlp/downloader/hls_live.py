@@ -0,0 +1,287 @@
+import time
+
+from .external import FFmpegFD
+from .fragment import FragmentFD
+from ..networking.exceptions import HTTPError, IncompleteRead, RequestError
+from ..utils import (
+    DownloadError,
+    RetryManager,
+    float_or_none,
+    int_or_none,
+    parse_m3u8_attributes,
+    update_url_query,
+    urljoin,
+)
+from ..utils.networking import HTTPHeaderDict
+
+
+def _parse_byte_range(value, offset):
+    length, _, start = value.partition('@')
+    start = int(start) if start else offset
+    return {'start': start, 'end': start + int(length)}
+
+
+class HlsLiveFD(FragmentFD):
+    """
+    Download a live m3u8 media playlist as it is being published
+
+    The playlist is reloaded until it ends. For Low-Latency HLS, the parts of the segment that is
+    being published (EXT-X-PART) are downloaded as soon as they are listed, the next part is requested
+    in advance (EXT-X-PRELOAD-HINT), and the playlist reloads are blocked by the server until the
+    next part is available (_HLS_msn/_HLS_part), so that the output lags the stream by about a part
+    """
+
+    FD_NAME = 'hlslive'
+
+    # Assume that the stream has ended if the playlist is not updated for this many target durations
+    _STALE_TARGET_DURATIONS = 6
+
+    @staticmethod
+    def _parse_playlist(manifest, base_url):
+        """
+        Parse a live media playlist
+        @returns {
+            'media_sequence', 'target_duration', 'part_target', 'can_block_reload', 'ended', 'encrypted',
+            'segments': [{'msn', 'url', 'byte_range', 'map', 'parts': [{'url', 'byte_range', 'gap'}]}],
+            'preload_hint': {'url'} or None,
+        }
+        The last segment has no url while its parts are being published
+        """
+        playlist = {
+            'media_sequence': 0,
+            'target_duration': None,
+            'part_target': None,
+            'can_block_reload': False,
+            'ended': False,
+            'encrypted': False,
+            'segments': [],
+            'preload_hint': None,
+        }
+        segments = playlist['segments']
+        init_map = byte_range = None
+        parts = []
+        segment_offset = part_offset = 0
+
+        def add_segment(url):
+            segments.append({
+                'msn': playlist['media_sequence'] + len(segments),
+                'url': url,
+                'byte_range': byte_range,
+                'map': init_map,
+                'parts': parts,
+            })
+
+        for line in manifest.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith('#'):
+                add_segment(urljoin(base_url, line))
+                if byte_range:
+                    segment_offset = byte_range['end']
+                parts, byte_range = [], None
+                continue
+
+            tag, _, value = line.partition(':')
+            if tag == '#EXT-X-MEDIA-SEQUENCE':
+                playlist['media_sequence'] = int(value)
+            elif tag == '#EXT-X-TARGETDURATION':
+                playlist['target_duration'] = float_or_none(value)
+            elif tag == '#EXT-X-PART-INF':
+                playlist['part_target'] = float_or_none(parse_m3u8_attributes(value).get('PART-TARGET'))
+            elif tag == '#EXT-X-SERVER-CONTROL':
+                playlist['can_block_reload'] = parse_m3u8_attributes(value).get('CAN-BLOCK-RELOAD') == 'YES'
+            elif tag == '#EXT-X-ENDLIST':
+                playlist['ended'] = True
+            elif tag == '#EXT-X-KEY':
+                playlist['encrypted'] = parse_m3u8_attributes(value).get('METHOD') != 'NONE'
+            elif tag == '#EXT-X-MAP':
+                attrs = parse_m3u8_attributes(value)
+                init_map = {
+                    'url': urljoin(base_url, attrs['URI']),
+                    'byte_range': _parse_byte_range(attrs['BYTERANGE'], 0) if attrs.get('BYTERANGE') else None,
+                }
+            elif tag == '#EXT-X-BYTERANGE':
+                byte_range = _parse_byte_range(value, segment_offset)
+            elif tag == '#EXT-X-PART':
+                attrs = parse_m3u8_attributes(value)
+                part_range = None
+                if attrs.get('BYTERANGE'):
+                    part_range = _parse_byte_range(attrs['BYTERANGE'], part_offset)
+                    part_offset = part_range['end']
+                parts.append({
+                    'url': urljoin(base_url, attrs['URI']),
+                    'byte_range': part_range,
+                    'gap': attrs.get('GAP') == 'YES',
+                })
+            elif tag == '#EXT-X-PRELOAD-HINT':
+                attrs = parse_m3u8_attributes(value)
+                # Hints for the rest of a resource that is being written are not supported
+                if attrs.get('TYPE') == 'PART' and not int_or_none(attrs.get('BYTERANGE-START')):
+                    playlist['preload_hint'] = {'url': urljoin(base_url, attrs['URI'])}
+
+        if parts:
+            add_segment(None)
+        return playlist
+
+    def _download_playlist(self, info_dict, url):
+        """@returns (url, playlist), or (None, None) if the playlist is no longer available"""
+        for retry in RetryManager(self.params.get('fragment_retries'), self.report_retry, fatal=False):
+            try:
+                urlh = self.ydl.urlopen(self._prepare_url(info_dict, url))
+                return urlh.url, self._parse_playlist(urlh.read().decode('utf-8', 'ignore'), urlh.url)
+            except HTTPError as err:
+                if err.status in (404, 410):
+                    return None, None
+                retry.error = err
+            except RequestError as err:
+                retry.error = err
+        return None, None
+
+    def _append_media(self, ctx, info_dict, url, byte_range=None, retries=None):
+        """Download a segment, part or initialization section and append it to the output
+        @returns The number of bytes that were appended, or 0 if it could not be downloaded"""
+        ctx['fragment_index'] += 1
+        headers = HTTPHeaderDict(info_dict.get('http_headers'))
+        if byte_range:
+            headers['Range'] = 'bytes=%d-%s' % (
+                byte_range['start'], byte_range['end'] - 1 if byte_range['end'] is not None else '')
+
+        success = False
+        for retry in RetryManager(
+                self.params.get('fragment_retries') if retries is None else retries,
+                self.report_retry, frag_index=ctx['fragment_index'], fatal=False):
+            try:
+                success = self._download_fragment(ctx, url, info_dict, headers)
+            except (HTTPError, IncompleteRead) as err:
+                retry.error = err
+            except DownloadError:  # has own retry settings
+                break
+        content = success and self._read_fragment(ctx)
+        if not content:
+            ctx['fragment_index'] -= 1
+            return 0
+        self._append_fragment(ctx, content)
+        return len(content)
+
+    def _append_segment(self, ctx, info_dict, segment):
+        if self._append_media(ctx, info_dict, segment['url'], segment['byte_range']):
+            return True
+        if not self.params.get('skip_unavailable_fragments', True):
+            self.report_error(f'Segment {segment["msn"]} could not be downloaded, unable to continue')
+            return False
+        self.to_screen(f'[download] Skipping segment {segment["msn"]} ...')
+        return True
+
+    def real_download(self, filename, info_dict):
+        self.to_screen(f'[{self.FD_NAME}] Downloading m3u8 manifest')
+        man_url, playlist = self._download_playlist(info_dict, info_dict['url'])
+        if not playlist:
+            self.report_error('Unable to download the m3u8 manifest')
+            return False
+        if playlist['encrypted']:
+            if not FFmpegFD.available():
+                self.report_error(
+                    f'The stream is encrypted, which is not supported by {self.FD_NAME}; '
+                    'install ffmpeg to download it')
+                return False
+            fd = FFmpegFD(self.ydl, self.params)
+            self.report_warning(
+                f'The stream is encrypted, which is not supported by {self.FD_NAME}; '
+                f'extraction will be delegated to {fd.get_basename()}')
+            return fd.real_download(filename, info_dict)
+
+        ctx = {
+            'filename': filename,
+            'live': True,
+            'total_frags': None,
+        }
+        self._prepare_and_start_frag_download(ctx, info_dict)
+
+        # Start from the last complete segment, or the one that is being published
+        segments = playlist['segments']
+        complete = [segment for segment in segments if segment['url']]
+        if complete:
+            next_msn = complete[-1]['msn']
+        elif segments:
+            next_msn = segments[0]['msn']
+        else:
+            next_msn = playlist['media_sequence']
+        next_part = 0
+        # The size of the parts of the next segment that have been appended
+        part_bytes = 0
+        current_map = None
+        last_update = time.monotonic()
+        try:
+            while True:
+                position = next_msn, next_part
+                for segment in playlist['segments']:
+                    if segment['msn'] < next_msn:
+                        continue
+                    elif segment['msn'] > next_msn:
+                        self.report_warning(
+                            f'{segment["msn"] - next_msn} segments were removed from the playlist before '
+                            'they could be downloaded')
+                        next_msn, next_part, part_bytes = segment['msn'], 0, 0
+
+                    if segment['map'] and segment['map'] != current_map:
+                        if not self._append_media(ctx, info_dict, segment['map']['url'], segment['map']['byte_range']):
+                            self.report_error('Unable to download the initialization section')
+                            return False
+                        current_map = segment['map']
+
+                    if segment['url'] and not next_part:
+                        if not self._append_segment(ctx, info_dict, segment):
+                            return False
+                    elif segment['url'] and next_part > len(segment['parts']):
+                        # The parts were removed from the playlist after some of them were appended,
+                        # so request the rest of the segment. Gaps and skipped parts are not accounted for
+                        start = (segment['byte_range'] or {}).get('start', 0) + part_bytes
+                        end = (segment['byte_range'] or {}).get('end')
+                        if not self._append_media(ctx, info_dict, segment['url'], {'start': start, 'end': end}):
+                            self.report_warning(f'Skipping the rest of segment {segment["msn"]}')
+                    else:
+                        for part in segment['parts'][next_part:]:
+                            if not part['gap']:
+                                size = self._append_media(ctx, info_dict, part['url'], part['byte_range'])
+                                if not size:
+                                    self.report_warning(f'Skipping a part of segment {segment["msn"]}')
+                                part_bytes += size
+                            next_part += 1
+                        if not segment['url']:
+                            break
+                    next_msn, next_part, part_bytes = segment['msn'] + 1, 0, 0
+
+                if playlist['ended'] or (self.params.get('test') and ctx['fragment_index']):
+                    break
+                # The hinted part is the one after the last listed part, which is (next_msn, next_part).
+                # Requesting it now returns it as soon as it is published
+                hint = playlist['preload_hint']
+                size = hint and self._append_media(ctx, info_dict, hint['url'], retries=0)
+                if size:
+                    next_part += 1
+                    part_bytes += size
+
+                if (next_msn, next_part) != position:
+                    last_update = time.monotonic()
+                elif time.monotonic() - last_update > self._STALE_TARGET_DURATIONS * (playlist['target_duration'] or 1):
+                    self.report_warning('The playlist is no longer being updated; assuming that the stream has ended')
+                    break
+
+                if playlist['can_block_reload']:
+                    query = {'_HLS_msn': next_msn}
+                    if playlist['part_target']:
+                        query['_HLS_part'] = next_part
+                    reload_url = update_url_query(man_url, query)
+                else:
+                    time.sleep(playlist['part_target'] or playlist['target_duration'] or 1)
+                    reload_url = man_url
+                _, playlist = self._download_playlist(info_dict, reload_url)
+                if not playlist:
+                    self.to_screen(f'[{self.FD_NAME}] The playlist is no longer available; assuming that the stream has ended')
+                    break
+        except KeyboardInterrupt:
+            self._finish_multiline_status()
+            self.to_screen(f'[{self.FD_NAME}] Interrupted by user')
+
+        return self._finish_frag_download(ctx, info_dict)
@@ -1,5 +1,8 @@
+import json
+import math
 import os
 import random
+import threading
 import time
 
 from .common import FileDownloader
@@ -21,6 +24,21 @@
 
 
 class HttpFD(FileDownloader):
+    """
+    Available options:
+
+    http_connections:   Number of connections to use for downloading a single file.
+                        The file is split into byte ranges which are written at their
+                        offsets in the preallocated .part file. The download state is
+                        kept in a .ytdl file so that the download can be resumed.
+                        Only used if the server supports byte ranges
+    """
+
+    # Files smaller than two segments of this size are always downloaded with one connection
+    _MIN_SEGMENT_SIZE = 1024 * 1024
+    # Minimum interval between writes of the .ytdl file during a segmented download
+    _SEGMENT_STATE_INTERVAL = 1
+
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
@@ -52,10 +70,18 @@ class DownloadContext(dict):
         ctx.resume_len = 0
         ctx.block_size = self.params.get('buffersize', 1024)
         ctx.start_time = time.time()
+        throttle = self._get_throttle(info_dict.get('is_live'))
 
         # parse given Range
         req_start, req_end, _ = parse_http_range(headers.get('Range'))
 
+        connections = self.params.get('http_connections') or 1
+        if (connections > 1 and not is_test and filename != '-'
+                and req_start is None and req_end is None and not self.params.get('nopart', False)):
+            result = self._segmented_download(filename, info_dict, headers, request_extensions, connections)
+            if result is not None:
+                return result
+
         if self.params.get('continuedl', True):
             # Establish possible resume length
             if os.path.isfile(ctx.tmpfilename):
@@ -230,8 +256,7 @@ def download():
             block_size = ctx.block_size
             start = time.time()
 
-            # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
-            now = None  # needed for slow_down() in the first loop run
+            # measure time over whole while-loop, so that best_block_size() accounts for the rate limit
             before = start  # start measuring
 
             def retry(e):
@@ -278,7 +303,7 @@ def retry(e):
                     return False
 
                 # Apply rate limit
-                self.slow_down(start, now, byte_counter - ctx.resume_len)
+                throttle.consume(len(data_block))
 
                 # end measuring of one loop run
                 now = time.time()
@@ -357,20 +382,221 @@ def retry(e):
 
             return True
 
-        for retry in RetryManager(self.params.get('retries'), self.report_retry):
+        with throttle.connection(url):
+            for retry in RetryManager(self.params.get('retries'), self.report_retry):
+                try:
+                    establish_connection()
+                    return download()
+                except RetryDownload as err:
+                    retry.error = err.source_error
+                    continue
+                except NextFragment:
+                    retry.error = None
+                    retry.attempt -= 1
+                    continue
+                except SucceedDownload:
+                    return True
+                except:  # noqa: E722
+                    close_stream()
+                    raise
+            return False
+
+    def _probe_segmented_download(self, url, request_data, headers, request_extensions):
+        """Return the size and the Last-Modified header of the resource if it can be downloaded
+        in byte ranges, else (None, None)"""
+        request = Request(
+            url, request_data, HTTPHeaderDict(headers, {'Range': 'bytes=0-0'}), extensions=request_extensions)
+        try:
+            with self.ydl.urlopen(request) as response:
+                if response.status != 206 or response.headers.get('Content-encoding'):
+                    return None, None
+                _, _, total_bytes = parse_http_range(response.headers.get('Content-Range'))
+                return total_bytes, response.headers.get('Last-Modified')
+        except (HTTPError, TransportError) as err:
+            self.write_debug(f'Unable to probe for byte range support: {err}')
+            return None, None
+
+    def _read_segments_state(self, filename, tmpfilename, total_bytes):
+        if not self.params.get('continuedl', True) or not os.path.isfile(self.ytdl_filename(filename)):
+            return None
+        stream, _ = self.sanitize_open(self.ytdl_filename(filename), 'r')
+        try:
+            state = json.loads(stream.read())['downloader']
+            segments = state['http_segments']
+            assert state['total_bytes'] == total_bytes
+            assert all(0 <= s['downloaded'] <= s['end'] - s['start'] + 1 for s in segments)
+        except Exception:
+            self.report_warning('.ytdl file is corrupt or does not match the remote file. Restarting from the beginning ...')
+            return None
+        finally:
+            stream.close()
+        if self.filesize_or_none(tmpfilename) != total_bytes:
+            return None
+        self.report_resuming_byte(sum(s['downloaded'] for s in segments))
+        return segments
+
+    def _write_segments_state(self, filename, total_bytes, segments):
+        stream, _ = self.sanitize_open(self.ytdl_filename(filename), 'w')
+        try:
+            stream.write(json.dumps({'downloader': {
+                'total_bytes': total_bytes,
+                'http_segments': segments,
+            }}))
+        finally:
+            stream.close()
+
+    def _segmented_download(self, filename, info_dict, headers, request_extensions, connections):
+        """
+        Download the file over several connections, each fetching one byte range.
+        Returns None if the server does not support this, so that the caller can fall back
+        """
+        url = info_dict['url']
+        request_data = info_dict.get('request_data')
+        total_bytes, last_modified = self._probe_segmented_download(url, request_data, headers, request_extensions)
+        if not total_bytes or total_bytes < 2 * self._MIN_SEGMENT_SIZE:
+            return None
+
+        min_data_len = self.params.get('min_filesize')
+        max_data_len = self.params.get('max_filesize')
+        if min_data_len is not None and total_bytes < min_data_len:
+            self.to_screen(
+                f'\r[download] File is smaller than min-filesize ({total_bytes} bytes < {min_data_len} bytes). Aborting.')
+            return False
+        if max_data_len is not None and total_bytes > max_data_len:
+            self.to_screen(
+                f'\r[download] File is larger than max-filesize ({total_bytes} bytes > {max_data_len} bytes). Aborting.')
+            return False
+
+        tmpfilename = self.temp_name(filename)
+        segments = self._read_segments_state(filename, tmpfilename, total_bytes)
+        if segments is None:
+            if (self.params.get('continuedl', True) and self.filesize_or_none(tmpfilename)
+                    and not os.path.isfile(self.ytdl_filename(filename))):
+                # The .part file was not written in byte ranges, so it can only be resumed over one connection
+                self.write_debug('Resuming a download that was started with a single connection')
+                return None
+            count = min(connections, total_bytes // self._MIN_SEGMENT_SIZE)
+            segment_size = math.ceil(total_bytes / count)
+            segments = [{
+                'start': start,
+                'end': min(start + segment_size, total_bytes) - 1,
+                'downloaded': 0,
+            } for start in range(0, total_bytes, segment_size)]
+            # Preallocate the file so that every connection can write at its own offset
+            stream, tmpfilename = self.sanitize_open(tmpfilename, 'wb')
             try:
-                establish_connection()
-                return download()
-            except RetryDownload as err:
-                retry.error = err.source_error
-                continue
-            except NextFragment:
-                retry.error = None
-                retry.attempt -= 1
-                continue
-            except SucceedDownload:
-                return True
-            except:  # noqa: E722
-                close_stream()
+                stream.truncate(total_bytes)
+            finally:
+                stream.close()
+        self._write_segments_state(filename, total_bytes, segments)
+        self.report_destination(filename)
+
+        lock = threading.Lock()
+        interrupted = threading.Event()
+        throttle = self._get_throttle(info_dict.get('is_live'))
+        start_time = time.time()
+        resume_len = sum(s['downloaded'] for s in segments)
+        progress = {'downloaded_bytes': resume_len, 'state_written': start_time, 'throttle_start': None}
+
+        def update_progress(segment, length):
+            with lock:
+                segment['downloaded'] += length
+                progress['downloaded_bytes'] += length
+                byte_counter = progress['downloaded_bytes']
+                now = time.time()
+                if now - progress['state_written'] >= self._SEGMENT_STATE_INTERVAL:
+                    progress['state_written'] = now
+                    self._write_segments_state(filename, total_bytes, segments)
+                speed = self.calc_speed(start_time, now, byte_counter - resume_len)
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': byte_counter,
+                    'total_bytes': total_bytes,
+                    'tmpfilename': tmpfilename,
+                    'filename': filename,
+                    'eta': self.calc_eta(start_time, now, total_bytes - resume_len, byte_counter - resume_len),
+                    'speed': speed,
+                    'elapsed': now - start_time,
+                    'ctx_id': info_dict.get('ctx_id'),
+                }, info_dict)
+                # The combined speed of all connections must stay below the limit for 3 seconds
+                if speed and speed < (self.params.get('throttledratelimit') or 0):
+                    if progress['throttle_start'] is None:
+                        progress['throttle_start'] = now
+                    elif now - progress['throttle_start'] > 3:
+                        raise ThrottledDownload
+                elif speed:
+                    progress['throttle_start'] = None
+            # The rate limit applies to the combined speed of all connections
+            throttle.consume(length)
+
+        def download_segment(segment):
+            block_size = self.params.get('buffersize', 1024)
+            for retry in RetryManager(self.params.get('retries'), self.report_retry):
+                range_start = segment['start'] + segment['downloaded']
+                if range_start > segment['end']:
+                    return True
+                request = Request(url, request_data, HTTPHeaderDict(
+                    headers, {'Range': f'bytes={range_start}-{segment["end"]}'}), extensions=request_extensions)
+                try:
+                    with throttle.connection(url), self.ydl.urlopen(request) as response:
+                        content_range_start, _, _ = parse_http_range(response.headers.get('Content-Range'))
+                        if response.status != 206 or content_range_start != range_start:
+                            raise TransportError(f'Server did not honor the requested range {range_start}-{segment["end"]}')
+                        with open(tmpfilename, 'r+b') as stream:
+                            stream.seek(range_start)
+                            before = time.time()
+                            while not interrupted.is_set():
+                                data_block = response.read(block_size)[:segment['end'] + 1 - stream.tell()]
+                                if not data_block:
+                                    break
+                                stream.write(data_block)
+                                update_progress(segment, len(data_block))
+                                after = time.time()
+                                if not self.params.get('noresizebuffer', False):
+                                    block_size = self.best_block_size(after - before, len(data_block))
+                                before = after
+                    if interrupted.is_set():
+                        return False
+                    remaining = segment['end'] + 1 - segment['start'] - segment['downloaded']
+                    if remaining:
+                        raise ContentTooShortError(segment['end'] + 1 - range_start - remaining, segment['end'] + 1 - range_start)
+                    return True
+                except HTTPError as err:
+                    if err.status < 500 or err.status >= 600:
+                        raise
+                    retry.error = err
+                except CertificateVerifyError:
+                    raise
+                except (TransportError, ContentTooShortError) as err:
+                    retry.error = err
+            return False
+
+        with self._transfer_executor(len(segments)) as pool:
+            futures = [pool.submit(download_segment, segment) for segment in segments]
+            try:
+                success = all(future.result() for future in futures)
+            except BaseException:
+                interrupted.set()
+                with lock:
+                    self._write_segments_state(filename, total_bytes, segments)
                 raise
-        return False
+
+        if not success:
+            with lock:
+                self._write_segments_state(filename, total_bytes, segments)
+            return False
+
+        self.try_remove(self.ytdl_filename(filename))
+        self.try_rename(tmpfilename, filename)
+        if self.params.get('updatetime'):
+            info_dict['filetime'] = self.try_utime(filename, last_modified)
+        self._hook_progress({
+            'downloaded_bytes': total_bytes,
+            'total_bytes': total_bytes,
+            'filename': filename,
+            'status': 'finished',
+            'elapsed': time.time() - start_time,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
+        return True
@@ -1,4 +1,3 @@
-import asyncio
 import contextlib
 import os
 import signal
@@ -13,6 +12,8 @@ class FFmpegSinkFD(FileDownloader):
     """ A sink to ffmpeg for downloading fragments in any form """
 
     def real_download(self, filename, info_dict):
+        import asyncio  # Importing asyncio is slow, so only do it when needed
+
         info_copy = info_dict.copy()
         info_copy['url'] = '-'
 
@@ -0,0 +1,154 @@
+import collections
+import functools
+import re
+import sys
+
+from ..utils import variadic
+
+if sys.version_info >= (3, 11):
+    sre_constants, sre_parse = re._constants, re._parser
+else:
+    import sre_constants
+    import sre_parse
+
+KEY_LENGTH = 3
+DISPATCH_KEYS_ATTR = '_URL_DISPATCH_KEYS'
+
+
+def _requirements(subpattern):
+    """
+    The lowercased substrings of KEY_LENGTH that any string matching the parsed pattern contains.
+    A tuple stands for a branch, of which the requirements of any one alternative are met
+    """
+    requirements, run = set(), []
+
+    def end_run():
+        requirements.update(''.join(run[i:i + KEY_LENGTH]) for i in range(len(run) - KEY_LENGTH + 1))
+        run.clear()
+
+    for op, av in subpattern:
+        if op is sre_constants.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        elif op is sre_constants.AT:  # Anchors do not consume any characters
+            continue
+        end_run()
+        if op is sre_constants.SUBPATTERN:
+            requirements.update(_requirements(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            requirements.update(_requirements(av[2]))
+        elif op is sre_constants.BRANCH:
+            alternatives = tuple(map(_requirements, av[1]))
+            if all(alternatives):
+                requirements.add(alternatives)
+    end_run()
+    return frozenset(requirements)
+
+
+def _iter_keys(requirements):
+    for requirement in requirements:
+        if isinstance(requirement, str):
+            yield requirement
+        else:
+            for alternative in requirement:
+                yield from _iter_keys(alternative)
+
+
+def _choose_keys(requirements, counts):
+    """Choose the keys that are shared with the fewest other patterns"""
+    choices = []
+    for requirement in requirements:
+        if isinstance(requirement, str):
+            choices.append((counts[requirement], (requirement,)))
+            continue
+        alternatives = [_choose_keys(alternative, counts) for alternative in requirement]
+        choices.append((
+            sum(cost for cost, _ in alternatives),
+            tuple(sorted({key for _, keys in alternatives for key in keys}))))
+    return min(choices)
+
+
+def _pattern_requirements(pattern):
+    try:
+        return _requirements(sre_parse.parse(pattern))
+    except (re.error, TypeError):
+        return frozenset()
+
+
+def _has_default_url_matching(cls):
+    for name in ('suitable', '_match_valid_url'):
+        owner = next(klass for klass in cls.__mro__ if name in klass.__dict__)
+        if owner.__name__ == 'InfoExtractor' and owner.__module__ == 'yt_dlp.extractor.common':
+            continue
+        elif owner.__name__ == 'LazyLoadExtractor' and owner.__module__ == 'yt_dlp.extractor.lazy_extractors':
+            continue
+        return False
+    return True
+
+
+@functools.cache
+def _class_requirements(cls):
+    """
+    The requirements of each _VALID_URL pattern of the extractor,
+    or None if the extractor has to be tried for every URL
+    """
+    if not _has_default_url_matching(cls):
+        return None
+    valid_url = cls._VALID_URL
+    if valid_url is False:
+        return ()
+    elif not valid_url:
+        return None
+    requirements = tuple(map(_pattern_requirements, variadic(valid_url)))
+    if not all(requirements):
+        return None
+    return requirements
+
+
+def get_dispatch_keys(ies):
+    """
+    Get the dispatch keys of each extractor: for each _VALID_URL pattern, a tuple of keys
+    of which any URL matching the pattern contains at least one. None if the extractor has no keys
+    """
+    classes = [ie if isinstance(ie, type) else type(ie) for ie in ies]
+    dispatch_keys = [cls.__dict__.get(DISPATCH_KEYS_ATTR, ...) for cls in classes]
+    requirements = [_class_requirements(cls) if keys is ... else None
+                    for cls, keys in zip(classes, dispatch_keys, strict=True)]
+
+    counts = collections.Counter(
+        key for pattern_requirements in filter(None, requirements)
+        for requirement in pattern_requirements for key in set(_iter_keys(requirement)))
+    for i, pattern_requirements in enumerate(requirements):
+        if dispatch_keys[i] is not ...:
+            continue
+        dispatch_keys[i] = None if pattern_requirements is None else tuple(
+            _choose_keys(requirement, counts)[1] for requirement in pattern_requirements)
+    return dispatch_keys
+
+
+class URLDispatchIndex:
+    """Find the extractors that may be suitable for a URL without trying the _VALID_URL of every extractor
+
+    Each extractor is indexed by short substrings that any URL it can match must contain.
+    Extractors that override URL matching, or whose patterns have no such substrings,
+    are candidates for every URL. The candidates keep the order of the given extractors
+    """
+
+    def __init__(self, ies):
+        self._ie_keys = list(ies)
+        self._always = []
+        self._index = collections.defaultdict(list)
+        for position, keys in enumerate(get_dispatch_keys(ies.values())):
+            if keys is None:
+                self._always.append(position)
+                continue
+            for key in {key for pattern_keys in keys for key in pattern_keys}:
+                self._index[key].append(position)
+
+    def candidates(self, url):
+        """The keys of the extractors that may be suitable for the URL, in order"""
+        url = url.casefold()
+        positions = set(self._always)
+        for key in {url[i:i + KEY_LENGTH] for i in range(len(url) - KEY_LENGTH + 1)}:
+            positions.update(self._index.get(key, ()))
+        return [self._ie_keys[position] for position in sorted(positions)]
@@ -69,6 +69,7 @@
     int_or_none,
     join_nonempty,
     js_to_json,
+    json_object_end,
     mimetype2ext,
     netrc_from_content,
     orderedSet,
@@ -1355,6 +1356,11 @@ def _search_json(self, start_pattern, string, name, video_id, *, end_pattern='',
         else:
             fatal, has_default = False, True
 
+        if contains_pattern == r'{(?s:.+)}':
+            json_object = self._search_json_object(start_pattern, string, end_pattern, **kwargs)
+            if json_object:
+                return json_object
+
         json_string = self._search_regex(
             rf'(?:{start_pattern})\s*(?P<json>{contains_pattern})\s*(?:{end_pattern})',
             string, name, group='json', fatal=fatal, default=None if has_default else NO_DEFAULT)
@@ -1373,6 +1379,34 @@ def _search_json(self, start_pattern, string, name, video_id, *, end_pattern='',
                     f'Unable to extract {_name} - Failed to parse JSON: {e}', video_id=video_id)
         return default
 
+    @staticmethod
+    def _search_json_object(start_pattern, string, end_pattern, transform_source=None, **kwargs):
+        """
+        Find and parse the first JSON object after start_pattern, without copying the rest of the string
+        @returns    The object, or None if it should be searched for with _search_json's regex instead
+        """
+        if kwargs or not isinstance(string, str):
+            return None
+        mobj = re.search(rf'(?:{start_pattern})\s*(?={{)', string)
+        if not mobj:
+            return None
+        start = mobj.end()
+        try:
+            if transform_source:
+                # Only the object needs to be transformed, which is usually much shorter than the rest of the page
+                end = json_object_end(string, start)
+                if end is None:
+                    return None
+                json_object = json.loads(
+                    transform_source(string[start:end]), cls=LenientJSONDecoder, strict=False, ignore_extra=True)
+            else:
+                json_object, end = json.JSONDecoder(strict=False).raw_decode(string, start)
+        except ValueError:
+            return None
+        if not re.compile(rf'\s*(?:{end_pattern})').match(string, end):
+            return None
+        return json_object
+
     def _html_search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, flags=0, group=None):
         """
         Like _search_regex, but strips HTML tags and unescapes entities.
@@ -3,16 +3,21 @@
 
 from ..globals import LAZY_EXTRACTORS
 from ..globals import extractors as _extractors_context
+from ..version import __version__
 
 _CLASS_LOOKUP = None
 if os.environ.get('YTDLP_NO_LAZY_EXTRACTORS'):
     LAZY_EXTRACTORS.value = False
 else:
     try:
-        from .lazy_extractors import _CLASS_LOOKUP
-        LAZY_EXTRACTORS.value = True
+        from .lazy_extractors import _CLASS_LOOKUP, _VERSION
     except ImportError:
         LAZY_EXTRACTORS.value = None
+    else:
+        # Lazy extractors generated for another version may not match the extractor modules
+        LAZY_EXTRACTORS.value = _VERSION == __version__ or None
+        if not LAZY_EXTRACTORS.value:
+            _CLASS_LOOKUP = None
 
 if not _CLASS_LOOKUP:
     from . import _extractors
@@ -72,7 +72,7 @@ def _npm_packages_cached(self, stdin: str) -> bool:
             return False
         return True
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _deno_options(self, /) -> list[str]:
         options = [*self._DENO_BASE_OPTIONS]
         if self._lib_script.variant == ScriptVariant.DENO_NPM and self._NPM_PACKAGES_CACHED:
             options.append('--cached-only')
@@ -84,7 +84,13 @@ def _run_js_runtime(self, stdin: str, /) -> str:
         # XXX: Convert this extractor-arg into a general option if/when a JSI framework is implemented
         if self.ejs_setting('jitless', ['false']) != ['false']:
             options.append('--v8-flags=--jitless')
-        return self._run_deno(stdin, options)
+        return options
+
+    def _worker_command(self, script_path: str, /):
+        return [self.runtime_info.path, 'run', *self._deno_options(), script_path], self._get_env_options()
+
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        return self._run_deno(stdin, self._deno_options())
 
     def _get_env_options(self) -> dict[str, str]:
         options = os.environ.copy()  # pass through existing deno env vars
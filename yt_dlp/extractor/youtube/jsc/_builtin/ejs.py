@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import collections
+import contextlib
 import dataclasses
 import enum
 import functools
 import hashlib
 import json
+import os
+import queue
+import shlex
+import subprocess
+import tempfile
+import threading
 
 from yt_dlp.dependencies import yt_dlp_ejs as _has_ejs
 from yt_dlp.extractor.youtube.jsc._builtin import vendor
@@ -21,7 +28,7 @@
 )
 from yt_dlp.extractor.youtube.pot._provider import configuration_arg
 from yt_dlp.extractor.youtube.pot.provider import provider_bug_report_message
-from yt_dlp.utils import version_tuple
+from yt_dlp.utils import Popen, version_tuple
 from yt_dlp.utils._jsruntime import JsRuntimeInfo
 
 if _has_ejs:
@@ -72,6 +79,144 @@ def __str__(self, /):
         return f'<Script {self.type.value!r} v{self.version} (source: {self.source.value}) variant={self.variant.value!r} size={len(self.code)} hash={self.hash[:7]}...>'
 
 
+# Solves challenges for JSON requests read line by line from stdin.
+# The preprocessed players are kept in memory, so that each player only has to be preprocessed once.
+# Runs as a CommonJS script with node and bun, and as a module with deno
+_WORKER_SCRIPT = '''
+const _players = new Map();
+
+function _solve(message) {
+  const preprocessed = _players.get(message.player_key);
+  if (preprocessed === undefined && message.player === undefined) {
+    return { type: 'missing_player' };
+  }
+  const output = jsc(preprocessed === undefined
+    ? { type: 'player', player: message.player, requests: message.requests, output_preprocessed: true }
+    : { type: 'preprocessed', preprocessed_player: preprocessed, requests: message.requests });
+  const player = output.preprocessed_player ?? preprocessed;
+  _players.delete(message.player_key);
+  if (player !== undefined) {
+    _players.set(message.player_key, player);
+    if (_players.size > %(max_players)d) {
+      _players.delete(_players.keys().next().value);
+    }
+  }
+  delete output.preprocessed_player;
+  return output;
+}
+
+function _handle(line) {
+  let output;
+  try {
+    output = _solve(JSON.parse(line));
+  } catch (error) {
+    output = { type: 'error', error: error instanceof Error ? `${error.message}\\n${error.stack}` : `${error}` };
+  }
+  console.log(JSON.stringify(output));
+}
+
+if (typeof Deno !== 'undefined') {
+  (async () => {
+    let buffer = '';
+    for await (const chunk of Deno.stdin.readable.pipeThrough(new TextDecoderStream())) {
+      buffer += chunk;
+      let index;
+      while ((index = buffer.indexOf('\\n')) !== -1) {
+        _handle(buffer.slice(0, index));
+        buffer = buffer.slice(index + 1);
+      }
+    }
+  })();
+} else {
+  require('readline').createInterface({ input: process.stdin, crlfDelay: Infinity }).on('line', _handle);
+}
+'''
+
+
+class _JsRuntimeWorkerError(Exception):
+    pass
+
+
+class _JsRuntimeWorker:
+    """A JS runtime process that keeps running the challenge solver for as long as the provider is open
+
+    Messages are exchanged as JSON, one per line. Only one message is in flight at a time.
+    The worker is killed if it does not respond within `timeout` seconds.
+    The worker script file is removed once the runtime has loaded it
+    """
+
+    def __init__(self, cmd: list[str], script_path: str, env: dict[str, str] | None = None, timeout: float = 60):
+        self.script_path = script_path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stdout = queue.Queue()
+        self._stderr = collections.deque(maxlen=50)
+        self.proc = Popen(
+            cmd,
+            text=True,
+            encoding='utf-8',
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stdout(self):
+        for line in self.proc.stdout:
+            self._stdout.put(line)
+        self._stdout.put('')
+
+    def _read_stderr(self):
+        for line in self.proc.stderr:
+            self._stderr.append(line.rstrip('\n'))
+
+    def send(self, message: dict) -> dict:
+        with self._lock:
+            try:
+                self.proc.stdin.write(json.dumps(message) + '\n')
+                self.proc.stdin.flush()
+                line = self._stdout.get(timeout=self.timeout)
+            except (OSError, ValueError) as e:
+                raise _JsRuntimeWorkerError(f'Failed to communicate with JS runtime worker: {e}') from e
+            except queue.Empty:
+                self.proc.kill(timeout=None)
+                raise _JsRuntimeWorkerError(f'JS runtime worker did not respond within {self.timeout} seconds')
+            finally:
+                _remove_worker_script(self.script_path)
+        if not line:
+            self.close()
+            msg = f'JS runtime worker exited unexpectedly (returncode: {self.proc.returncode})'
+            if stderr := '\n'.join(self._stderr).strip():
+                msg = f'{msg}: {stderr}'
+            raise _JsRuntimeWorkerError(msg)
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            raise _JsRuntimeWorkerError(f'Invalid response from JS runtime worker: {line.strip()!r}') from e
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill(timeout=None)
+        _remove_worker_script(self.script_path)
+
+
+def _write_worker_script(script: str) -> str:
+    with tempfile.NamedTemporaryFile('w', suffix='.js', prefix='yt-dlp-ejs-', delete=False, encoding='utf-8') as f:
+        f.write(script)
+    return f.name
+
+
+def _remove_worker_script(path: str):
+    with contextlib.suppress(OSError):
+        os.remove(path)
+
+
 class EJSBaseJCP(JsChallengeProvider):
     JS_RUNTIME_NAME: str
     _CACHE_SECTION = 'challenge-solver'
@@ -106,10 +251,19 @@ class EJSBaseJCP(JsChallengeProvider):
     # currently disabled as files are large and we do not support rotation
     _ENABLE_PREPROCESSED_PLAYER_CACHE = False
 
+    # Maximum number of preprocessed players kept in memory by the JS runtime worker
+    _WORKER_MAX_PLAYERS = 8
+    # Time in seconds after which a JS runtime worker that has not responded is killed
+    _WORKER_TIMEOUT = 60
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._available = True
+        self._worker = None
+        self._worker_lock = threading.Lock()
         self.ejs_settings = self.ie.get_param('extractor_args', {}).get('youtube-ejs', {})
+        # Set to False when the runtime does not support the worker or the worker failed
+        self._use_worker = self.ejs_setting('worker', ['true'])[0] != 'false'
 
         # Note: The following 3 args are for developer use only & intentionally not documented.
         # - dev: bypasses verification of script hashes and versions.
@@ -145,35 +299,69 @@ def _run_js_runtime(self, stdin: str, /) -> str:
         """To be implemented by subclasses"""
         raise NotImplementedError
 
+    def _worker_command(self, script_path: str, /) -> tuple[list[str], dict[str, str] | None] | None:
+        """
+        Command and environment to run the worker script at `script_path` with.
+        To be implemented by subclasses whose runtime can run a script that reads stdin line by line
+        """
+        return None
+
+    def _get_worker(self, /) -> _JsRuntimeWorker | None:
+        with self._worker_lock:
+            if self._worker is not None or not self._use_worker:
+                return self._worker
+            script_path = _write_worker_script(self._construct_worker_script())
+            command = self._worker_command(script_path)
+            if command is None:
+                _remove_worker_script(script_path)
+                self._use_worker = False
+                return None
+            cmd, env = command
+            self.logger.debug(f'Starting {self.JS_RUNTIME_NAME} worker: {shlex.join(cmd)}')
+            try:
+                self._worker = _JsRuntimeWorker(cmd, script_path, env, self._WORKER_TIMEOUT)
+            except OSError as e:
+                _remove_worker_script(script_path)
+                self._disable_worker(f'Failed to start {self.JS_RUNTIME_NAME} worker: {e}')
+            return self._worker
+
+    def _disable_worker(self, reason: str, /):
+        self.logger.debug(f'{reason}; solving challenges without a worker')
+        self._use_worker = False
+        if self._worker:
+            self._worker.close()
+            self._worker = None
+
+    def _solve_with_worker(self, worker: _JsRuntimeWorker, player_url: str, requests: list[JsChallengeRequest], /):
+        message = {'player_key': player_url, 'requests': self._json_requests(requests)}
+        output = worker.send(message)
+        if output['type'] != 'missing_player':
+            self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+            return output
+        video_id = next((request.video_id for request in requests), None)
+        message['player'] = self._get_player(video_id, player_url)
+        # NB: This output belongs after the player request
+        self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+        return worker.send(message)
+
     def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
         grouped: dict[str, list[JsChallengeRequest]] = collections.defaultdict(list)
         for request in requests:
             grouped[request.input.player_url].append(request)
 
         for player_url, grouped_requests in grouped.items():
-            player = None
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
-                player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
-
-            if player:
-                cached = True
-            else:
-                cached = False
-                video_id = next((request.video_id for request in grouped_requests), None)
-                player = self._get_player(video_id, player_url)
-
-            # NB: This output belongs after the player request
-            self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
-
-            stdin = self._construct_stdin(player, cached, grouped_requests)
-            stdout = self._run_js_runtime(stdin)
-            output = json.loads(stdout)
+            output = None
+            if worker := self._get_worker():
+                try:
+                    output = self._solve_with_worker(worker, player_url, grouped_requests)
+                except _JsRuntimeWorkerError as e:
+                    self._disable_worker(str(e))
+
+            if output is None:
+                output = self._solve_with_process(player_url, grouped_requests)
             if output['type'] == 'error':
                 raise JsChallengeProviderError(output['error'])
 
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE and (preprocessed := output.get('preprocessed_player')):
-                self.ie.cache.store(self._CACHE_SECTION, f'player:{player_url}', preprocessed)
-
             for request, response_data in zip(grouped_requests, output['responses'], strict=True):
                 if response_data['type'] == 'error':
                     yield JsChallengeProviderResponse(request, None, response_data['error'])
@@ -182,11 +370,46 @@ def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
                         NChallengeOutput(response_data['data']) if request.type is JsChallengeType.N
                         else SigChallengeOutput(response_data['data']))))
 
-    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
-        json_requests = [{
+    def _solve_with_process(self, player_url: str, requests: list[JsChallengeRequest], /):
+        player = None
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
+            player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
+
+        if player:
+            cached = True
+        else:
+            cached = False
+            video_id = next((request.video_id for request in requests), None)
+            player = self._get_player(video_id, player_url)
+
+        # NB: This output belongs after the player request
+        self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+
+        stdin = self._construct_stdin(player, cached, requests)
+        stdout = self._run_js_runtime(stdin)
+        output = json.loads(stdout)
+
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE and (preprocessed := output.get('preprocessed_player')):
+            self.ie.cache.store(self._CACHE_SECTION, f'player:{player_url}', preprocessed)
+        return output
+
+    @staticmethod
+    def _json_requests(requests: list[JsChallengeRequest], /) -> list[dict]:
+        return [{
             'type': request.type.value,
             'challenges': request.input.challenges,
         } for request in requests]
+
+    def _construct_worker_script(self, /) -> str:
+        return f'''\
+        {self._lib_script.code}
+        Object.assign(globalThis, lib);
+        {self._core_script.code}
+        {_WORKER_SCRIPT % {'max_players': self._WORKER_MAX_PLAYERS}}
+        '''
+
+    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
+        json_requests = self._json_requests(requests)
         data = {
             'type': 'preprocessed',
             'preprocessed_player': player,
@@ -318,6 +541,13 @@ def is_available(self, /) -> bool:
             return False
         return self._available
 
+    def close(self):
+        with self._worker_lock:
+            if self._worker:
+                self._worker.close()
+                self._worker = None
+        super().close()
+
     def _skip_component(self, component: str, /):
         return _SkippedComponent(component, self.JS_RUNTIME_NAME)
 
@@ -23,7 +23,7 @@ class NodeJCP(EJSBaseJCP, BuiltinIEContentProvider):
 
     _ARGS = ['-']
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _node_args(self, /) -> list[str]:
         args = []
 
         if self.ejs_setting('jitless', ['false']) != ['false']:
@@ -35,8 +35,14 @@ def _run_js_runtime(self, stdin: str, /) -> str:
             args.append('--no-warnings=ExperimentalWarning')
         else:
             args.append('--permission')
+        return args
+
+    def _worker_command(self, script_path: str, /):
+        # The permission model needs read access to the script file itself
+        return [self.runtime_info.path, *self._node_args(), f'--allow-fs-read={script_path}', script_path], None
 
-        cmd = [self.runtime_info.path, *args, *self._ARGS]
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        cmd = [self.runtime_info.path, *self._node_args(), *self._ARGS]
         self.logger.debug(f'Running node: {shlex.join(cmd)}')
         with Popen(
             cmd,
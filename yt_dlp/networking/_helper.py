@@ -172,6 +172,9 @@ def _get_instance(self, **kwargs):
         self.__instances.append((kwargs, instance))
         return instance
 
+    def _get_instances(self):
+        return [instance for _, instance in self.__instances]
+
     def _close_instance(self, instance):
         if callable(getattr(instance, 'close', None)):
             instance.close()
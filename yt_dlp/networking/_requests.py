@@ -41,6 +41,7 @@
     make_socks_proxy_opts,
 )
 from .common import (
+    ConnectionStats,
     Features,
     RequestHandler,
     Response,
@@ -297,6 +298,7 @@ def _create_instance(self, cookiejar, legacy_ssl_support=None):
             ssl_context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
             source_address=self.source_address,
             max_retries=urllib3.util.retry.Retry(False),
+            pool_maxsize=max(self.connection_pool_size, 1),
         )
         session.adapters.clear()
         session.headers = requests.models.CaseInsensitiveDict()
@@ -308,7 +310,21 @@ def _create_instance(self, cookiejar, legacy_ssl_support=None):
 
     def _prepare_headers(self, _, headers):
         add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
-        headers.setdefault('Connection', 'keep-alive')
+        headers.setdefault('Connection', 'keep-alive' if self.connection_pool_size else 'close')
+
+    def connection_stats(self):
+        # urllib3 counts the connections and requests of each of its connection pools.
+        # Counts of pools that were evicted from the pool managers are lost
+        stats = ConnectionStats()
+        for session in self._get_instances():
+            for adapter in session.adapters.values():
+                for manager in (adapter.poolmanager, *adapter.proxy_manager.values()):
+                    for key in manager.pools.keys():  # noqa: SIM118 (iterating the container is not supported)
+                        pool = manager.pools.get(key)
+                        if pool is not None:
+                            stats += ConnectionStats(
+                                pool.num_connections, max(pool.num_requests - pool.num_connections, 0))
+        return stats
 
     def _send(self, request):
 
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import collections
 import functools
 import http.client
 import io
+import select
 import ssl
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -27,7 +31,13 @@
     get_redirect_method,
     make_socks_proxy_opts,
 )
-from .common import Features, RequestHandler, Response, register_rh
+from .common import (
+    ConnectionStats,
+    Features,
+    RequestHandler,
+    Response,
+    register_rh,
+)
 from .exceptions import (
     CertificateVerifyError,
     HTTPError,
@@ -62,6 +72,78 @@ def _create_http_connection(http_class, source_address, *args, **kwargs):
     return hc
 
 
+class PooledHTTPResponse(http.client.HTTPResponse):
+    """HTTPResponse that hands its connection back to the pool once the body has been consumed"""
+    _release = None
+    _trailer_read = False
+
+    def _read_and_discard_trailer(self):
+        super()._read_and_discard_trailer()
+        self._trailer_read = True
+
+    def _close_conn(self):
+        super()._close_conn()
+        release, self._release = self._release, None
+        if release:
+            # The connection can only be reused if the whole body was read
+            release(not self.will_close and (self.length == 0 or self._trailer_read))
+
+
+class HTTPConnectionPool:
+    """Idle keep-alive connections, grouped by the host (and proxy) they are connected to
+
+    @param maxsize: maximum number of idle connections kept per host. 0 disables pooling
+    @param idle_timeout: seconds after which an idle connection is discarded
+    @param stats: ConnectionStats to update
+    """
+
+    def __init__(self, maxsize, idle_timeout, stats=None):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.stats = stats or ConnectionStats()
+        self._idle = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_dropped(conn):
+        # An idle connection has nothing to read, unless the server closed it
+        try:
+            return conn.sock is None or bool(select.select([conn.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def get(self, key):
+        """Return an idle connection for the key, or None"""
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn, released = idle.pop()
+                if time.monotonic() - released < self.idle_timeout and not self._is_dropped(conn):
+                    self.stats.reused += 1
+                    return conn
+                conn.close()
+        return None
+
+    def put(self, key, conn, reusable=True):
+        with self._lock:
+            idle = self._idle[key]
+            if reusable and conn.sock is not None and len(idle) < self.maxsize:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def opened(self):
+        with self._lock:
+            self.stats.opened += 1
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+
 class HTTPHandler(urllib.request.AbstractHTTPHandler):
     """Handler for HTTP requests and responses.
 
@@ -77,10 +159,11 @@ class HTTPHandler(urllib.request.AbstractHTTPHandler):
     public domain.
     """
 
-    def __init__(self, context=None, source_address=None, *args, **kwargs):
+    def __init__(self, context=None, source_address=None, connection_pool=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._source_address = source_address
         self._context = context
+        self._connection_pool = connection_pool
 
     @staticmethod
     def _make_conn_class(base, req):
@@ -91,16 +174,80 @@ def _make_conn_class(base, req):
         return conn_class
 
     def http_open(self, req):
+        pool_key = ('http', req.headers.get('Ytdl-socks-proxy'), req.host, req._tunnel_host)
         conn_class = self._make_conn_class(http.client.HTTPConnection, req)
         return self.do_open(functools.partial(
-            _create_http_connection, conn_class, self._source_address), req)
+            _create_http_connection, conn_class, self._source_address), req, pool_key=pool_key)
 
     def https_open(self, req):
+        pool_key = ('https', req.headers.get('Ytdl-socks-proxy'), req.host, req._tunnel_host)
         conn_class = self._make_conn_class(http.client.HTTPSConnection, req)
         return self.do_open(
             functools.partial(
                 _create_http_connection, conn_class, self._source_address),
-            req, context=self._context)
+            req, pool_key=pool_key, context=self._context)
+
+    def do_open(self, http_class, req, pool_key=None, **http_conn_args):
+        """
+        Same as AbstractHTTPHandler.do_open, but keeps the connection alive
+        and returns it to the connection pool once the response has been read
+        """
+        pool = self._connection_pool
+        if not pool or not pool.maxsize:
+            return super().do_open(http_class, req, **http_conn_args)
+        if not req.host:
+            raise urllib.error.URLError('no host given')
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers = {name.title(): val for name, val in headers.items()}
+        headers.setdefault('Connection', 'keep-alive')
+        tunnel_headers = {}
+        if req._tunnel_host and 'Proxy-Authorization' in headers:
+            # Proxy-Authorization should not be sent to origin server
+            tunnel_headers['Proxy-Authorization'] = headers.pop('Proxy-Authorization')
+
+        # A pooled connection may have been closed by the server in the meantime.
+        # Retry with another connection if the request body can be resent
+        can_retry = req.data is None or isinstance(req.data, bytes)
+        while True:
+            h = pool.get(pool_key)
+            reused = h is not None
+            if reused:
+                h.timeout = req.timeout
+                h.sock.settimeout(req.timeout)
+            else:
+                h = http_class(req.host, timeout=req.timeout, **http_conn_args)
+                h.response_class = PooledHTTPResponse
+                if req._tunnel_host:
+                    h.set_tunnel(req._tunnel_host, headers=tunnel_headers)
+                pool.opened()
+            h.set_debuglevel(self._debuglevel)
+
+            try:
+                try:
+                    h.request(req.get_method(), req.selector, req.data, headers,
+                              encode_chunked=req.has_header('Transfer-encoding'))
+                except OSError as err:  # timeout error
+                    if reused and can_retry and not isinstance(err, TimeoutError):
+                        h.close()
+                        continue
+                    raise urllib.error.URLError(err)
+                r = h.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                h.close()
+                if reused and can_retry:
+                    continue
+                raise
+            except BaseException:
+                h.close()
+                raise
+            break
+
+        r._release = functools.partial(pool.put, pool_key, h)
+        r.url = req.get_full_url()
+        r.msg = r.reason
+        return r
 
     @staticmethod
     def deflate(data):
@@ -362,6 +509,8 @@ def __init__(self, *, enable_file_urls: bool = False, **kwargs):
         self.enable_file_urls = enable_file_urls
         if self.enable_file_urls:
             self._SUPPORTED_URL_SCHEMES = (*self._SUPPORTED_URL_SCHEMES, 'file')
+        self._connection_stats = ConnectionStats()
+        self._connection_pools = []
 
     def _check_extensions(self, extensions):
         super()._check_extensions(extensions)
@@ -371,12 +520,16 @@ def _check_extensions(self, extensions):
 
     def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
         opener = urllib.request.OpenerDirector()
+        connection_pool = HTTPConnectionPool(
+            self.connection_pool_size, self.connection_idle_timeout, self._connection_stats)
+        self._connection_pools.append(connection_pool)
         handlers = [
             ProxyHandler(proxies),
             HTTPHandler(
                 debuglevel=int(bool(self.verbose)),
                 context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
-                source_address=self.source_address),
+                source_address=self.source_address,
+                connection_pool=connection_pool),
             HTTPCookieProcessor(cookiejar),
             DataHandler(),
             UnknownHandler(),
@@ -401,6 +554,13 @@ def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
     def _prepare_headers(self, _, headers):
         add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
 
+    def connection_stats(self):
+        return self._connection_stats
+
+    def close(self):
+        for connection_pool in self._connection_pools:
+            connection_pool.close()
+
     def _send(self, request):
         headers = self._get_headers(request)
         urllib_req = urllib.request.Request(
@@ -2,6 +2,7 @@
 
 import abc
 import copy
+import dataclasses
 import enum
 import functools
 import io
@@ -32,6 +33,8 @@
 from ..utils.networking import HTTPHeaderDict, normalize_url
 
 DEFAULT_TIMEOUT = 20
+DEFAULT_CONNECTION_POOL_SIZE = 10
+DEFAULT_CONNECTION_IDLE_TIMEOUT = 60
 
 
 def register_preference(*handlers: type[RequestHandler]):
@@ -48,6 +51,24 @@ def inner(handler, *args, **kwargs):
     return outer
 
 
+@dataclasses.dataclass
+class ConnectionStats:
+    """Connection reuse counters of a RequestHandler"""
+    opened: int = 0
+    reused: int = 0
+
+    @property
+    def requests(self):
+        return self.opened + self.reused
+
+    @property
+    def reuse_ratio(self):
+        return self.reused / self.requests if self.requests else 0.0
+
+    def __add__(self, other):
+        return ConnectionStats(self.opened + other.opened, self.reused + other.reused)
+
+
 class RequestDirector:
     """RequestDirector class
 
@@ -72,6 +93,10 @@ def close(self):
             handler.close()
         self.handlers.clear()
 
+    def connection_stats(self) -> ConnectionStats:
+        """Connection reuse counters summed over all handlers that track them"""
+        return sum(filter(None, (rh.connection_stats() for rh in self.handlers.values())), ConnectionStats())
+
     def add_handler(self, handler: RequestHandler):
         """Add a handler. If a handler of the same RH_KEY exists, it will overwrite it"""
         assert isinstance(handler, RequestHandler), 'handler must be a RequestHandler'
@@ -191,6 +216,10 @@ class RequestHandler(abc.ABC):
             dict with {client_certificate, client_certificate_key, client_certificate_password}
     @param verify: Verify SSL certificates
     @param legacy_ssl_support: Enable legacy SSL options such as legacy server connect and older cipher support.
+    @param connection_pool_size: Maximum number of idle keep-alive connections to keep per host.
+            0 disables connection reuse. Not all handlers support this.
+    @param connection_idle_timeout: Seconds after which an idle keep-alive connection is discarded.
+            Not all handlers support this.
 
     Some configuration options may be available for individual Requests too. In this case,
     either the Request configuration option takes precedence or they are merged.
@@ -233,6 +262,8 @@ def __init__(
         client_cert: dict[str, str | None] | None = None,
         verify: bool = True,
         legacy_ssl_support: bool = False,
+        connection_pool_size: int | None = None,
+        connection_idle_timeout: float | int | None = None,
         **_,
     ):
 
@@ -247,6 +278,8 @@ def __init__(
         self._client_cert = client_cert or {}
         self.verify = verify
         self.legacy_ssl_support = legacy_ssl_support
+        self.connection_pool_size = DEFAULT_CONNECTION_POOL_SIZE if connection_pool_size is None else connection_pool_size
+        self.connection_idle_timeout = float(connection_idle_timeout or DEFAULT_CONNECTION_IDLE_TIMEOUT)
         super().__init__()
 
     def _make_sslcontext(self, legacy_ssl_support=None):
@@ -366,6 +399,10 @@ def _send(self, request: Request):
     def close(self):  # noqa: B027
         pass
 
+    def connection_stats(self) -> ConnectionStats | None:
+        """Connection reuse counters of this handler, or None if it does not track them"""
+        return None
+
     @classproperty
     def RH_NAME(cls):
         return cls.__name__[:-2]
@@ -568,6 +568,7 @@ def _preset_alias_callback(option, opt_str, value, parser):
                 'embed-metadata', 'seperate-video-versions', 'no-clean-infojson', 'no-keep-subs', 'no-certifi',
                 'no-youtube-channel-redirect', 'no-youtube-unavailable-videos', 'no-youtube-prefer-utc-upload-date',
                 'prefer-legacy-http-handler', 'manifest-filesize-approx', 'allow-unsafe-ext', 'prefer-vp9-sort', 'mtime-by-default',
+                'no-combined-ffmpeg',
             }, 'aliases': {
                 'youtube-dl': ['all', '-multistreams', '-playlist-match-filter', '-manifest-filesize-approx', '-allow-unsafe-ext', '-prefer-vp9-sort'],
                 'youtube-dlc': ['all', '-no-youtube-channel-redirect', '-no-live-chat', '-playlist-match-filter', '-manifest-filesize-approx', '-allow-unsafe-ext', '-prefer-vp9-sort'],
@@ -601,6 +602,19 @@ def _preset_alias_callback(option, opt_str, value, parser):
             f'The following presets are available: {", ".join(_PRESET_ALIASES)}. '
             'See the "Preset Aliases" section at the end for more info. '
             'This option can be used multiple times'))
+    general.add_option(
+        '--serve',
+        metavar='ADDRESS', dest='serve', default=None,
+        help=(
+            'Keep running and download the URLs of jobs sent by clients, instead of exiting after a single run. '
+            'ADDRESS is "unix:PATH" for a Unix domain socket, or "[HOST:]PORT" for a TCP socket on a loopback address. '
+            'The other options given are the defaults of each job. See "SERVER MODE" for details'))
+    general.add_option(
+        '--serve-token',
+        metavar='TOKEN', dest='serve_token', default=None,
+        help=(
+            'Secret that clients of --serve must send with each job. '
+            'By default, a token is generated for TCP sockets and none is needed for Unix domain sockets'))
 
     network = optparse.OptionGroup(parser, 'Network Options')
     network.add_option(
@@ -613,6 +627,16 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--socket-timeout',
         dest='socket_timeout', type=float, default=None, metavar='SECONDS',
         help='Time to wait before giving up, in seconds')
+    network.add_option(
+        '--connection-pool-size',
+        dest='connection_pool_size', type=int, default=None, metavar='N',
+        help=(
+            'Maximum number of idle keep-alive connections to keep open per host, '
+            'so that they can be reused by later requests. 0 disables connection reuse (default: 10)'))
+    network.add_option(
+        '--connection-idle-timeout',
+        dest='connection_idle_timeout', type=float, default=None, metavar='SECONDS',
+        help='Time after which an unused keep-alive connection is closed, in seconds (default: 60)')
     network.add_option(
         '--source-address',
         metavar='IP', dest='source_address', default=None,
@@ -1006,10 +1030,40 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '-N', '--concurrent-fragments',
         dest='concurrent_fragment_downloads', metavar='N', default=1, type=int,
         help='Number of fragments of a dash/hlsnative video that should be downloaded concurrently (default is %default)')
+    downloader.add_option(
+        '--fragment-window',
+        dest='fragment_window', metavar='N', default=None, type=int,
+        help=(
+            'Download fragments of dash/hlsnative videos into memory instead of temporary files, '
+            'keeping at most N fragments in memory before they are written to the output in order. '
+            'Limits --concurrent-fragments to N. Has no effect with --keep-fragments (default: disabled)'))
+    downloader.add_option(
+        '--max-concurrent-transfers',
+        dest='max_concurrent_transfers', metavar='N', default=None, type=int,
+        help=(
+            'Maximum number of fragments and --http-connections byte ranges downloaded at the same time '
+            'by all the downloads of the invocation or --serve job. When it is reached, '
+            'the downloads take turns (default: no limit)'))
     downloader.add_option(
         '-r', '--limit-rate', '--rate-limit',
         dest='ratelimit', metavar='RATE',
-        help='Maximum download rate in bytes per second, e.g. 50K or 4.2M')
+        help=(
+            'Maximum download rate in bytes per second, e.g. 50K or 4.2M. '
+            'The rate of all the fragments and --http-connections byte ranges of a download is limited together'))
+    downloader.add_option(
+        '--global-limit-rate',
+        dest='global_ratelimit', metavar='RATE',
+        help=(
+            'Maximum download rate of all the downloads of the invocation or --serve job together, '
+            'in bytes per second, e.g. 10M. '
+            'Live streams get their share of the bandwidth before other downloads'))
+    downloader.add_option(
+        '--max-host-connections',
+        dest='max_host_connections', metavar='N', default=None, type=int,
+        help=(
+            'Maximum number of connections to the same host that all the downloads of the invocation '
+            'or --serve job '
+            'open at the same time. Live streams are given free connections first (default: no limit)'))
     downloader.add_option(
         '--throttled-rate',
         dest='throttledratelimit', metavar='RATE',
@@ -1073,6 +1127,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         help=(
             'Size of a chunk for chunk-based HTTP downloading, e.g. 10485760 or 10M (default is disabled). '
             'May be useful for bypassing bandwidth throttling imposed by a webserver (experimental)'))
+    downloader.add_option(
+        '--http-connections',
+        dest='http_connections', metavar='N', default=1, type=int,
+        help=(
+            'Number of connections to use for downloading a single file over HTTP, each fetching '
+            'a separate byte range (default is %default). Only used if the server supports ranged requests'))
     downloader.add_option(
         '--test',
         action='store_true', dest='test', default=False,
@@ -1097,6 +1157,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-lazy-playlist',
         action='store_false', dest='lazy_playlist',
         help='Process videos in the playlist only after the entire playlist is parsed (default)')
+    downloader.add_option(
+        '--concurrent-entries',
+        dest='concurrent_entries', metavar='N', default=1, type=int,
+        help=(
+            'Number of upcoming playlist entries to extract in parallel while the current one is downloaded. '
+            'The entries are still downloaded one at a time and in order (default is %default)'))
     downloader.add_option(
         '--hls-prefer-native',
         dest='hls_prefer_native', action='store_true', default=None,
@@ -1758,6 +1824,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--ffmpeg-location', metavar='PATH',
         dest='ffmpeg_location',
         help='Location of the ffmpeg binary; either the path to the binary or its containing directory')
+    postproc.add_option(
+        '--concurrent-postprocessing',
+        dest='concurrent_postprocessing', metavar='N', default=1, type=int,
+        help=(
+            'Number of videos to post-process in parallel while the next ones are downloaded. '
+            'The files are still moved and recorded in the download archive in order (default is %default)'))
     postproc.add_option(
         '--exec',
         metavar='[WHEN:]CMD', dest='exec_cmd', **when_prefix('after_move'),
@@ -1824,6 +1896,17 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-force-keyframes-at-cuts',
         action='store_false', dest='force_keyframes_at_cuts',
         help='Do not force keyframes around the chapters when cutting/splitting (default)')
+    postproc.add_option(
+        '--smart-cuts',
+        action='store_true', dest='smart_cuts', default=False,
+        help=(
+            'When removing chapters, re-encode only the video between each cut and the nearest keyframe, '
+            'and copy the rest. The cuts are exact without re-encoding the whole video. '
+            'Only supported for h264, hevc, vp9 and av1 videos; others are re-encoded whole'))
+    postproc.add_option(
+        '--no-smart-cuts',
+        action='store_false', dest='smart_cuts',
+        help='Do not re-encode the video around the cuts when removing chapters (default)')
     _postprocessor_opts_parser = lambda key, val='': (
         *(item.split('=', 1) for item in (val.split(';') if val else [])),
         ('key', remove_end(key, 'PP')))
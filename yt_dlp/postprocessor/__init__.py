@@ -4,6 +4,7 @@
 from .embedthumbnail import EmbedThumbnailPP
 from .exec import ExecAfterDownloadPP, ExecPP
 from .ffmpeg import (
+    FFmpegCombinedPP,
     FFmpegConcatPP,
     FFmpegCopyStreamPP,
     FFmpegEmbedSubtitlePP,
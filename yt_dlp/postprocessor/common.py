@@ -111,6 +111,13 @@ def set_downloader(self, downloader):
     def _copy_infodict(self, info_dict):
         return getattr(self._downloader, '_copy_infodict', dict)(info_dict)
 
+    @staticmethod
+    def _format_type(info):
+        return (
+            'video' if info.get('vcodec') != 'none'
+            else 'audio' if info.get('acodec') != 'none'
+            else 'images')
+
     @staticmethod
     def _restrict_to(*, video=True, audio=True, images=True, simulated=True):
         allowed = {'video': video, 'audio': audio, 'images': images}
@@ -120,10 +127,7 @@ def decorator(func):
             def wrapper(self, info):
                 if not simulated and (self.get_param('simulate') or self.get_param('skip_download')):
                     return [], info
-                format_type = (
-                    'video' if info.get('vcodec') != 'none'
-                    else 'audio' if info.get('acodec') != 'none'
-                    else 'images')
+                format_type = PostProcessor._format_type(info)
                 if allowed[format_type]:
                     return func(self, info)
                 else:
@@ -1,21 +1,24 @@
 import collections
 import contextvars
+import copy
 import functools
 import itertools
 import json
 import os
 import re
 import subprocess
+import threading
 import time
 
 from .common import PostProcessor
 from ..compat import imghdr
+from ..subtitles import SubtitlesConversionError, can_convert_subtitles, convert_subtitles
 from ..utils import (
     MEDIA_EXTENSIONS,
     ISO639Utils,
     Popen,
     PostProcessingError,
-    _get_exe_version_output,
+    _get_cached_exe_version_output,
     deprecation_warning,
     detect_exe_version,
     determine_ext,
@@ -133,7 +136,7 @@ def _get_ffmpeg_version(self, prog):
         path = self._paths.get(prog)
         if path in self._version_cache:
             return self._version_cache[path], self._features_cache.get(path, {})
-        out = _get_exe_version_output(path, ['-bsfs'])
+        out = _get_cached_exe_version_output(getattr(self._downloader, 'cache', None), path, ['-bsfs'])
         ver = detect_exe_version(out) if out else False
         if ver:
             regexs = [
@@ -220,6 +223,17 @@ def stream_copy_opts(copy=True, *, ext=None):
         if ext in ('mp4', 'mov', 'm4a'):
             yield from ('-c:s', 'mov_text')
 
+    def _ffmpeg_step(self, info, plan):
+        """
+        Add the changes made by this postprocessor to a combined ffmpeg invocation (see FFmpegCombinedPP).
+        Only the plan may be modified, since it is discarded if it cannot be combined with other steps
+
+        @returns    A function that is called before the combined invocation is run, to prepare
+                    the files and report the step, and which returns the files to delete afterwards;
+                    or None if the postprocessor must be run on its own, or would not change the file
+        """
+        return None
+
     def check_version(self):
         if not self.available:
             raise FFmpegPostProcessorError('ffmpeg not found. Please install or provide the path using --ffmpeg-location')
@@ -232,39 +246,26 @@ def check_version(self):
     def get_audio_codec(self, path):
         if not self.probe_available and not self.available:
             raise PostProcessingError('ffprobe and ffmpeg not found. Please install or provide the path using --ffmpeg-location')
+        if self.probe_basename == 'ffprobe':
+            try:
+                metadata = self._probe(path)
+            except (OSError, json.JSONDecodeError):
+                return None
+            return traverse_obj(metadata, ('streams', lambda _, v: v['codec_type'] == 'audio', 'codec_name', any))
         try:
-            if self.probe_available:
-                cmd = [
-                    self.probe_executable,
-                    encodeArgument('-show_streams')]
-            else:
-                cmd = [
-                    self.executable,
-                    encodeArgument('-i')]
-            cmd.append(self._ffmpeg_filename_argument(path))
+            cmd = [self.executable, encodeArgument('-i'), self._ffmpeg_filename_argument(path)]
             self.write_debug(f'{self.basename} command line: {shell_quote(cmd)}')
-            stdout, stderr, returncode = Popen.run(
+            _, stderr, returncode = Popen.run(
                 cmd, text=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if returncode != (0 if self.probe_available else 1):
+            if returncode != 1:
                 return None
         except OSError:
             return None
-        output = stdout if self.probe_available else stderr
-        if self.probe_available:
-            audio_codec = None
-            for line in output.split('\n'):
-                if line.startswith('codec_name='):
-                    audio_codec = line.split('=')[1].strip()
-                elif line.strip() == 'codec_type=audio' and audio_codec is not None:
-                    return audio_codec
-        else:
-            # Stream #FILE_INDEX:STREAM_INDEX[STREAM_ID](LANGUAGE): CODEC_TYPE: CODEC_NAME
-            mobj = re.search(
-                r'Stream\s*#\d+:\d+(?:\[0x[0-9a-f]+\])?(?:\([a-z]{3}\))?:\s*Audio:\s*([0-9a-z]+)',
-                output)
-            if mobj:
-                return mobj.group(1)
-        return None
+        # Stream #FILE_INDEX:STREAM_INDEX[STREAM_ID](LANGUAGE): CODEC_TYPE: CODEC_NAME
+        mobj = re.search(
+            r'Stream\s*#\d+:\d+(?:\[0x[0-9a-f]+\])?(?:\([a-z]{3}\))?:\s*Audio:\s*([0-9a-z]+)',
+            stderr)
+        return mobj.group(1) if mobj else None
 
     def get_metadata_object(self, path, opts=[]):
         if self.probe_basename != 'ffprobe':
@@ -272,7 +273,45 @@ def get_metadata_object(self, path, opts=[]):
                 self.report_warning('Only ffprobe is supported for metadata extraction')
             raise PostProcessingError('ffprobe not found. Please install or provide the path using --ffmpeg-location')
         self.check_version()
+        if opts:
+            return json.loads(self._run_ffprobe(path, opts)[0])
+        return self._probe(path)
+
+    # The probe results of the most recently used files, as {path: (key, metadata)}
+    _probe_cache = collections.OrderedDict()
+    _probe_cache_lock = threading.Lock()
+    _PROBE_CACHE_SIZE = 64
 
+    @staticmethod
+    def _probe_cache_key(path):
+        # ffmpeg postprocessors set the mtime of the files they rewrite to that of the original,
+        # but not the ctime, which changes whenever the file is written, renamed or replaced
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns
+
+    def _probe(self, path):
+        """Get the metadata object of the file from ffprobe. It is cached until the file is changed"""
+        key, abspath = self._probe_cache_key(path), os.path.abspath(path)
+        with self._probe_cache_lock:
+            cached_key, metadata = self._probe_cache.get(abspath, (None, None))
+            if key is not None and key == cached_key:
+                self._probe_cache.move_to_end(abspath)
+                return copy.deepcopy(metadata)
+
+        stdout, returncode = self._run_ffprobe(path)
+        metadata = json.loads(stdout)
+        if key is not None and returncode == 0:
+            with self._probe_cache_lock:
+                self._probe_cache[abspath] = key, metadata
+                self._probe_cache.move_to_end(abspath)
+                while len(self._probe_cache) > self._PROBE_CACHE_SIZE:
+                    self._probe_cache.popitem(last=False)
+        return copy.deepcopy(metadata)
+
+    def _run_ffprobe(self, path, opts=()):
         cmd = [
             self.probe_executable,
             encodeArgument('-hide_banner'),
@@ -280,13 +319,13 @@ def get_metadata_object(self, path, opts=[]):
             encodeArgument('-show_streams'),
             encodeArgument('-print_format'),
             encodeArgument('json'),
+            *opts,
+            self._ffmpeg_filename_argument(path),
         ]
-
-        cmd += opts
-        cmd.append(self._ffmpeg_filename_argument(path))
         self.write_debug(f'ffprobe command line: {shell_quote(cmd)}')
-        stdout, _, _ = Popen.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-        return json.loads(stdout)
+        stdout, _, returncode = Popen.run(
+            cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+        return stdout, returncode
 
     def get_stream_number(self, path, keys, value):
         streams = self.get_metadata_object(path)['streams']
@@ -590,8 +629,7 @@ def run(self, info):
         if info['ext'] not in self.SUPPORTED_EXTS:
             self.to_screen(f'Subtitles can only be embedded in {", ".join(self.SUPPORTED_EXTS)} files')
             return [], info
-        subtitles = info.get('requested_subtitles')
-        if not subtitles:
+        if not info.get('requested_subtitles'):
             self.to_screen('There aren\'t any subtitles to embed')
             return [], info
 
@@ -607,18 +645,44 @@ def run(self, info):
             return [], info
         '''
 
+        sub_langs, sub_names, sub_filenames, warnings = self._get_subtitles(info)
+        for warning in warnings:
+            self.report_warning(warning)
+        if not sub_langs:
+            return [], info
+
+        input_files = [filename, *sub_filenames]
+
+        opts = [
+            *self.stream_copy_opts(ext=info['ext']),
+            # Don't copy the existing subtitles, we may be running the
+            # postprocessor a second time
+            '-map', '-0:s',
+            *self._subtitle_opts(sub_langs, sub_names, 1),
+        ]
+
+        temp_filename = prepend_extension(filename, 'temp')
+        self.to_screen(f'Embedding subtitles in "{filename}"')
+        self.run_ffmpeg_multiple_files(input_files, temp_filename, opts)
+        os.replace(temp_filename, filename)
+
+        files_to_delete = [] if self._already_have_subtitle else sub_filenames
+        return files_to_delete, info
+
+    def _get_subtitles(self, info):
+        """@returns (langs, names, filenames, warnings) of the subtitles that can be embedded"""
         ext = info['ext']
-        sub_langs, sub_names, sub_filenames = [], [], []
+        sub_langs, sub_names, sub_filenames, warnings = [], [], [], []
         webm_vtt_warn = False
         mp4_ass_warn = False
 
-        for lang, sub_info in subtitles.items():
+        for lang, sub_info in info['requested_subtitles'].items():
             if not os.path.exists(sub_info.get('filepath', '')):
-                self.report_warning(f'Skipping embedding {lang} subtitle because the file is missing')
+                warnings.append(f'Skipping embedding {lang} subtitle because the file is missing')
                 continue
             sub_ext = sub_info['ext']
             if sub_ext == 'json':
-                self.report_warning('JSON subtitles cannot be embedded')
+                warnings.append('JSON subtitles cannot be embedded')
             elif ext != 'webm' or (ext == 'webm' and sub_ext == 'vtt'):
                 sub_langs.append(lang)
                 sub_names.append(sub_info.get('name'))
@@ -626,37 +690,44 @@ def run(self, info):
             else:
                 if not webm_vtt_warn and ext == 'webm' and sub_ext != 'vtt':
                     webm_vtt_warn = True
-                    self.report_warning('Only WebVTT subtitles can be embedded in webm files')
+                    warnings.append('Only WebVTT subtitles can be embedded in webm files')
             if not mp4_ass_warn and ext == 'mp4' and sub_ext == 'ass':
                 mp4_ass_warn = True
-                self.report_warning('ASS subtitles cannot be properly embedded in mp4 files; expect issues')
-
-        if not sub_langs:
-            return [], info
-
-        input_files = [filename, *sub_filenames]
+                warnings.append('ASS subtitles cannot be properly embedded in mp4 files; expect issues')
+        return sub_langs, sub_names, sub_filenames, warnings
 
-        opts = [
-            *self.stream_copy_opts(ext=info['ext']),
-            # Don't copy the existing subtitles, we may be running the
-            # postprocessor a second time
-            '-map', '-0:s',
-        ]
+    @staticmethod
+    def _subtitle_opts(sub_langs, sub_names, first_input):
         for i, (lang, name) in enumerate(zip(sub_langs, sub_names, strict=True)):
-            opts.extend(['-map', f'{i + 1}:0'])
+            yield from ('-map', f'{first_input + i}:0')
             lang_code = ISO639Utils.short2long(lang) or lang
-            opts.extend([f'-metadata:s:s:{i}', f'language={lang_code}'])
+            yield from (f'-metadata:s:s:{i}', f'language={lang_code}')
             if name:
-                opts.extend([f'-metadata:s:s:{i}', f'handler_name={name}',
-                             f'-metadata:s:s:{i}', f'title={name}'])
+                yield from (f'-metadata:s:s:{i}', f'handler_name={name}',
+                            f'-metadata:s:s:{i}', f'title={name}')
 
-        temp_filename = prepend_extension(filename, 'temp')
-        self.to_screen(f'Embedding subtitles in "{filename}"')
-        self.run_ffmpeg_multiple_files(input_files, temp_filename, opts)
-        os.replace(temp_filename, filename)
+    def _ffmpeg_step(self, info, plan):
+        if (self._format_type(info) == 'images' or info['ext'] not in self.SUPPORTED_EXTS
+                or not info.get('requested_subtitles') or plan.has_subtitles):
+            return None
+        sub_langs, sub_names, sub_filenames, warnings = self._get_subtitles(info)
+        if not sub_langs:
+            return None
 
-        files_to_delete = [] if self._already_have_subtitle else sub_filenames
-        return files_to_delete, info
+        if not plan.merged:
+            plan.add_opts('-map', '-0:s')
+        if info['ext'] in ('mp4', 'mov', 'm4a'):
+            plan.add_opts('-c:s', 'mov_text')
+        first_input = plan.add_inputs(*sub_filenames)
+        plan.add_opts(*self._subtitle_opts(sub_langs, sub_names, first_input))
+        plan.has_subtitles = True
+
+        def prepare():
+            for warning in warnings:
+                self.report_warning(warning)
+            self.to_screen(f'Embedding subtitles in "{info["filepath"]}"')
+            return [] if self._already_have_subtitle else sub_filenames
+        return prepare
 
 
 class FFmpegMetadataPP(FFmpegPostProcessor):
@@ -708,8 +779,45 @@ def run(self, info):
         os.replace(temp_filename, filename)
         return [], info
 
+    def _ffmpeg_step(self, info, plan):
+        if self._format_type(info) == 'images' or info['ext'] == 'm4a':
+            return None
+        # The stream number of the info-json attachment depends on the output of the previous steps
+        if info['ext'] in ('mkv', 'mka') and (self._add_infojson is True or (
+                self._add_infojson and os.path.exists(info.get('infojson_filename') or ''))):
+            return None
+        chapters = info.get('chapters') if self._add_chapters else None
+        if chapters and not chapters[-1].get('end_time'):
+            if plan.merged:
+                return None
+            # Same as _fixup_chapters, without modifying the info
+            chapters = [*chapters[:-1], {**chapters[-1], 'end_time': self._get_real_video_duration(info['filepath'])}]
+
+        options = list(itertools.chain.from_iterable(self._get_metadata_opts(info))) if self._add_metadata else []
+        if not chapters and not options:
+            return None
+        metadata_filename = None
+        if chapters:
+            metadata_filename = replace_extension(info['filepath'], 'meta')
+            plan.add_opts('-map_metadata', str(plan.add_inputs(metadata_filename)))
+            plan.temp_files.append(metadata_filename)
+        plan.add_opts(*options)
+
+        def prepare():
+            if metadata_filename:
+                self._write_chapters(chapters, metadata_filename)
+            if self._add_infojson is True:
+                self.to_screen('The info-json can only be attached to mkv/mka files')
+            self.to_screen(f'Adding metadata to "{info["filepath"]}"')
+        return prepare
+
     @staticmethod
     def _get_chapter_opts(chapters, metadata_filename):
+        FFmpegMetadataPP._write_chapters(chapters, metadata_filename)
+        yield ('-map_metadata', '1')
+
+    @staticmethod
+    def _write_chapters(chapters, metadata_filename):
         with open(metadata_filename, 'w', encoding='utf-8') as f:
             def ffmpeg_escape(text):
                 return re.sub(r'([\\=;#\n])', r'\\\1', text)
@@ -723,7 +831,6 @@ def ffmpeg_escape(text):
                 if chapter_title:
                     metadata_file_content += f'title={ffmpeg_escape(chapter_title)}\n'
             f.write(metadata_file_content)
-        yield ('-map_metadata', '1')
 
     def _get_metadata_opts(self, info):
         meta_prefix = 'meta'
@@ -810,6 +917,96 @@ def _get_infojson_opts(self, info, infofn):
         )
 
 
+class FFmpegPlan:
+    """
+    The inputs and output options of a combined ffmpeg invocation
+
+    The first step either sets the inputs to the formats to be merged, or the file is used as
+    the only media input, with all of its streams copied. The other steps add their own inputs
+    after these, and options that apply to the output file
+    """
+
+    def __init__(self, info):
+        self.filepath = info['filepath']
+        self.inputs = []
+        self.opts = []
+        self.merged = False
+        self.has_subtitles = False
+        self.temp_files = []
+
+    def _ensure_inputs(self):
+        if not self.inputs:
+            self.inputs.append(self.filepath)
+            self.opts.extend(FFmpegPostProcessor.stream_copy_opts())
+
+    def add_inputs(self, *paths):
+        """@returns The index of the first of the added inputs"""
+        self._ensure_inputs()
+        self.inputs.extend(paths)
+        return len(self.inputs) - len(paths)
+
+    def add_opts(self, *opts):
+        self._ensure_inputs()
+        self.opts.extend(opts)
+
+
+class FFmpegCombinedPP(FFmpegPostProcessor):
+    """
+    Runs consecutive ffmpeg postprocessors with a single invocation of ffmpeg,
+    so that the file is rewritten only once (see FFmpegPostProcessor._ffmpeg_step).
+    If the combined invocation fails, they are run one by one instead
+    """
+
+    def __init__(self, downloader=None, pps=(), plan=None, steps=()):
+        super().__init__(downloader)
+        self.pps, self._plan, self._steps = list(pps), plan, list(steps)
+
+    @classmethod
+    def combine(cls, downloader, pps, info):
+        """
+        @returns    A postprocessor that runs the leading postprocessors of pps that can be
+                    combined, or None if there are less than two of them
+        """
+        # Arguments given to each postprocessor cannot be combined
+        if downloader.params.get('postprocessor_args') or 'filepath' not in info:
+            return None
+        plan, steps = FFmpegPlan(info), []
+        for pp in pps:
+            step = isinstance(pp, FFmpegPostProcessor) and pp.available and pp._ffmpeg_step(info, plan)
+            if not step:
+                break
+            steps.append(step)
+        if len(steps) < 2:
+            return None
+        return cls(downloader, pps[:len(steps)], plan, steps)
+
+    def run(self, info):
+        if not self._steps:
+            return [], info
+        info_copy = self._copy_infodict(info)
+        files_to_delete = []
+        for pp, prepare in zip(self.pps, self._steps, strict=True):
+            pp._hook_progress({'status': 'started'}, info_copy)
+            files_to_delete.extend(prepare() or [])
+
+        filename = self._plan.filepath
+        temp_filename = prepend_extension(filename, 'temp')
+        self.to_screen(f'Running {", ".join(pp.pp_key() for pp in self.pps)} in a single pass')
+        try:
+            self.run_ffmpeg_multiple_files(self._plan.inputs, temp_filename, self._plan.opts)
+        except FFmpegPostProcessorError as e:
+            self.report_warning(f'Unable to combine the postprocessors: {e}. Running them one by one')
+            for pp in self.pps:
+                info = self._downloader.run_pp(pp, info)
+            return [], info
+
+        os.replace(temp_filename, filename)
+        self._delete_downloaded_files(*self._plan.temp_files)
+        for pp in self.pps:
+            pp._hook_progress({'status': 'finished'}, info_copy)
+        return files_to_delete, info
+
+
 class FFmpegMergerPP(FFmpegPostProcessor):
     SUPPORTED_EXTS = MEDIA_EXTENSIONS.common_video
 
@@ -817,6 +1014,13 @@ class FFmpegMergerPP(FFmpegPostProcessor):
     def run(self, info):
         filename = info['filepath']
         temp_filename = prepend_extension(filename, 'temp')
+        args = self._merge_opts(info)
+        self.to_screen(f'Merging formats into "{filename}"')
+        self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, args)
+        os.rename(temp_filename, filename)
+        return info['__files_to_merge'], info
+
+    def _merge_opts(self, info):
         args = ['-c', 'copy']
         audio_streams = 0
         for (i, fmt) in enumerate(info['requested_formats']):
@@ -828,10 +1032,20 @@ def run(self, info):
                 audio_streams += 1
             if fmt.get('vcodec') != 'none':
                 args.extend(['-map', f'{i}:v:0'])
-        self.to_screen(f'Merging formats into "{filename}"')
-        self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, args)
-        os.rename(temp_filename, filename)
-        return info['__files_to_merge'], info
+        return args
+
+    def _ffmpeg_step(self, info, plan):
+        # The formats can only be the inputs of the first step
+        if self._format_type(info) == 'images' or plan.inputs:
+            return None
+        plan.inputs.extend(info['__files_to_merge'])
+        plan.opts.extend(self._merge_opts(info))
+        plan.merged = True
+
+        def prepare():
+            self.to_screen(f'Merging formats into "{info["filepath"]}"')
+            return info['__files_to_merge']
+        return prepare
 
     def can_merge(self):
         # TODO: figure out merge-capable ffmpeg version
@@ -847,6 +1061,10 @@ def _fixup(self, msg, filename, options):
 
         os.replace(temp_filename, filename)
 
+    def _fixup_step(self, msg, info, plan, options=()):
+        plan.add_opts(*options)
+        return lambda: self.to_screen(f'{msg} of "{info["filepath"]}"')
+
 
 class FFmpegFixupStretchedPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, audio=False)
@@ -857,6 +1075,12 @@ def run(self, info):
                 *self.stream_copy_opts(), '-aspect', f'{stretched_ratio:f}'])
         return [], info
 
+    def _ffmpeg_step(self, info, plan):
+        stretched_ratio = info.get('stretched_ratio')
+        if self._format_type(info) != 'video' or stretched_ratio in (None, 1):
+            return None
+        return self._fixup_step('Fixing aspect ratio', info, plan, ['-aspect', f'{stretched_ratio:f}'])
+
 
 class FFmpegFixupM4aPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, video=False)
@@ -865,6 +1089,11 @@ def run(self, info):
             self._fixup('Correcting container', info['filepath'], [*self.stream_copy_opts(), '-f', 'mp4'])
         return [], info
 
+    def _ffmpeg_step(self, info, plan):
+        if self._format_type(info) != 'audio' or plan.merged or info.get('container') != 'm4a_dash':
+            return None
+        return self._fixup_step('Correcting container', info, plan, ['-f', 'mp4'])
+
 
 class FFmpegFixupM3u8PP(FFmpegFixupPostProcessor):
     def _needs_fixup(self, info):
@@ -888,6 +1117,17 @@ def run(self, info):
                 *self.stream_copy_opts(), *args])
         return [], info
 
+    def _ffmpeg_step(self, info, plan):
+        # The file is probed, so it must be the input of the combined invocation
+        if self._format_type(info) == 'images' or plan.merged:
+            return None
+        elif not all(self._needs_fixup(info)):
+            return None
+        args = ['-f', 'mp4']
+        if self.get_audio_codec(info['filepath']) == 'aac':
+            args.extend(['-bsf:a', 'aac_adtstoasc'])
+        return self._fixup_step('Fixing MPEG-TS in MP4 container', info, plan, args)
+
 
 class FFmpegFixupTimestampPP(FFmpegFixupPostProcessor):
 
@@ -918,6 +1158,11 @@ def run(self, info):
         self._fixup(self.MESSAGE, info['filepath'], self.stream_copy_opts())
         return [], info
 
+    def _ffmpeg_step(self, info, plan):
+        if self._format_type(info) == 'images':
+            return None
+        return self._fixup_step(self.MESSAGE, info, plan)
+
 
 class FFmpegFixupDurationPP(FFmpegCopyStreamPP):
     MESSAGE = 'Fixing video duration'
@@ -967,6 +1212,18 @@ def run(self, info):
                     'You have requested to convert dfxp (TTML) subtitles into another format, '
                     'which results in style information loss')
 
+            data = self._convert_natively(old_file, ext, new_file, new_ext)
+            if data is not None:
+                subs[lang] = {
+                    'ext': new_ext,
+                    'data': data,
+                    'filepath': new_file,
+                }
+                info['__files_to_move'][new_file] = replace_extension(
+                    info['__files_to_move'][sub['filepath']], new_ext)
+                continue
+
+            if ext in ('dfxp', 'ttml', 'tt'):
                 dfxp_file = old_file
                 srt_file = replace_extension(old_file, 'srt')
 
@@ -1002,6 +1259,21 @@ def run(self, info):
 
         return sub_filenames, info
 
+    def _convert_natively(self, old_file, ext, new_file, new_ext):
+        """@returns The converted subtitles, or None if they have to be converted with ffmpeg"""
+        if not can_convert_subtitles(ext, new_ext):
+            return None
+        with open(old_file, 'rb') as f:
+            try:
+                data = convert_subtitles(f.read(), ext, new_ext)
+            except SubtitlesConversionError as e:
+                self.write_debug(f'{e}; converting with ffmpeg instead')
+                return None
+        with open(new_file, 'w', encoding='utf-8') as f:
+            f.write(data)
+        self.try_utime(new_file, os.path.getmtime(old_file), os.path.getmtime(old_file))
+        return data
+
 
 class FFmpegSplitChaptersPP(FFmpegPostProcessor):
     def __init__(self, downloader, force_keyframes=False):
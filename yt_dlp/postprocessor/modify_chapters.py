@@ -1,25 +1,64 @@
 import copy
 import heapq
+import json
 import os
+import subprocess
 
 from .common import PostProcessor
 from .ffmpeg import FFmpegPostProcessor, FFmpegSubtitlesConvertorPP
 from .sponsorblock import SponsorBlockPP
-from ..utils import PostProcessingError, orderedSet, prepend_extension
+from ..utils import (
+    Popen,
+    PostProcessingError,
+    determine_ext,
+    float_or_none,
+    orderedSet,
+    prepend_extension,
+    shell_quote,
+    traverse_obj,
+)
 
 _TINY_CHAPTER_DURATION = 1
+# The encoders used to re-encode the video around the cuts with --smart-cuts, by codec.
+# The parameter sets are repeated in-band, since the muxer only keeps those of the first part
+_SMART_CUT_ENCODERS = {
+    'h264': ('libx264', '-x264-params', 'repeat-headers=1'),
+    'hevc': ('libx265', '-x265-params', 'repeat-headers=1'),
+    'vp9': ('libvpx-vp9', '-crf', '32', '-b:v', '0'),
+    'av1': ('libaom-av1', '-crf', '30', '-cpu-used', '8'),
+}
+# The encoder profiles of the profiles reported by ffprobe
+_SMART_CUT_PROFILES = {
+    'h264': {
+        'Constrained Baseline': 'baseline',
+        'Baseline': 'baseline',
+        'Main': 'main',
+        'High': 'high',
+        'High 10': 'high10',
+        'High 4:2:2': 'high422',
+        'High 4:4:4 Predictive': 'high444',
+    },
+    'hevc': {
+        'Main': 'main',
+        'Main 10': 'main10',
+    },
+}
+# The tolerance for a cut to be considered at a keyframe
+_KEYFRAME_TOLERANCE = 0.001
 DEFAULT_SPONSORBLOCK_CHAPTER_TITLE = '[SponsorBlock]: %(category_names)l'
 
 
 class ModifyChaptersPP(FFmpegPostProcessor):
     def __init__(self, downloader, remove_chapters_patterns=None, remove_sponsor_segments=None, remove_ranges=None,
-                 *, sponsorblock_chapter_title=DEFAULT_SPONSORBLOCK_CHAPTER_TITLE, force_keyframes=False):
+                 *, sponsorblock_chapter_title=DEFAULT_SPONSORBLOCK_CHAPTER_TITLE, force_keyframes=False,
+                 smart_cut=False):
         FFmpegPostProcessor.__init__(self, downloader)
         self._remove_chapters_patterns = set(remove_chapters_patterns or [])
         self._remove_sponsor_segments = set(remove_sponsor_segments or []) - set(SponsorBlockPP.NON_SKIPPABLE_CATEGORIES.keys())
         self._ranges_to_remove = set(remove_ranges or [])
         self._sponsorblock_chapter_title = sponsorblock_chapter_title
         self._force_keyframes = force_keyframes
+        self._smart_cut = smart_cut
 
     @PostProcessor._restrict_to(images=False)
     def run(self, info):
@@ -57,7 +96,8 @@ def run(self, info):
         self.write_debug('Concat spec = {}'.format(', '.join(f'{c.get("inpoint", 0.0)}-{c.get("outpoint", "inf")}' for c in concat_opts)))
 
         def remove_chapters(file, is_sub):
-            return file, self.remove_chapters(file, cuts, concat_opts, self._force_keyframes and not is_sub)
+            return file, self.remove_chapters(
+                file, cuts, concat_opts, self._force_keyframes and not is_sub, smart_cut=self._smart_cut and not is_sub)
 
         in_out_files = [remove_chapters(info['filepath'], False)]
         in_out_files.extend(remove_chapters(in_file, True) for in_file in self._get_supported_subs(info))
@@ -310,9 +350,17 @@ def _remove_tiny_rename_sponsors(self, chapters):
             new_chapters.append(c)
         return new_chapters
 
-    def remove_chapters(self, filename, ranges_to_cut, concat_opts, force_keyframes=False):
+    def remove_chapters(self, filename, ranges_to_cut, concat_opts, force_keyframes=False, *, smart_cut=False):
         in_file = filename
         out_file = prepend_extension(in_file, 'temp')
+        if smart_cut:
+            try:
+                self._remove_chapters_smart_cut(filename, out_file, concat_opts)
+            except PostProcessingError as e:
+                self.report_warning(f'Unable to re-encode only around the cuts; re-encoding the whole video. {e}')
+                force_keyframes = True
+            else:
+                return out_file
         if force_keyframes:
             in_file = self.force_keyframes(in_file, (t for c in ranges_to_cut for t in (c['start_time'], c['end_time'])))
         self.to_screen(f'Removing chapters from {filename}')
@@ -321,6 +369,129 @@ def remove_chapters(self, filename, ranges_to_cut, concat_opts, force_keyframes=
             self._delete_downloaded_files(in_file, msg=None)
         return out_file
 
+    def _remove_chapters_smart_cut(self, filename, out_file, concat_opts):
+        """
+        Re-encode only the parts of the video between the cuts and the nearest keyframes,
+        and concatenate them with the copied parts into out_file
+        """
+        try:
+            metadata = self.get_metadata_object(filename, [
+                '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags'])
+        except json.JSONDecodeError as e:
+            raise PostProcessingError(f'Unable to probe the keyframes: {e}') from e
+        stream = traverse_obj(metadata, ('streams', 0, {dict})) or {}
+        codec = stream.get('codec_name')
+        if codec not in _SMART_CUT_ENCODERS:
+            raise PostProcessingError(f'Unsupported video codec {codec or "none"}')
+        keyframes = sorted(traverse_obj(metadata, (
+            'packets', lambda _, v: 'K' in v['flags'], 'pts_time', {float_or_none})))
+        duration = float_or_none(traverse_obj(metadata, ('format', 'duration')))
+        if not keyframes or not duration:
+            raise PostProcessingError('Unable to find the keyframes')
+
+        parts = self._make_smart_cut_parts(concat_opts, keyframes, duration)
+        in_files, parts_concat_opts, temp_files = [], [], []
+        try:
+            encode_opts = self._smart_cut_encode_opts(filename, stream)
+            for start, end, copy_part in parts:
+                if copy_part:
+                    in_files.append(filename)
+                    parts_concat_opts.append({
+                        **({'inpoint': f'{start:.6f}'} if start else {}),
+                        **({'outpoint': f'{end:.6f}'} if end is not None else {}),
+                    })
+                    continue
+                part_file = prepend_extension(filename, f'part{len(temp_files)}.temp')
+                temp_files.append(part_file)
+                # Seeking the input is only precise to the previous keyframe for the copied streams
+                seek = max((k for k in keyframes if k <= start), default=0)
+                self.to_screen(f'Re-encoding {(end or duration) - start:.3f}s around the cut at {start:.3f}s')
+                self.real_run_ffmpeg([(filename, ['-ss', f'{seek:.6f}'])], [(part_file, [
+                    '-ss', f'{start - seek:.6f}', *(['-t', f'{end - start:.6f}'] if end is not None else []),
+                    *self.stream_copy_opts(ext=determine_ext(filename)), *encode_opts])])
+                in_files.append(part_file)
+                parts_concat_opts.append({})
+
+            self.to_screen(f'Removing chapters from {filename}')
+            self.concat_files(in_files, out_file, parts_concat_opts)
+        finally:
+            self._delete_downloaded_files(*temp_files, msg=None)
+
+        # The parts may still not be decodable together, e.g. if the parameter sets
+        # of the re-encoded parts differ from those of the original that the muxer kept
+        part_starts, position = [], 0
+        for start, end, _ in parts[:-1]:
+            position += (end or duration) - start
+            part_starts.append(position)
+        if not self._decodes(out_file, part_starts):
+            self._delete_downloaded_files(out_file, msg=None)
+            raise PostProcessingError('The re-encoded parts could not be decoded with the copied ones')
+
+    def _smart_cut_encode_opts(self, filename, stream):
+        """The options to re-encode the video with the same codec and parameters as the original"""
+        codec, level = stream['codec_name'], stream.get('level')
+        encoder = list(_SMART_CUT_ENCODERS[codec])
+        if codec == 'hevc' and level and level > 0:
+            encoder[-1] += f':level-idc={level / 30:.1f}'
+        opts = ['-c:v:0', *encoder]
+        if codec in _SMART_CUT_PROFILES:
+            profile = _SMART_CUT_PROFILES[codec].get(stream.get('profile'))
+            if not profile:
+                raise PostProcessingError(f'Unsupported {codec} profile {stream.get("profile") or "none"}')
+            opts += ['-profile:v:0', profile]
+        if codec == 'h264' and level and level > 0:
+            opts += ['-level:v:0', f'{level / 10:.1f}']
+        if stream.get('pix_fmt'):
+            opts += ['-pix_fmt:v:0', stream['pix_fmt']]
+        timescale = traverse_obj(stream, ('time_base', {lambda x: x.partition('/')[2]}))
+        if determine_ext(filename) in ('mp4', 'mov', 'm4v') and timescale:
+            opts += ['-video_track_timescale', timescale]
+        return opts
+
+    def _decodes(self, filename, timestamps, window=2):
+        """Whether the video of the file decodes without errors for `window` seconds from each of the timestamps"""
+        for timestamp in timestamps:
+            cmd = [
+                self.executable, '-hide_banner', '-nostdin', '-v', 'error', '-xerror',
+                '-ss', f'{timestamp:.6f}', '-i', self._ffmpeg_filename_argument(filename),
+                '-t', str(window), '-map', '0:v:0', '-f', 'null', '-']
+            self.write_debug(f'ffmpeg command line: {shell_quote(cmd)}')
+            _, stderr, returncode = Popen.run(
+                cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+            if returncode or stderr.strip():
+                self.write_debug(stderr)
+                return False
+        return True
+
+    @staticmethod
+    def _make_smart_cut_parts(concat_opts, keyframes, duration):
+        """
+        Split the parts of the video that are kept into the parts between keyframes, which are copied,
+        and the parts between a cut and the nearest keyframe, which must be re-encoded
+        @returns    [(start, end, copy)], where end is None for the end of the video
+        """
+        parts = []
+
+        def add_part(start, end, copy):
+            if end is None or end - start > _KEYFRAME_TOLERANCE:
+                parts.append((start, end, copy))
+
+        for opts in concat_opts:
+            start, end = float(opts.get('inpoint', 0)), float_or_none(opts.get('outpoint'))
+            inner = [k for k in keyframes if start - _KEYFRAME_TOLERANCE <= k <= (end or duration) + _KEYFRAME_TOLERANCE]
+            if not inner:
+                add_part(start, end, False)
+                continue
+            first = inner[0] if inner[0] - start > _KEYFRAME_TOLERANCE else start
+            last = inner[-1]
+            add_part(start, first, False)
+            if end is None or end - last <= _KEYFRAME_TOLERANCE:
+                add_part(first, end, True)
+            else:
+                add_part(first, last, True)
+                add_part(last, end, False)
+        return parts
+
     @staticmethod
     def _make_concat_opts(chapters_to_remove, duration):
         opts = [{}]
@@ -0,0 +1,364 @@
+import contextlib
+import hmac
+import io
+import ipaddress
+import json
+import optparse
+import os
+import secrets
+import socket
+import socketserver
+import stat
+import threading
+import traceback
+
+from . import parse_options
+from .cookies import CookieLoadError
+from .postprocessor import FFmpegPostProcessor
+from .utils import (
+    DownloadCancelled,
+    DownloadError,
+    SameFileError,
+    expand_path,
+)
+from .YoutubeDL import YoutubeDL
+
+MAX_REQUEST_SIZE = 1024 * 1024
+# The options are parsed with the output of the parser redirected, which is process-wide
+_parse_lock = threading.Lock()
+
+
+def parse_address(address):
+    """
+    Parse a server address of the form "unix:PATH" or "[HOST:]PORT"
+    @returns (family, address) to bind or connect a socket to
+    """
+    if address.startswith('unix:'):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix domain sockets are not supported on this platform')
+        return socket.AF_UNIX, address[len('unix:'):]
+
+    host, _, port = address.rpartition(':')
+    if not port.isdecimal():
+        raise ValueError(f'Invalid server address {address!r}')
+    try:
+        family, _, _, _, sockaddr = socket.getaddrinfo(
+            host.strip('[]') or 'localhost', int(port), type=socket.SOCK_STREAM)[0]
+    except OSError as err:
+        raise ValueError(f'Unable to resolve server address {address!r}: {err}')
+    if not ipaddress.ip_address(sockaddr[0]).is_loopback:
+        raise ValueError('The server can only listen on a loopback address')
+    return family, sockaddr
+
+
+def _remove_stale_socket(path):
+    """Remove the socket of a server that is no longer running. Any other file is left alone"""
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f'{path} already exists and is not a socket')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise ValueError(f'Another server is already listening on {path}')
+
+
+def _is_json_value(value):
+    return isinstance(value, (str, int, float, bool, type(None)))
+
+
+def _hook_event(event_type, status):
+    """The JSON-serializable part of a progress or postprocessor hook status"""
+    info_dict = status.get('info_dict') or {}
+    return {
+        **{key: value for key, value in status.items() if _is_json_value(value)},
+        'type': event_type,
+        'info_dict': {key: info_dict.get(key) for key in ('id', 'title', 'extractor_key', 'webpage_url')},
+    }
+
+
+class _EventWriter:
+    """Send events to the client as JSON lines. Hooks may be called from several threads"""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self._lock = threading.Lock()
+        self.disconnected = False
+
+    def __call__(self, event):
+        with self._lock:
+            if self.disconnected:
+                return
+            try:
+                self._wfile.write(json.dumps(event).encode() + b'\n')
+                self._wfile.flush()
+            except OSError:
+                self.disconnected = True
+
+    def hook(self, event_type):
+        def hook(status):
+            self(_hook_event(event_type, status))
+            if self.disconnected:
+                raise DownloadCancelled('The client has disconnected')
+        return hook
+
+
+class _JobLogger:
+    def __init__(self, send):
+        self._send = send
+
+    def _log(self, level, message):
+        self._send({'type': 'log', 'level': level, 'message': message})
+
+    def debug(self, msg):
+        # Both screen and debug messages are passed to debug; debug messages are prefixed with "[debug] "
+        self._log('debug' if msg.startswith('[debug] ') else 'info', msg)
+
+    def info(self, msg):
+        self._log('info', msg)
+
+    def warning(self, msg):
+        self._log('warning', msg)
+
+    def error(self, msg):
+        self._log('error', msg)
+
+
+class _JobYoutubeDL(YoutubeDL):
+    def __init__(self, params, send):
+        self._send_event = send
+        super().__init__(params)
+
+    def to_stdout(self, message, skip_eol=False, quiet=None):
+        self._send_event({'type': 'stdout', 'message': message})
+
+
+class _WarmContext:
+    """State that is expensive to set up and can be shared by the jobs that use the same options"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cookiejars = {}
+        self._js_runtimes = {}
+        self._dispatch_indexes = {}
+
+    @staticmethod
+    def _cookiejar_key(params):
+        # Loading cookies from a file is cheap and the file may be changed by others
+        if params.get('cookiesfrombrowser'):
+            return params.get('cookiefile'), params['cookiesfrombrowser']
+
+    def prepare(self, ydl):
+        with self._lock:
+            cookiejar = self._cookiejars.get(self._cookiejar_key(ydl.params))
+            if cookiejar is not None:
+                ydl.__dict__['cookiejar'] = cookiejar
+
+            js_runtimes = {
+                name: self._js_runtimes.get((name, config.get('path')))
+                for name, config in ydl.params.get('js_runtimes', {}).items()}
+            if all(js_runtimes.values()):
+                ydl.__dict__['_js_runtimes'] = js_runtimes
+
+            ydl._url_dispatch_index = self._dispatch_indexes.get(tuple(ydl._ies))
+
+    def update(self, ydl):
+        with self._lock:
+            cookiejar_key = self._cookiejar_key(ydl.params)
+            if cookiejar_key and 'cookiejar' in ydl.__dict__:
+                self._cookiejars[cookiejar_key] = ydl.cookiejar
+            for name, runtime in ydl.__dict__.get('_js_runtimes', {}).items():
+                if runtime is not None:
+                    self._js_runtimes[(name, runtime._path)] = runtime
+            if ydl._url_dispatch_index is not None:
+                self._dispatch_indexes[tuple(ydl._ies)] = ydl._url_dispatch_index
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        send = _EventWriter(self.wfile)
+        request = self.rfile.readline(MAX_REQUEST_SIZE)
+        try:
+            request = json.loads(request)
+            args = request['args']
+            if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+                raise ValueError('args must be a list of strings')
+        except (ValueError, TypeError, KeyError) as err:
+            send({'type': 'log', 'level': 'error', 'message': f'ERROR: Invalid request: {err}'})
+            send({'type': 'result', 'retcode': 2})
+            return
+
+        batch_server = self.server.batch_server
+        if not batch_server.check_token(request.get('token')):
+            send({'type': 'log', 'level': 'error', 'message': 'ERROR: Invalid token'})
+            send({'type': 'result', 'retcode': 2})
+            return
+        send({'type': 'result', 'retcode': batch_server.run_job(args, send)})
+
+
+if hasattr(socket, 'AF_UNIX'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def server_bind(self):
+            # Only the current user may submit jobs
+            old_umask = os.umask(0o177)
+            try:
+                super().server_bind()
+            finally:
+                os.umask(old_umask)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, family, *args, **kwargs):
+        self.address_family = family
+        super().__init__(*args, **kwargs)
+
+
+class BatchServer:
+    """Run jobs for clients in a single long-running process
+
+    Each job is a list of command-line arguments that are appended to the arguments of the server,
+    so that the options of the job override those of the server. The imported extractors and
+    state such as cookies loaded from browsers, detected JS runtimes and the URL dispatch index
+    are kept between the jobs. The events of a job are sent to the client as JSON lines:
+
+        {"type": "log", "level": "debug|info|warning|error", "message": ...}
+        {"type": "stdout", "message": ...}                  Output of --print, -j, etc
+        {"type": "progress", "status": ..., "info_dict": {"id": ..., ...}, ...}
+        {"type": "postprocessor", "status": ..., "postprocessor": ..., ...}
+        {"type": "result", "retcode": ...}                  Always the last event
+
+    @param address  "unix:PATH" for a Unix domain socket, or "[HOST:]PORT" on a loopback address
+    @param args     The arguments of the server, which each job extends
+    @param token    Secret that the clients must send. Required for TCP, since
+                    any local user can connect to it. Generated if not given
+    """
+
+    def __init__(self, address, args, *, token=None):
+        family, bind_address = parse_address(address)
+        self._args = list(args)
+        self._context = _WarmContext()
+        if family == getattr(socket, 'AF_UNIX', None):
+            self.token = token
+            _remove_stale_socket(bind_address)
+            self._server = _UnixServer(bind_address, _JobHandler)
+            self.address = f'unix:{bind_address}'
+        else:
+            self.token = token or secrets.token_urlsafe(16)
+            self._server = _TCPServer(family, bind_address, _JobHandler)
+            host, port = self._server.server_address[:2]
+            self.address = f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+        self._server.batch_server = self
+
+    def check_token(self, token):
+        if self.token is None:
+            return True
+        return isinstance(token, str) and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        self._server.shutdown()
+
+    def close(self):
+        self._server.server_close()
+        if self.address.startswith('unix:'):
+            with contextlib.suppress(OSError):
+                os.remove(self.address[len('unix:'):])
+
+    def _parse_options(self, args, send):
+        """parse_options, with the output of the parser sent to the client rather than to the console of the server"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        try:
+            with _parse_lock, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                return parse_options([*self._args, *args])
+        finally:
+            # --verbose prints the configs to stderr, and --help and --version print to stdout
+            if stderr.getvalue():
+                send({'type': 'log', 'level': 'debug', 'message': stderr.getvalue().rstrip('\n')})
+            if stdout.getvalue():
+                send({'type': 'stdout', 'message': stdout.getvalue().rstrip('\n')})
+
+    def run_job(self, args, send):
+        """Run a job and return its exit code"""
+        try:
+            _, opts, urls, ydl_opts = self._parse_options(args, send)
+        except optparse.OptParseError as err:
+            send({'type': 'log', 'level': 'error', 'message': str(err)})
+            return 2
+        except SystemExit as err:  # --help, --version
+            return err.code or 0
+        if not urls and opts.load_info_filename is None:
+            send({'type': 'log', 'level': 'error', 'message': 'ERROR: You must provide at least one URL'})
+            return 2
+
+        # Each job runs in its own thread, and hence its own context
+        if opts.ffmpeg_location:
+            FFmpegPostProcessor._ffmpeg_location.set(opts.ffmpeg_location)
+
+        ydl_opts.update({
+            'logger': _JobLogger(send),
+            'noprogress': True,
+            'consoletitle': False,
+            'progress_hooks': [*(ydl_opts.get('progress_hooks') or []), send.hook('progress')],
+            'postprocessor_hooks': [*(ydl_opts.get('postprocessor_hooks') or []), send.hook('postprocessor')],
+        })
+        try:
+            ydl = _JobYoutubeDL(ydl_opts, send)
+            self._context.prepare(ydl)
+            with ydl:
+                try:
+                    if opts.load_info_filename is not None:
+                        return ydl.download_with_info_file(expand_path(opts.load_info_filename))
+                    return ydl.download(urls)
+                except DownloadCancelled:
+                    ydl.to_screen('Aborting remaining downloads')
+                    return 101
+                finally:
+                    self._context.update(ydl)
+        except (CookieLoadError, DownloadError):
+            return 1
+        except SameFileError as err:
+            send({'type': 'log', 'level': 'error', 'message': f'ERROR: {err}'})
+            return 1
+        except Exception:
+            send({'type': 'log', 'level': 'error', 'message': traceback.format_exc()})
+            return 1
+
+
+class BatchClient:
+    """Submit jobs to a BatchServer
+
+    @param address  The address of the server
+    @param token    The token of the server, if any
+    @param timeout  Socket timeout, in seconds
+    """
+
+    def __init__(self, address, token=None, timeout=None):
+        self.address = address
+        self.token = token
+        self.timeout = timeout
+
+    def run(self, args):
+        """Run a job with the given arguments and yield its events"""
+        family, address = parse_address(self.address)
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(address)
+            sock.sendall(json.dumps({'args': list(args), 'token': self.token}).encode() + b'\n')
+            with sock.makefile('rb') as f:
+                for line in f:
+                    yield json.loads(line)
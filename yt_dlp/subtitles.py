@@ -0,0 +1,217 @@
+"""
+Native conversion between subtitle formats, without ffmpeg.
+
+Subtitles are read as a stream of webvtt.CueBlock's from WebVTT, SRT, TTML and
+YouTube's srv1/srv2/srv3 and json3 formats, and written cue by cue as SRT, WebVTT or ASS.
+The text of the cues is kept as WebVTT cue text; the <b>, <i> and <u> tags are converted
+to the other formats, and any other markup is dropped.
+"""
+
+import io
+import json
+import re
+import xml.etree.ElementTree
+
+from . import webvtt
+from .utils import dfxp2srt, float_or_none, int_or_none, timetuple_from_msec, unescapeHTML
+
+
+class SubtitlesConversionError(Exception):
+    pass
+
+
+def _make_cue(start_ms, end_ms, text):
+    # Blank lines and arrows would end the cue in WebVTT
+    lines = (line.replace('-->', '--&gt;') for line in text.splitlines())
+    text = ''.join(f'{line}\n' for line in lines if line.strip())
+    if not text:
+        return None
+    return webvtt.CueBlock(id=None, start=round(start_ms * 90), end=round(end_ms * 90), settings=None, text=text)
+
+
+def _escape_text(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _read_vtt(data):
+    for block in webvtt.parse_fragment(data):
+        if isinstance(block, webvtt.CueBlock):
+            yield block
+
+
+_SRT_TS = r'(\d+):(\d{2}):(\d{2})[,.](\d{3})'
+_SRT_CUE_RE = re.compile(
+    rf'(?m)^[ \t]*{_SRT_TS}[ \t]*-->[ \t]*{_SRT_TS}[^\r\n]*(?:\r\n|[\r\n])((?:[^\r\n]*\S[^\r\n]*(?:\r\n|[\r\n]|\Z))*)')
+# The formatting tags of SRT are the same as WebVTT's; <font> tags and ASS-style overrides are dropped
+_SRT_MARKUP_RE = re.compile(r'<(/?[biuBIU])>|<[^<>]*>|\{\\[^}]*\}|([&<>])')
+
+
+def _srt_markup(mobj):
+    if mobj.group(1):
+        return f'<{mobj.group(1).lower()}>'
+    elif mobj.group(2):
+        return _escape_text(mobj.group(2))
+    return ''
+
+
+def _read_srt(data):
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    for mobj in _SRT_CUE_RE.finditer(data):
+        start, end = (
+            ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + int(ms)
+            for h, m, s, ms in (mobj.group(1, 2, 3, 4), mobj.group(5, 6, 7, 8)))
+        cue = _make_cue(start, end, _SRT_MARKUP_RE.sub(_srt_markup, mobj.group(9)))
+        if cue:
+            yield cue
+
+
+def _read_ttml(data):
+    yield from _read_srt(dfxp2srt(data))
+
+
+def _read_srv(data):
+    for _, elem in xml.etree.ElementTree.iterparse(io.BytesIO(data)):
+        if elem.tag == 'text' and 'start' in elem.attrib:  # srv1, in seconds
+            start = float_or_none(elem.get('start'), invscale=1000)
+            duration = float_or_none(elem.get('dur'), invscale=1000, default=0)
+            text = unescapeHTML(''.join(elem.itertext()))
+        elif elem.tag in ('text', 'p'):  # srv2 and srv3, in milliseconds
+            start = int_or_none(elem.get('t'))
+            duration = int_or_none(elem.get('d'), default=0)
+            text = ''.join(elem.itertext())
+        else:
+            continue
+        elem.clear()
+        cue = start is not None and _make_cue(start, start + duration, _escape_text(text))
+        if cue:
+            yield cue
+
+
+def _read_json3(data):
+    for event in json.loads(data).get('events') or []:
+        text = ''.join(seg.get('utf8') or '' for seg in event.get('segs') or [])
+        start = event.get('tStartMs') or 0
+        cue = _make_cue(start, start + (event.get('dDurationMs') or 0), _escape_text(text))
+        if cue:
+            yield cue
+
+
+_READERS = {
+    'vtt': _read_vtt,
+    'srt': _read_srt,
+    'ttml': _read_ttml,
+    'dfxp': _read_ttml,
+    'tt': _read_ttml,
+    'srv1': _read_srv,
+    'srv2': _read_srv,
+    'srv3': _read_srv,
+    'json3': _read_json3,
+}
+
+_CUE_MARKUP_RE = re.compile(r'<(/?)([^\s.>/]*)[^>]*>')
+
+
+def _plain_text(cue, formatting, escape=lambda text: text):
+    """
+    Convert the cue text to non-empty lines of plain text, with the <b>, <i> and <u> tags
+    replaced by formatting(tag, is_opening) and the rest of the text passed through escape
+    """
+    parts, pos = [], 0
+    for mobj in _CUE_MARKUP_RE.finditer(cue.text):
+        parts.append(escape(unescapeHTML(cue.text[pos:mobj.start()])))
+        if mobj.group(2) in ('b', 'i', 'u'):
+            parts.append(formatting(mobj.group(2), not mobj.group(1)))
+        pos = mobj.end()
+    parts.append(escape(unescapeHTML(cue.text[pos:])))
+    return [line for line in ''.join(parts).splitlines() if line.strip()]
+
+
+def _msec(ts):
+    return int((ts + 45) // 90)
+
+
+def _write_srt(cues, stream):
+    index = 0
+    for cue in cues:
+        lines = _plain_text(cue, lambda tag, opening: f'<{"" if opening else "/"}{tag}>')
+        if not lines:
+            continue
+        index += 1
+        stream.write(f'{index}\n')
+        stream.write('%02u:%02u:%02u,%03u --> ' % timetuple_from_msec(_msec(cue.start)))
+        stream.write('%02u:%02u:%02u,%03u\n' % timetuple_from_msec(_msec(cue.end)))
+        stream.write(''.join(f'{line}\n' for line in lines))
+        stream.write('\n')
+
+
+def _write_vtt(cues, stream):
+    stream.write('WEBVTT\n\n')
+    for cue in cues:
+        cue.write_into(stream)
+
+
+_ASS_HEADER = '''[Script Info]
+ScriptType: v4.00+
+PlayResX: 384
+PlayResY: 288
+ScaledBorderAndShadow: yes
+YCbCr Matrix: None
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,16,&Hffffff,&Hffffff,&H0,&H0,0,0,0,0,100,100,0,0,1,1,0,2,10,10,10,0
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+'''
+
+
+def _ass_ts(ts):
+    centisecs = _msec(ts) // 10
+    return '%u:%02u:%02u.%02u' % (*timetuple_from_msec(centisecs * 10)[:3], centisecs % 100)
+
+
+def _write_ass(cues, stream):
+    stream.write(_ASS_HEADER)
+    for cue in cues:
+        # Braces start override blocks in ASS
+        lines = _plain_text(
+            cue, lambda tag, opening: f'{{\\{tag}{int(opening)}}}',
+            lambda text: text.replace('{', r'\{').replace('}', r'\}'))
+        if not lines:
+            continue
+        text = r'\N'.join(lines)
+        stream.write(f'Dialogue: 0,{_ass_ts(cue.start)},{_ass_ts(cue.end)},Default,,0,0,0,,{text}\n')
+
+
+_WRITERS = {
+    'srt': _write_srt,
+    'vtt': _write_vtt,
+    'ass': _write_ass,
+}
+
+SUPPORTED_INPUTS = tuple(_READERS)
+SUPPORTED_OUTPUTS = tuple(_WRITERS)
+
+
+def can_convert_subtitles(from_ext, to_ext):
+    return from_ext in _READERS and to_ext in _WRITERS
+
+
+def convert_subtitles(data, from_ext, to_ext):
+    """
+    Convert subtitles between the formats in SUPPORTED_INPUTS and SUPPORTED_OUTPUTS
+
+    @param data     The subtitles, as bytes
+    @returns        The converted subtitles, as str
+    @raises         SubtitlesConversionError if the subtitles could not be parsed
+    """
+    if not can_convert_subtitles(from_ext, to_ext):
+        raise SubtitlesConversionError(f'Conversion from {from_ext} to {to_ext} is not supported')
+    stream = io.StringIO()
+    try:
+        _WRITERS[to_ext](_READERS[from_ext](data), stream)
+    except (webvtt.ParseError, xml.etree.ElementTree.ParseError, ValueError, AttributeError, TypeError) as e:
+        raise SubtitlesConversionError(f'Unable to parse {from_ext} subtitles: {e}') from e
+    return stream.getvalue()
@@ -7,4 +7,4 @@
 # isort: off
 from .traversal import *
 from ._utils import *
-from ._utils import _configuration_args, _get_exe_version_output  # noqa: F401
+from ._utils import _configuration_args, _get_cached_exe_version_output, _get_exe_version_output  # noqa: F401
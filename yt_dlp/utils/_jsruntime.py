@@ -6,7 +6,7 @@
 import os.path
 import sys
 
-from ._utils import _get_exe_version_output, detect_exe_version, version_tuple
+from ._utils import _get_cached_exe_version_output, detect_exe_version, version_tuple
 
 
 _FALLBACK_PATHEXT = ('.COM', '.EXE', '.BAT', '.CMD')
@@ -66,8 +66,10 @@ class JsRuntimeInfo:
 
 
 class JsRuntime(abc.ABC):
-    def __init__(self, path=None):
+    def __init__(self, path=None, *, cache=None):
         self._path = path
+        # The yt_dlp.cache.Cache in which the output of the version commands is stored
+        self._cache = cache
 
     @functools.cached_property
     def info(self) -> JsRuntimeInfo | None:
@@ -83,7 +85,7 @@ class DenoJsRuntime(JsRuntime):
 
     def _info(self):
         path = _determine_runtime_path(self._path, 'deno')
-        out = _get_exe_version_output(path, ['--version'])
+        out = _get_cached_exe_version_output(self._cache, path, ['--version'])
         if not out:
             return None
         version = detect_exe_version(out, r'^deno (\S+)', 'unknown')
@@ -98,7 +100,7 @@ class BunJsRuntime(JsRuntime):
 
     def _info(self):
         path = _determine_runtime_path(self._path, 'bun')
-        out = _get_exe_version_output(path, ['--version'])
+        out = _get_cached_exe_version_output(self._cache, path, ['--version'])
         if not out:
             return None
         version = detect_exe_version(out, r'^(\S+)', 'unknown')
@@ -113,7 +115,7 @@ class NodeJsRuntime(JsRuntime):
 
     def _info(self):
         path = _determine_runtime_path(self._path, 'node')
-        out = _get_exe_version_output(path, ['--version'])
+        out = _get_cached_exe_version_output(self._cache, path, ['--version'])
         if not out:
             return None
         version = detect_exe_version(out, r'^v(\S+)', 'unknown')
@@ -129,7 +131,7 @@ class QuickJsRuntime(JsRuntime):
     def _info(self):
         path = _determine_runtime_path(self._path, 'qjs')
         # quickjs does not have --version and --help returns a status code of 1
-        out = _get_exe_version_output(path, ['--help'], ignore_return_code=True)
+        out = _get_cached_exe_version_output(self._cache, path, ['--help'], ignore_return_code=True)
         if not out:
             return None
         is_ng = 'QuickJS-ng' in out
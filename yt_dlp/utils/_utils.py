@@ -29,6 +29,7 @@
 import random
 import re
 import shlex
+import shutil
 import socket
 import ssl
 import struct
@@ -577,6 +578,31 @@ def decode(self, s):
         assert False, 'Too many attempts to decode JSON'
 
 
+_JSON_TOKEN_RE = re.compile(r'''(?s)"(?:\\.|[^\\"])*"|'(?:\\.|[^\\'])*'|`(?:\\.|[^\\`])*`|/\*.*?\*/|//[^\n]*|[{}\[\]]''')
+
+
+def json_object_end(string, start=0):
+    """
+    Find the end of the JSON or JavaScript object or array that starts at string[start]
+
+    Strings and comments are skipped without parsing their content, and the string is not copied.
+    The content itself is not validated
+    @returns    The index after the closing bracket, or None if the brackets are not balanced
+    """
+    if string[start:start + 1] not in ('{', '['):
+        return None
+    depth = 0
+    for mobj in _JSON_TOKEN_RE.finditer(string, start):
+        char = string[mobj.start()]
+        if char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if not depth:
+                return mobj.end()
+    return None
+
+
 def sanitize_open(filename, open_mode):
     """Try to open the given filename, and slightly tweak it if this fails.
 
@@ -770,11 +796,17 @@ def expand_path(s):
 def orderedSet(iterable, *, lazy=False):
     """Remove all duplicates from the input iterable"""
     def _iter():
-        seen = []  # Do not use set since the items can be unhashable
+        seen, seen_unhashable = set(), []  # The items can be unhashable
         for x in iterable:
-            if x not in seen:
-                seen.append(x)
-                yield x
+            try:
+                if x in seen:
+                    continue
+                seen.add(x)
+            except TypeError:
+                if x in seen_unhashable:
+                    continue
+                seen_unhashable.append(x)
+            yield x
 
     return _iter() if lazy else list(_iter())
 
@@ -2172,6 +2204,42 @@ def _get_exe_version_output(exe, args, ignore_return_code=False):
     return stdout
 
 
+def _get_cached_exe_version_output(cache, exe, args, ignore_return_code=False):
+    """
+    Same as _get_exe_version_output, but the output is stored in the given yt_dlp.cache.Cache,
+    and reused until the size or modification time of the executable changes
+
+    Scripts and links to executables of another name are not cached, since the shims of
+    version managers (asdf, mise, volta, ...) and multi-call binaries select the executable
+    that they run at every call without being modified
+    """
+    path = shutil.which(exe) if cache and cache.enabled else None
+    try:
+        real_path = path and os.path.realpath(path)
+        stat = real_path and os.path.basename(real_path) == os.path.basename(path) and os.stat(real_path)
+        path = real_path
+        if stat:
+            with open(path, 'rb') as f:
+                if f.read(2) == b'#!':
+                    stat = None
+    except OSError:
+        stat = None
+    if not stat:
+        return _get_exe_version_output(exe, args, ignore_return_code)
+
+    key = '\n'.join((path, *args))
+    entries = cache.load('executables', 'versions') or {}
+    entry = entries.get(key) or {}
+    if entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime_ns and 'output' in entry:
+        return entry['output']
+
+    output = _get_exe_version_output(exe, args, ignore_return_code)
+    if isinstance(output, str):
+        entries[key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'output': output}
+        cache.store('executables', 'versions', entries)
+    return output
+
+
 def detect_exe_version(output, version_re=None, unrecognized='present'):
     assert isinstance(output, str)
     if version_re is None:
@@ -2207,34 +2275,81 @@ def frange(start=0, stop=None, step=1):
 
 class LazyList(collections.abc.Sequence):
     """Lazy immutable list from an iterable
-    Note that slices of a LazyList are lists and not LazyList"""
+    Note that slices of a LazyList are lists and not LazyList
+
+    If window is given, only about that many of the last evaluated items are kept, so that
+    iterating over a large iterable once uses bounded memory. Accessing an item that has
+    been discarded raises LazyList.EvictedError"""
 
     class IndexError(IndexError):  # noqa: A001
         pass
 
-    def __init__(self, iterable, *, reverse=False, _cache=None):
+    class EvictedError(LookupError):
+        pass
+
+    def __init__(self, iterable, *, reverse=False, window=None, _cache=None):
         self._iterable = iter(iterable)
         self._cache = [] if _cache is None else _cache
         self._reversed = reverse
+        self._window = window
+        self._evicted = 0  # Number of items discarded from the start of the cache
 
     def __iter__(self):
         if self._reversed:
             # We need to consume the entire iterable to iterate in reverse
             yield from self.exhaust()
             return
+        if self._window is not None:
+            # The cache is trimmed while iterating
+            for idx in itertools.count():
+                try:
+                    item = self[idx]
+                except self.IndexError:
+                    return
+                yield item
         yield from self._cache
         for item in self._iterable:
             self._cache.append(item)
             yield item
 
+    def _extend(self, items):
+        if self._window is None:
+            self._cache.extend(items)
+            return
+        for item in items:
+            self._cache.append(item)
+            # Trim in batches so that evaluating an item stays O(1)
+            if len(self._cache) >= 2 * self._window:
+                excess = len(self._cache) - self._window
+                del self._cache[:excess]
+                self._evicted += excess
+
     def _exhaust(self):
-        self._cache.extend(self._iterable)
+        self._extend(self._iterable)
         self._iterable = []  # Discard the emptied iterable to make it pickle-able
         return self._cache
 
     def exhaust(self):
         """Evaluate the entire iterable"""
-        return self._exhaust()[::-1 if self._reversed else 1]
+        self._exhaust()
+        if self._evicted:
+            raise self.EvictedError(f'The first {self._evicted} items have been discarded')
+        return self._cache[::-1 if self._reversed else 1]
+
+    def _get(self, idx):
+        if self._evicted:
+            if isinstance(idx, slice):
+                raise self.EvictedError('Slicing is not supported after items have been discarded')
+            if idx >= 0:
+                if idx < self._evicted:
+                    raise self.EvictedError(f'Item {idx} has been discarded')
+                idx -= self._evicted
+            elif len(self._cache) < -idx <= self._evicted + len(self._cache):
+                raise self.EvictedError(f'Item {idx} has been discarded')
+        try:
+            return self._cache[idx]
+        except IndexError as e:
+            raise self.IndexError(e) from e
 
     @staticmethod
     def _reverse_index(x):
@@ -2257,19 +2372,15 @@ def __getitem__(self, idx):
             # We need to consume the entire iterable to be able to slice from the end
             # Obviously, never use this with infinite iterables
             self._exhaust()
-            try:
-                return self._cache[idx]
-            except IndexError as e:
-                raise self.IndexError(e) from e
-        n = max(start or 0, stop or 0) - len(self._cache) + 1
+            return self._get(idx)
+        n = max(start or 0, stop or 0) - self._evicted - len(self._cache) + 1
         if n > 0:
-            self._cache.extend(itertools.islice(self._iterable, n))
-        try:
-            return self._cache[idx]
-        except IndexError as e:
-            raise self.IndexError(e) from e
+            self._extend(itertools.islice(self._iterable, n))
+        return self._get(idx)
 
     def __bool__(self):
+        if self._evicted:
+            return True
         try:
             self[-1] if self._reversed else self[0]
         except self.IndexError:
@@ -2277,13 +2388,20 @@ def __bool__(self):
         return True
 
     def __len__(self):
+        if self._window is not None and self._iterable:
+            # Exhausting the iterable would discard the items, e.g. before list() iterates over them
+            raise TypeError('The length of a LazyList with a window is only known once it has been exhausted')
         self._exhaust()
-        return len(self._cache)
+        return self._evicted + len(self._cache)
 
     def __reversed__(self):
+        if self._window is not None:
+            raise TypeError('A LazyList with a window cannot be reversed')
         return type(self)(self._iterable, reverse=not self._reversed, _cache=self._cache)
 
     def __copy__(self):
+        if self._window is not None:
+            raise TypeError('A LazyList with a window cannot be copied')
         return type(self)(self._iterable, reverse=self._reversed, _cache=self._cache)
 
     def __repr__(self):
@@ -2309,13 +2427,23 @@ def __init__(self, pagefunc, pagesize, use_cache=True):
         self._pagecount = float('inf')
         self._use_cache = use_cache
         self._cache = {}
+        self._max_cached_pages = None
+
+    def limit_cache(self, max_pages):
+        """Only keep the last used max_pages pages. Other pages are downloaded again if needed"""
+        self._max_cached_pages = max_pages
+        while len(self._cache) > max_pages:
+            del self._cache[next(iter(self._cache))]
 
     def getpage(self, pagenum):
-        page_results = self._cache.get(pagenum)
+        # Re-insert the page so that the least recently used page comes first
+        page_results = self._cache.pop(pagenum, None)
         if page_results is None:
             page_results = [] if pagenum > self._pagecount else list(self._pagefunc(pagenum))
         if self._use_cache:
             self._cache[pagenum] = page_results
+            if self._max_cached_pages is not None and len(self._cache) > self._max_cached_pages:
+                del self._cache[next(iter(self._cache))]
         return page_results
 
     def getslice(self, start=0, end=None):
@@ -2408,6 +2536,10 @@ class PlaylistEntries:
     MissingEntry = object()
     is_exhausted = False
 
+    # Entries that are kept when the entries are processed as they are received
+    _EVICTION_WINDOW = 100
+    _EVICTION_PAGES = 2
+
     def __init__(self, ydl, info_dict):
         self.ydl = ydl
 
@@ -2427,8 +2559,10 @@ def __init__(self, ydl, info_dict):
                 self._entries[i - 1] = entry
         elif isinstance(entries, (list, PagedList, LazyList)):
             self._entries = entries
+            if isinstance(entries, PagedList) and self._can_evict():
+                entries.limit_cache(self._EVICTION_PAGES)
         else:
-            self._entries = LazyList(entries)
+            self._entries = LazyList(entries, window=self._EVICTION_WINDOW if self._can_evict() else None)
 
     PLAYLIST_ITEMS_RE = re.compile(r'''(?x)
         (?P<start>[+-]?\d+)?
@@ -2450,7 +2584,7 @@ def parse_playlist_items(cls, string):
                 raise ValueError(f'Step in {segment!r} cannot be zero')
             yield slice(int_or_none(start), float_or_none(end), int_or_none(step)) if has_range else int(start)
 
-    def get_requested_items(self):
+    def _get_playlist_items(self, warn=False):
         playlist_items = self.ydl.params.get('playlist_items')
         playlist_start = self.ydl.params.get('playliststart', 1)
         playlist_end = self.ydl.params.get('playlistend')
@@ -2458,12 +2592,37 @@ def get_requested_items(self):
         if playlist_end in (-1, None):
             playlist_end = ''
         if not playlist_items:
-            playlist_items = f'{playlist_start}:{playlist_end}'
-        elif playlist_start != 1 or playlist_end:
+            return f'{playlist_start}:{playlist_end}'
+        elif warn and (playlist_start != 1 or playlist_end):
             self.ydl.report_warning('Ignoring playliststart and playlistend because playlistitems was given', only_once=True)
+        return playlist_items
+
+    def _is_forward_only(self):
+        """Whether each of the requested items is accessed once, in the order of the playlist"""
+        if self.ydl.params.get('playlistreverse') or self.ydl.params.get('playlistrandom'):
+            return False
+        last = 0
+        for index in self.parse_playlist_items(self._get_playlist_items()):
+            start, stop, step = (index, index, 1) if isinstance(index, int) else (index.start, index.stop, index.step)
+            if (step or 1) < 0 or (start or 1) <= last or (stop is not None and stop < 0):
+                return False
+            last = float('inf') if stop is None else max(stop, start or 1)
+        return True
 
-        for index in self.parse_playlist_items(playlist_items):
+    def _can_evict(self):
+        # Otherwise, all the requested entries are held in memory anyway, and the playlist may be counted
+        return self.ydl.params.get('lazy_playlist') and self._is_forward_only()
+
+    def get_requested_items(self):
+        """Yield the requested (index, entry), without duplicates"""
+        # There are no duplicates if the items are accessed in order
+        seen = None if self._is_forward_only() else set()
+        for index in self.parse_playlist_items(self._get_playlist_items(warn=True)):
             for i, entry in self[index]:
+                if seen is not None:
+                    if i in seen:
+                        continue
+                    seen.add(i)
                 yield i, entry
                 if not entry:
                     continue
@@ -5307,6 +5466,7 @@ def truncate_string(s, left, right=0):
 def orderedSet_from_options(options, alias_dict, *, use_regex=False, start=None):
     assert 'all' in alias_dict, '"all" alias is required'
     requested = list(start or [])
+    all_items = set(alias_dict['all'])
     for val in options:
         discard = val.startswith('-')
         if discard:
@@ -5320,14 +5480,13 @@ def orderedSet_from_options(options, alias_dict, *, use_regex=False, start=None)
             continue
 
         current = (filter(re.compile(val, re.I).fullmatch, alias_dict['all']) if use_regex
-                   else [val] if val in alias_dict['all'] else None)
+                   else [val] if val in all_items else None)
         if current is None:
             raise ValueError(val)
 
         if discard:
-            for item in current:
-                while item in requested:
-                    requested.remove(item)
+            discarded = set(current)
+            requested = [item for item in requested if item not in discarded]
         else:
             requested.extend(current)
 
@@ -5430,6 +5589,7 @@ def __init__(self, ydl, field_preference):
         self.ydl = ydl
         self._order = []
         self.evaluate_params(self.ydl.params, field_preference)
+        self._field_keys = tuple(map(self._compile_field_preference, self._order))
         if ydl.params.get('verbose'):
             self.print_verbose_info(self.ydl.write_debug)
 
@@ -5596,6 +5756,75 @@ def _calculate_field_preference(self, format_, field):
             value = get_value(field)
         return self._calculate_field_preference_from_value(format_, field, type_, value)
 
+    def _compile_field_preference(self, field):
+        """
+        Return a function computing the same value as _calculate_field_preference(format_, field).
+        All the settings of the field are resolved here once, instead of for every format
+        """
+        type_ = self._get_field_setting(field, 'type')
+        reverse = self._get_field_setting(field, 'reverse')
+        closest = self._get_field_setting(field, 'closest')
+        limit = self._get_field_setting(field, 'limit')
+        default = self._get_field_setting(field, 'default')
+        is_string = self._get_field_setting(field, 'convert') == 'string'
+
+        if type_ == 'multiple':
+            type_ = 'field'
+            function = self._get_field_setting(field, 'function')
+            actual_fields = tuple(self._get_field_setting(f, 'field') for f in self._get_field_setting(field, 'field'))
+            get_value = lambda format_: function(format_.get(f) for f in actual_fields)
+        else:
+            actual_field = self._get_field_setting(field, 'field')
+            get_value = lambda format_: format_.get(actual_field)
+
+        if type_ == 'extractor':
+            maximum = self._get_field_setting(field, 'max')
+
+            def convert(value):
+                return -1 if value is None or (maximum is not None and value >= maximum) else value
+        elif type_ == 'boolean':
+            in_list = self._get_field_setting(field, 'in_list')
+            not_in_list = self._get_field_setting(field, 'not_in_list')
+
+            def convert(value):
+                return 0 if ((in_list is None or value in in_list)
+                             and (not_in_list is None or value not in not_in_list)) else -1
+        elif type_ == 'ordered':
+            resolved = {}
+
+            def convert(value):
+                if value not in resolved:
+                    resolved[value] = self._resolve_field_value(field, value, True)
+                return resolved[value]
+        else:
+            convert = None
+
+        def preference(format_):
+            value = get_value(format_)
+            if convert is not None:
+                value = convert(value)
+
+            # try to convert to number
+            if value is None:
+                val_num = default
+            else:
+                try:
+                    val_num = float(value)
+                except (ValueError, TypeError):
+                    val_num = default
+            is_num = not is_string and val_num is not None
+            if is_num:
+                value = val_num
+
+            return ((-10, 0) if value is None
+                    else (1, value, 0) if not is_num  # if a field has mixed strings and numbers, strings are sorted higher
+                    else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
+                    else (0, value, 0) if not reverse and (limit is None or value <= limit)
+                    else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
+                    else (-1, value, 0))
+
+        return preference
+
     @staticmethod
     def _fill_sorting_fields(format):
         # Determine missing protocol
@@ -5634,7 +5863,7 @@ def _fill_sorting_fields(format):
 
     def calculate_preference(self, format):
         self._fill_sorting_fields(format)
-        return tuple(self._calculate_field_preference(format, field) for field in self._order)
+        return tuple(key(format) for key in self._field_keys)
 
 
 def filesize_from_tbr(tbr, duration):
@@ -15,7 +15,6 @@
     IDENTITY,
     NO_DEFAULT,
     ExtractorError,
-    LazyList,
     deprecation_warning,
     get_elements_html_by_class,
     get_elements_html_by_attribute,
@@ -34,6 +33,66 @@
     variadic,
 )
 
+# Compiled paths by (keys, casesense). Paths with functions are not cached,
+# since these are usually created anew for each call
+_compiled_paths = {}
+_MAX_COMPILED_PATHS = 4096
+
+# Kinds of keys that have a fast path for `dict`s and `list`s
+_LOOKUP = 'lookup'  # `str` or `int`
+_VALUES = 'values'  # `...`
+
+
+def _is_constant_key(key):
+    if type(key) is tuple:
+        return all(map(_is_constant_key, key))
+    return key is None or key is ... or key in (any, all, filter) or isinstance(key, (str, int, type))
+
+
+def _compile_path(path, casesense):
+    """
+    Analyse the keys of a path once
+    @returns    ((key, kind, is_last), ...), where kind is _LOOKUP, _VALUES or None
+    """
+    if type(path) is tuple:
+        keys = path
+    elif type(path) is str:
+        keys = (path,)
+    else:
+        keys = variadic(path, (str, bytes, dict, set))
+    # Other iterables are consumed, and may be garbage collected and their id reused
+    cache_key = (keys, casesense) if type(keys) is tuple else None
+    try:
+        key_types, compiled = _compiled_paths[cache_key]
+    except KeyError:
+        cacheable = cache_key is not None
+    except TypeError:  # unhashable keys
+        cacheable = False
+    else:
+        # Keys of different types may be equal, e.g. 1 and 1.0
+        if key_types == tuple(map(type, keys)):
+            return compiled
+        cacheable = False
+
+    key_types = []
+    compiled = []
+    for key in keys:
+        key_types.append(type(key))
+        if isinstance(key, str):
+            if not casesense:
+                key = key.casefold()
+        elif __debug__ and callable(key) and key not in (any, all, filter):
+            # Verify function signature
+            inspect.signature(key).bind(None, None)
+        compiled.append((key, _LOOKUP if casesense and type(key) in (str, int) else _VALUES if key is ... else None))
+    compiled = tuple((key, kind, index == len(compiled) - 1) for index, (key, kind) in enumerate(compiled))
+
+    if cacheable and all(map(_is_constant_key, keys)):
+        if len(_compiled_paths) >= _MAX_COMPILED_PATHS:
+            _compiled_paths.clear()
+        _compiled_paths[cache_key] = tuple(key_types), compiled
+    return compiled
+
 
 def traverse_obj(
         obj, *paths, default=NO_DEFAULT, expected_type=None, get_all=True,
@@ -236,26 +295,42 @@ def apply_specials(element):
 
         return branching, result if branching else (result,)
 
-    def lazy_last(iterable):
-        iterator = iter(iterable)
-        prev = next(iterator, NO_DEFAULT)
-        if prev is NO_DEFAULT:
-            return
-
-        for item in iterator:
-            yield False, prev
-            prev = item
-
-        yield True, prev
-
     def apply_path(start_obj, path, test_type):
         objs = (start_obj,)
         has_branched = False
 
         key = None
-        for last, key in lazy_last(variadic(path, (str, bytes, dict, set))):
-            if not casesense and isinstance(key, str):
-                key = key.casefold()
+        for key, kind, last in _compile_path(path, casesense):
+            if kind is _LOOKUP and not traverse_string:
+                # Fast path for the most common keys and objects. These keys never branch
+                new_objs = []
+                for obj in objs:
+                    if type(obj) is dict:
+                        new_objs.append(obj.get(key))
+                    elif obj is None:
+                        new_objs.append(None)
+                    elif type(key) is int and type(obj) in (list, tuple):
+                        try:
+                            new_objs.append(obj[key])
+                        except IndexError:
+                            new_objs.append(None)
+                    else:
+                        new_objs.extend(apply_key(key, obj, last)[1])
+                objs = new_objs
+                continue
+
+            if kind is _VALUES and not traverse_string:
+                has_branched = True
+                new_objs = []
+                for obj in objs:
+                    if type(obj) is dict:
+                        new_objs.append(obj.values())
+                    elif type(obj) in (list, tuple):
+                        new_objs.append(obj)
+                    elif obj is not None:
+                        new_objs.append(apply_key(key, obj, last)[1])
+                objs = itertools.chain.from_iterable(new_objs)
+                continue
 
             if key in (any, all):
                 has_branched = False
@@ -270,10 +345,6 @@ def apply_path(start_obj, path, test_type):
                 objs = filter(None, objs)
                 continue
 
-            if __debug__ and callable(key):
-                # Verify function signature
-                inspect.signature(key).bind(None, None)
-
             new_objs = []
             for obj in objs:
                 branching, results = apply_key(key, obj, last)
@@ -289,15 +360,16 @@ def apply_path(start_obj, path, test_type):
 
     def _traverse_obj(obj, path, allow_empty, test_type):
         results, has_branched, is_dict = apply_path(obj, path, test_type)
-        results = LazyList(item for item in results if item not in (None, {}))
+        results = (item for item in results if item not in (None, {}))
         if get_all and has_branched:
+            results = list(results)
             if results:
-                return results.exhaust()
+                return results
             if allow_empty:
                 return [] if default is NO_DEFAULT else default
             return None
 
-        return results[0] if results else {} if allow_empty and is_dict else None
+        return next(results, {} if allow_empty and is_dict else None)
 
     for index, path in enumerate(paths, 1):
         is_last = index == len(paths)